@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from erp_system.ledger.backtest import (
+    DEFAULT_HORIZONS,
+    INVENTORY_BACKTEST_COLUMNS,
+    LEDGER_BACKTEST_COLUMNS,
+    backtest_projections,
+    summarize_backtest,
+)
+from erp_system.pipeline import SnapshotArchive
+from erp_system.runtime.config import TBL_INVENTORY, TBL_LEDGER
+from erp_system.runtime.policies import SNAPSHOT_ARCHIVE_DIR
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+BACKTEST_REPORT_DIR = Path("reports") / "backtest"
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Replay archived ledger snapshots against the On Hand later observed in inventory_status."
+    )
+    parser.add_argument("--archive", default=SNAPSHOT_ARCHIVE_DIR, help="Snapshot archive root (default: %(default)s).")
+    parser.add_argument("--start", help="First forecast run date (YYYY-MM-DD); default: earliest archived.")
+    parser.add_argument("--end", help="Last forecast run date (YYYY-MM-DD); default: latest archived.")
+    parser.add_argument(
+        "--horizons",
+        default=",".join(str(h) for h in DEFAULT_HORIZONS),
+        help="Comma-separated forecast horizons in days (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=3,
+        help="Days a horizon may slip forward to the next inventory snapshot (default: %(default)s).",
+    )
+    parser.add_argument("--out", default=str(BACKTEST_REPORT_DIR), help="Report directory (default: %(default)s).")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    horizons = [int(h) for h in args.horizons.split(",") if h.strip()]
+    archive = SnapshotArchive(Path(args.archive))
+    started = time.perf_counter()
+
+    ledgers = archive.read(TBL_LEDGER, args.start, args.end, columns=LEDGER_BACKTEST_COLUMNS)
+    if ledgers.empty:
+        print(f"No {TBL_LEDGER} snapshots under {args.archive} for the requested dates.")
+        return 1
+    # Actuals run past the last forecast by the longest horizon.
+    last_actual = ledgers["run_date"].max() + pd.Timedelta(days=max(horizons) + args.tolerance)
+    inventory = archive.read(TBL_INVENTORY, ledgers["run_date"].min(), last_actual, columns=INVENTORY_BACKTEST_COLUMNS)
+
+    detail = backtest_projections(ledgers, inventory, horizons=horizons, tolerance_days=args.tolerance)
+    summary = summarize_backtest(detail)
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+    detail_path = out_dir / f"backtest_{stamp}_detail.csv.gz"
+    summary_path = out_dir / f"backtest_{stamp}_summary.xlsx"
+    detail.to_csv(detail_path, index=False)
+    with pd.ExcelWriter(summary_path) as writer:
+        for name, frame in summary.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+
+    runs = ledgers["run_date"].nunique()
+    print(
+        f"Backtested {runs} ledger runs x {len(horizons)} horizons: {len(detail)} forecasts "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+    print("\nError by horizon:")
+    print(summary["by_horizon"].to_string(index=False))
+    print("\nError by event source:")
+    print(summary["by_source"].to_string(index=False))
+    print("\nWorst items:")
+    print(summary["by_item"].head(20).to_string(index=False))
+    print(f"\nDetail: {detail_path}\nSummary: {summary_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
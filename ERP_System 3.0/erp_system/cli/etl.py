@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import argparse
 import logging
 from pathlib import Path
 
@@ -7,8 +8,15 @@ import pandas as pd
 
 from erp_system.contracts import TABLE_CONTRACTS, validate_output_table
 from erp_system.ingest.io_ops import (
+    clone_table,
+    ensure_schema,
+    publish_tables,
+    read_table_if_exists,
+    replace_item_rows,
     save_not_assigned_so,
+    staging_table,
     write_final_sales_order_to_gsheet,
+    write_table_diff,
     write_to_db,
 )
 from erp_system.ingest.sources import (
@@ -19,8 +27,10 @@ from erp_system.ingest.sources import (
 )
 from erp_system.ledger.atp import build_atp_view
 from erp_system.ledger.assignment_readiness import build_assignment_run_tables
-from erp_system.ledger.events import _order_events, build_events, expand_nav_preinstalled
+from erp_system.ledger.events import DESCRIPTION_PARSE_CACHE, _order_events, build_events, expand_nav_preinstalled
+from erp_system.ledger.incremental import build_ledger_incremental
 from erp_system.ledger.ledger import build_ledger_from_events
+from erp_system.pipeline import MetricsRecorder, SnapshotArchive, Stage, StageCache, run_stages
 from erp_system.runtime.config import (
     DB_SCHEMA,
     SHIPPING_SCHEDULE_FILE,
@@ -31,13 +41,20 @@ from erp_system.runtime.config import (
     TBL_POD,
     TBL_SALES_ORDER,
     TBL_SO_ASSIGNMENT_RUNS,
+    TBL_ETL_RUN_METRICS,
+    TBL_ETL_RUNS,
     TBL_Shipping,
     TBL_STRUCTURED,
 )
 from erp_system.runtime.policies import (
+    DESCRIPTION_PARSE_CACHE_PATH,
     GOOGLE_SHEET_SPREADSHEET,
     GOOGLE_SHEET_WORKSHEET,
     NOT_ASSIGNED_SO_EXPORT_PATH,
+    SNAPSHOT_ARCHIVE_DIR,
+    STAGE_CACHE_DIR,
+    STAGE_CACHE_MAX_AGE_DAYS,
+    STAGE_CACHE_MAX_BYTES,
     WORD_FILE_API_URLS,
 )
 from erp_system.transform.inventory import add_onhand_minus_wip, build_wip_lookup, transform_inventory
@@ -54,6 +71,7 @@ VIOLATION_DIFF_KEY_COLUMNS = ["Date", "Item", "Item_raw", "QB Num"]
 REPORT_DIR = Path("reports")
 NEGATIVE_PROJECTED_QTY_REPORT_PATH = REPORT_DIR / "negative_projected_qty.xlsx"
 VIOLATION_SNAPSHOT_PATH = REPORT_DIR / ".last_violation_report.csv"
+RUN_REPORT_DIR = REPORT_DIR / "etl_runs"
 
 
 def _validate_outputs(
@@ -181,36 +199,106 @@ def _print_violation_diff(current: pd.DataFrame) -> None:
     current.to_csv(VIOLATION_SNAPSHOT_PATH, index=False)
 
 
-def main() -> None:
-    logging.info("Shipping schedule input: %s", SHIPPING_SCHEDULE_FILE)
-    so_raw, inv_raw, ship_raw, pod_raw = extract_inputs()
-    validate_input_tables(ship_raw, pod_raw)
-    word_files_df = fetch_word_files_df(WORD_FILE_API_URLS)
-    pdf_orders_df = fetch_pdf_orders_df_from_DB()
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the MRP ETL pipeline.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Diff events against the stored {TBL_LEDGER} and only rebuild/replace changed items.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Run independent stages concurrently: I/O stages on threads, CPU stages on worker processes. "
+        "1 (default) runs every stage in order in this process.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Recompute every stage (and reparse every shipping description) instead of reusing caches under {STAGE_CACHE_DIR}.",
+    )
+    parser.add_argument(
+        "--diff-writes",
+        action="store_true",
+        help="For tables whose contract declares key columns, stage only the inserted/updated/deleted rows "
+        "against the live table instead of rewriting it.",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help=f"Skip archiving this run's inputs and outputs under {SNAPSHOT_ARCHIVE_DIR}.",
+    )
+    parser.add_argument(
+        "--metrics-table",
+        action="store_true",
+        help=f"Also append per-stage metrics to {TBL_ETL_RUN_METRICS} (the JSON run report is always written).",
+    )
+    return parser.parse_args(argv)
 
-    so_full = transform_sales_order(so_raw)
-    wip_lookup = build_wip_lookup(so_full, word_files_df)
-    inv = transform_inventory(inv_raw, wip_lookup)
-    pod = transform_pod(pod_raw)
-    ship = transform_shipping(ship_raw)
-    pod = enrich_pod_with_shipping_audit(pod, ship)
 
-    structured, final_sales_order = build_structured_df(so_full, word_files_df, inv, pdf_orders_df, pod)
-    inv = add_onhand_minus_wip(inv, structured)
+def _build_structured(
+    so_full: pd.DataFrame,
+    word_files_df: pd.DataFrame,
+    inv: pd.DataFrame,
+    pdf_orders_df: pd.DataFrame,
+    pod: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # build_structured_df fills missing SO columns in place; so_full is shared with other stages.
+    return build_structured_df(so_full.copy(), word_files_df, inv, pdf_orders_df, pod)
 
+
+def _expand_nav_preinstalled(ship: pd.DataFrame, *, cache_path: str | None) -> tuple[pd.DataFrame, dict]:
+    """expand_nav_preinstalled with the description parse cache loaded from and saved to `cache_path`."""
+    if cache_path:
+        DESCRIPTION_PARSE_CACHE.load(cache_path)
+    DESCRIPTION_PARSE_CACHE.reset_stats()
     nav_exp = expand_nav_preinstalled(ship)
-    events_all = _order_events(build_events(structured, nav_exp, pod))
-    ledger, item_summary, violations = build_ledger_from_events(structured, events_all, inv)
+    stats = DESCRIPTION_PARSE_CACHE.stats()
+    if cache_path:
+        try:
+            DESCRIPTION_PARSE_CACHE.save(cache_path)
+        except OSError as exc:
+            logging.warning("Skipping description parse cache save to %s: %s", cache_path, exc)
+    return nav_exp, stats
 
+
+def _build_ordered_events(structured: pd.DataFrame, nav_exp: pd.DataFrame, pod: pd.DataFrame) -> pd.DataFrame:
+    return _order_events(build_events(structured, nav_exp, pod))
+
+
+def _read_previous_ledger() -> pd.DataFrame:
+    return read_table_if_exists(DB_SCHEMA, TBL_LEDGER)
+
+
+def _build_ledger(
+    structured: pd.DataFrame,
+    events_all: pd.DataFrame,
+    inv: pd.DataFrame,
+    previous_ledger: pd.DataFrame | None,
+    *,
+    incremental: bool = False,
+):
+    if not incremental:
+        ledger, item_summary, violations = build_ledger_from_events(structured, events_all, inv)
+        return ledger, item_summary, violations, None
+
+    result = build_ledger_incremental(structured, events_all, inv, previous_ledger)
+    if result.full_rebuild:
+        print(f"Incremental ledger: no reusable {TBL_LEDGER} for today, rebuilt all {result.n_touched} items.")
+        return result.ledger, result.item_summary, result.violations, None
+    print(f"Incremental ledger: {result.n_touched} of {result.arrays.n_items} items touched.")
+    return result.ledger, result.item_summary, result.violations, result.touched_items
+
+
+def _report_violations(violations: pd.DataFrame) -> None:
     violation_report = _prepare_violation_report(violations)
     _print_violation_overview(violation_report)
     _write_negative_projected_qty_report(violation_report)
     _print_violation_diff(violation_report)
 
-    inv, structured, pod, ship, ledger = _validate_outputs(inv, structured, pod, ship, ledger)
 
-    atp_view = build_atp_view(ledger)
-    assignment_runs = build_assignment_run_tables(structured, ledger)
+def _export_not_assigned_so(structured: pd.DataFrame) -> None:
     erp_df = prepare_erp_view(structured)
     not_assigned_so = erp_df.loc[~erp_df["AssignedFlag"]].copy()
 
@@ -224,41 +312,349 @@ def main() -> None:
     )
     print(summary)
 
-    write_to_db(inv, schema=DB_SCHEMA, table=TBL_INVENTORY)
-    write_to_db(so_full, schema=DB_SCHEMA, table=TBL_SALES_ORDER)
-    write_to_db(structured, schema=DB_SCHEMA, table=TBL_STRUCTURED)
-    write_to_db(pod, schema=DB_SCHEMA, table=TBL_POD)
-    write_to_db(ship, schema=DB_SCHEMA, table=TBL_Shipping)
-    write_to_db(ledger, schema=DB_SCHEMA, table=TBL_LEDGER)
-    write_to_db(item_summary, schema=DB_SCHEMA, table=TBL_ITEM_SUMMARY)
-    write_to_db(atp_view, schema=DB_SCHEMA, table=TBL_ITEM_ATP)
-    write_to_db(assignment_runs, schema=DB_SCHEMA, table=TBL_SO_ASSIGNMENT_RUNS)
 
-    print(
-        f"Loaded: {DB_SCHEMA}.{TBL_SALES_ORDER}={len(so_full)}; "
-        f"{DB_SCHEMA}.{TBL_INVENTORY}={len(inv)}; "
-        f"{DB_SCHEMA}.{TBL_STRUCTURED}={len(structured)}; "
-        f"{DB_SCHEMA}.{TBL_POD}={len(pod)}; "
-        f"{DB_SCHEMA}.{TBL_Shipping}={len(ship)}; "
-        f"{DB_SCHEMA}.{TBL_LEDGER}={len(ledger)}; "
-        f"{DB_SCHEMA}.{TBL_ITEM_ATP}={len(atp_view)}; "
-        f"{DB_SCHEMA}.{TBL_SO_ASSIGNMENT_RUNS}={len(assignment_runs)}; "
+def _write_ledger(ledger: pd.DataFrame, touched_items) -> None:
+    staged = staging_table(TBL_LEDGER)
+    if touched_items is None:
+        write_to_db(ledger, schema=DB_SCHEMA, table=staged)
+    else:
+        clone_table(DB_SCHEMA, TBL_LEDGER, staged)
+        changed = ledger.loc[ledger["Item"].isin(touched_items)]
+        replace_item_rows(changed, schema=DB_SCHEMA, table=staged, items=touched_items)
+
+
+def _write_table_diff(frame: pd.DataFrame, *, table: str) -> None:
+    counts = write_table_diff(
+        frame,
+        DB_SCHEMA,
+        table,
+        TABLE_CONTRACTS[table].key_columns,
+        target=staging_table(table),
     )
+    logging.info("%s.%s diff write: %s", DB_SCHEMA, table, counts)
 
 
-    ## Write SO sheet to Google sheet
-    if not final_sales_order.empty:
-        so_for_sheet = final_sales_order.assign(
-            Lead_Time = pd.to_datetime(final_sales_order["Lead Time"], errors="coerce").dt.date
+def _publish_outputs(*frames: pd.DataFrame, run_id: str) -> int:
+    tables = [table for _, table in DB_WRITES]
+    version = publish_tables(
+        DB_SCHEMA,
+        tables,
+        run_id=run_id,
+        runs_table=TBL_ETL_RUNS,
+        row_counts={table: len(frame) for table, frame in zip(tables, frames)},
+    )
+    print(f"Published {len(tables)} tables as {DB_SCHEMA}.{TBL_ETL_RUNS} version {version} ({run_id}).")
+    return version
+
+
+def _archive_snapshots(*frames: pd.DataFrame, run_id: str, run_date, root: str) -> None:
+    names = [dataset for _, dataset in ARCHIVE_DATASETS]
+    try:
+        paths = SnapshotArchive(Path(root)).write_run(dict(zip(names, frames)), run_date=run_date, run_id=run_id)
+    except Exception as exc:
+        logging.warning("Skipping snapshot archive under %s: %s", root, exc)
+        return
+    logging.info("Archived %d snapshots for %s under %s", len(paths), run_date, root)
+
+
+def _push_final_sales_order(final_sales_order: pd.DataFrame) -> None:
+    if final_sales_order.empty:
+        return
+    so_for_sheet = final_sales_order.assign(
+        Lead_Time = pd.to_datetime(final_sales_order["Lead Time"], errors="coerce").dt.date
+    )
+    try:
+        write_final_sales_order_to_gsheet(
+            so_for_sheet,
+            spreadsheet_name=GOOGLE_SHEET_SPREADSHEET,
+            worksheet_name=GOOGLE_SHEET_WORKSHEET,
         )
-        try:
-            write_final_sales_order_to_gsheet(
-                so_for_sheet,
-                spreadsheet_name=GOOGLE_SHEET_SPREADSHEET,
-                worksheet_name=GOOGLE_SHEET_WORKSHEET,
+    except Exception as exc:
+        logging.warning("Skipping Open Sales Order export: %s", exc)
+
+
+# (value, table) pairs loaded into staging tables at the end of a run and then
+# published together; the ledger may be an item-level replace and keyed tables
+# a differential write (--diff-writes).
+DB_WRITES = [
+    ("inv", TBL_INVENTORY),
+    ("so_full", TBL_SALES_ORDER),
+    ("structured", TBL_STRUCTURED),
+    ("pod", TBL_POD),
+    ("ship", TBL_Shipping),
+    ("ledger", TBL_LEDGER),
+    ("item_summary", TBL_ITEM_SUMMARY),
+    ("atp_view", TBL_ITEM_ATP),
+    ("assignment_runs", TBL_SO_ASSIGNMENT_RUNS),
+]
+
+# (value, dataset) pairs archived per run date once the run is published.
+ARCHIVE_DATASETS = [
+    ("so_raw", "raw_sales_order"),
+    ("inv_raw", "raw_inventory"),
+    ("pod_raw", "raw_pod"),
+    ("ship_raw", "raw_shipping_schedule"),
+    ("inv", TBL_INVENTORY),
+    ("so_full", TBL_SALES_ORDER),
+    ("pod", TBL_POD),
+    ("ship", TBL_Shipping),
+    ("ledger", TBL_LEDGER),
+    ("atp_view", TBL_ITEM_ATP),
+]
+
+
+def build_etl_stages(
+    *,
+    incremental: bool = False,
+    run_id: str = "",
+    diff_writes: bool = False,
+    archive_root: str | None = None,
+    run_date=None,
+    description_cache_path: str | None = None,
+) -> list[Stage]:
+    """
+    The ETL as a stage graph, declared in the order a sequential run uses.
+    Names ending in `_base` are pre-validation frames. Stages marked `cache`
+    are pure functions of their inputs and the run date. With `archive_root`
+    the published run is also archived there under `run_date`. With
+    `description_cache_path` parsed shipping descriptions persist across runs.
+    """
+    stages = [
+        Stage("extract_inputs", extract_inputs, outputs=("so_raw", "inv_raw", "ship_raw", "pod_raw")),
+        Stage("validate_input_tables", validate_input_tables, inputs=("ship_raw", "pod_raw")),
+        Stage(
+            "fetch_word_files",
+            fetch_word_files_df,
+            outputs=("word_files_df",),
+            kwargs={"api_url": WORD_FILE_API_URLS},
+        ),
+        Stage("fetch_pdf_orders", fetch_pdf_orders_df_from_DB, outputs=("pdf_orders_df",)),
+        Stage(
+            "transform_sales_order",
+            transform_sales_order,
+            inputs=("so_raw",),
+            outputs=("so_full",),
+            kind="cpu",
+            cache=True,
+            after=("validate_input_tables",),
+        ),
+        Stage(
+            "build_wip_lookup",
+            build_wip_lookup,
+            inputs=("so_full", "word_files_df"),
+            outputs=("wip_lookup",),
+            kind="cpu",
+            cache=True,
+        ),
+        Stage(
+            "transform_inventory",
+            transform_inventory,
+            inputs=("inv_raw", "wip_lookup"),
+            outputs=("inv_base",),
+            kind="cpu",
+            cache=True,
+        ),
+        Stage(
+            "transform_pod",
+            transform_pod,
+            inputs=("pod_raw",),
+            outputs=("pod_transformed",),
+            kind="cpu",
+            cache=True,
+            after=("validate_input_tables",),
+        ),
+        Stage(
+            "transform_shipping",
+            transform_shipping,
+            inputs=("ship_raw",),
+            outputs=("ship_base",),
+            kind="cpu",
+            cache=True,
+            after=("validate_input_tables",),
+        ),
+        Stage(
+            "enrich_pod_with_shipping_audit",
+            enrich_pod_with_shipping_audit,
+            inputs=("pod_transformed", "ship_base"),
+            outputs=("pod_base",),
+            kind="cpu",
+            cache=True,
+        ),
+        Stage(
+            "build_structured_df",
+            _build_structured,
+            inputs=("so_full", "word_files_df", "inv_base", "pdf_orders_df", "pod_base"),
+            outputs=("structured_base", "final_sales_order"),
+            kind="cpu",
+            cache=True,
+        ),
+        Stage(
+            "add_onhand_minus_wip",
+            add_onhand_minus_wip,
+            inputs=("inv_base", "structured_base"),
+            outputs=("inv_wip",),
+            kind="cpu",
+            cache=True,
+        ),
+        Stage(
+            "expand_nav_preinstalled",
+            _expand_nav_preinstalled,
+            inputs=("ship_base",),
+            outputs=("nav_exp", "description_parse_stats"),
+            kind="cpu",
+            cache=True,
+            kwargs={"cache_path": description_cache_path},
+        ),
+        Stage(
+            "build_events",
+            _build_ordered_events,
+            inputs=("structured_base", "nav_exp", "pod_base"),
+            outputs=("events_all",),
+            kind="cpu",
+            cache=True,
+        ),
+    ]
+    if incremental:
+        stages.append(Stage("read_previous_ledger", _read_previous_ledger, outputs=("previous_ledger",)))
+    stages += [
+        Stage(
+            "build_ledger_from_events",
+            _build_ledger,
+            inputs=("structured_base", "events_all", "inv_wip", "previous_ledger"),
+            outputs=("ledger_base", "item_summary", "violations", "touched_items"),
+            kind="cpu",
+            cache=True,
+            kwargs={"incremental": incremental},
+        ),
+        Stage("report_violations", _report_violations, inputs=("violations",)),
+        Stage(
+            "validate_outputs",
+            _validate_outputs,
+            inputs=("inv_wip", "structured_base", "pod_base", "ship_base", "ledger_base"),
+            outputs=("inv", "structured", "pod", "ship", "ledger"),
+            kind="cpu",
+            cache=True,
+        ),
+        Stage(
+            "build_atp_view",
+            build_atp_view,
+            inputs=("ledger",),
+            outputs=("atp_view",),
+            kind="cpu",
+            cache=True,
+        ),
+        Stage(
+            "build_assignment_run_tables",
+            build_assignment_run_tables,
+            inputs=("structured", "ledger"),
+            outputs=("assignment_runs",),
+            kind="cpu",
+        ),
+        Stage("export_not_assigned_so", _export_not_assigned_so, inputs=("structured",)),
+    ]
+    for value, table in DB_WRITES:
+        if table == TBL_LEDGER:
+            stages.append(Stage(f"write_{table}", _write_ledger, inputs=(value, "touched_items")))
+        elif diff_writes and table in TABLE_CONTRACTS and TABLE_CONTRACTS[table].key_columns:
+            stages.append(Stage(f"write_{table}", _write_table_diff, inputs=(value,), kwargs={"table": table}))
+        else:
+            stages.append(
+                Stage(
+                    f"write_{table}",
+                    write_to_db,
+                    inputs=(value,),
+                    kwargs={"schema": DB_SCHEMA, "table": staging_table(table)},
+                )
+            )
+    stages.append(
+        Stage(
+            "publish_tables",
+            _publish_outputs,
+            inputs=tuple(value for value, _ in DB_WRITES),
+            outputs=("db_version",),
+            after=tuple(f"write_{table}" for _, table in DB_WRITES),
+            kwargs={"run_id": run_id},
+        )
+    )
+    if archive_root is not None:
+        stages.append(
+            Stage(
+                "archive_snapshots",
+                _archive_snapshots,
+                inputs=tuple(value for value, _ in ARCHIVE_DATASETS),
+                after=("publish_tables",),
+                kwargs={
+                    "run_id": run_id,
+                    "run_date": run_date or pd.Timestamp.today().date(),
+                    "root": archive_root,
+                },
             )
+        )
+    stages.append(Stage("push_final_sales_order", _push_final_sales_order, inputs=("final_sales_order",)))
+    return stages
+
+
+def _write_run_metrics(recorder: MetricsRecorder, run_id: str, args: argparse.Namespace, values: dict) -> None:
+    # A stage-cache hit parsed nothing this run, so its saved stats would describe an earlier run.
+    parsed = any(m.stage == "expand_nav_preinstalled" and m.status == "ok" for m in recorder.stages)
+    path = recorder.write_report(
+        RUN_REPORT_DIR / f"{run_id}.json",
+        run_id,
+        jobs=args.jobs,
+        incremental=args.incremental,
+        diff_writes=args.diff_writes,
+        description_parse_cache=values.get("description_parse_stats") if parsed else None,
+    )
+    slowest = sorted((m for m in recorder.stages if m.seconds is not None), key=lambda m: -m.seconds)[:5]
+    print(f"Run report written to {path}; slowest stages: " + ", ".join(f"{m.stage}={m.seconds:.1f}s" for m in slowest))
+    if args.metrics_table:
+        try:
+            write_to_db(recorder.to_frame(run_id), schema=DB_SCHEMA, table=TBL_ETL_RUN_METRICS, if_exists="append")
         except Exception as exc:
-            logging.warning("Skipping Open Sales Order export: %s", exc)
+            logging.warning("Skipping %s write: %s", TBL_ETL_RUN_METRICS, exc)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    logging.info("Shipping schedule input: %s", SHIPPING_SCHEDULE_FILE)
+    recorder = MetricsRecorder()
+    cache = None if args.no_cache else StageCache(Path(STAGE_CACHE_DIR))
+    run_id = recorder.started_at.strftime("run_%Y%m%d_%H%M%S")
+    values: dict = {}
+    # Once, before parallel write stages could race to create it.
+    ensure_schema(DB_SCHEMA)
+    try:
+        values = run_stages(
+            build_etl_stages(
+                incremental=args.incremental,
+                run_id=run_id,
+                diff_writes=args.diff_writes,
+                archive_root=None if args.no_archive else SNAPSHOT_ARCHIVE_DIR,
+                run_date=recorder.started_at.date(),
+                description_cache_path=None if args.no_cache else DESCRIPTION_PARSE_CACHE_PATH,
+            ),
+            jobs=args.jobs,
+            values={} if args.incremental else {"previous_ledger": None},
+            recorder=recorder,
+            cache=cache,
+        )
+    finally:
+        _write_run_metrics(recorder, run_id, args, values)
+        if cache is not None:
+            removed = cache.evict(max_age_days=STAGE_CACHE_MAX_AGE_DAYS, max_bytes=STAGE_CACHE_MAX_BYTES)
+            if removed:
+                logging.info("Evicted %d stage cache entries from %s", removed, STAGE_CACHE_DIR)
+
+    print(
+        f"Loaded: {DB_SCHEMA}.{TBL_SALES_ORDER}={len(values['so_full'])}; "
+        f"{DB_SCHEMA}.{TBL_INVENTORY}={len(values['inv'])}; "
+        f"{DB_SCHEMA}.{TBL_STRUCTURED}={len(values['structured'])}; "
+        f"{DB_SCHEMA}.{TBL_POD}={len(values['pod'])}; "
+        f"{DB_SCHEMA}.{TBL_Shipping}={len(values['ship'])}; "
+        f"{DB_SCHEMA}.{TBL_LEDGER}={len(values['ledger'])}; "
+        f"{DB_SCHEMA}.{TBL_ITEM_ATP}={len(values['atp_view'])}; "
+        f"{DB_SCHEMA}.{TBL_SO_ASSIGNMENT_RUNS}={len(values['assignment_runs'])}; "
+    )
 
 
 if __name__ == "__main__":
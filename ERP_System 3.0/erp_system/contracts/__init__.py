@@ -2,6 +2,7 @@ from .schemas import (
     COLUMN_TYPE_DATETIME,
     COLUMN_TYPE_NUMBER,
     COLUMN_TYPE_STRING,
+    KEY_LINE_COLUMN,
     TABLE_CONTRACTS,
     TableContract,
     ensure_contract_columns,
@@ -12,6 +13,7 @@ __all__ = [
     "COLUMN_TYPE_DATETIME",
     "COLUMN_TYPE_NUMBER",
     "COLUMN_TYPE_STRING",
+    "KEY_LINE_COLUMN",
     "ensure_contract_columns",
     "TABLE_CONTRACTS",
     "TableContract",
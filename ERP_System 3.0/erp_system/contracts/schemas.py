@@ -11,6 +11,10 @@ COLUMN_TYPE_NUMBER: Literal["number"] = "number"
 COLUMN_TYPE_DATETIME: Literal["datetime"] = "datetime"
 ColumnType = Literal["string", "number", "datetime"]
 
+# Occurrence number of a row among rows sharing its contract key (0, 1, ...),
+# stored by diff writes so repeated lines under one key can be matched.
+KEY_LINE_COLUMN = "Key_Line"
+
 
 class InventoryStatusRow(TypedDict, total=False):
     Part_Number: str
@@ -79,6 +83,8 @@ class TableContract:
     table_name: str
     required_columns: tuple[str, ...]
     column_types: dict[str, ColumnType] = field(default_factory=dict)
+    # Business key for differential writes; rows are matched on key + KEY_LINE_COLUMN.
+    key_columns: tuple[str, ...] = ()
 
 
 TABLE_CONTRACTS: dict[str, TableContract] = {
@@ -111,6 +117,7 @@ TABLE_CONTRACTS: dict[str, TableContract] = {
             "On Hand": COLUMN_TYPE_NUMBER,
             "On PO": COLUMN_TYPE_NUMBER,
         },
+        key_columns=("QB Num", "Item"),
     ),
     "NT Shipping Schedule": TableContract(
         table_name="NT Shipping Schedule",
@@ -126,6 +133,7 @@ TABLE_CONTRACTS: dict[str, TableContract] = {
             "Order Qty": COLUMN_TYPE_NUMBER,
             "Reference": COLUMN_TYPE_STRING,
         },
+        key_columns=("QB Num", "Item"),
     ),
     "Open_Purchase_Orders": TableContract(
         table_name="Open_Purchase_Orders",
@@ -140,6 +148,7 @@ TABLE_CONTRACTS: dict[str, TableContract] = {
             "Ship Date": COLUMN_TYPE_DATETIME,
             "Source Name": COLUMN_TYPE_STRING,
         },
+        key_columns=("QB Num", "Item"),
     ),
     "ledger_analytics": TableContract(
         table_name="ledger_analytics",
@@ -213,6 +222,7 @@ __all__ = [
     "COLUMN_TYPE_DATETIME",
     "COLUMN_TYPE_NUMBER",
     "COLUMN_TYPE_STRING",
+    "KEY_LINE_COLUMN",
     "ensure_contract_columns",
     "TABLE_CONTRACTS",
     "TableContract",
@@ -1,2 +1,4 @@
+from .excel_reader import *  # noqa: F401,F403
 from .io_ops import *  # noqa: F401,F403
 from .sources import *  # noqa: F401,F403
+from .typed_csv import *  # noqa: F401,F403
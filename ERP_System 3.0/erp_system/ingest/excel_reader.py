@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+from erp_system.pipeline.cache import PARQUET_ENGINE, _parquet_safe
+from erp_system.runtime.policies import EXCEL_CACHE_DIR
+
+from ._helpers import read_excel_safe
+
+try:
+    import python_calamine  # noqa: F401
+
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"  # pandas opens it read_only/data_only
+
+
+def file_signature(path: str | Path) -> tuple[str, int, int]:
+    """(resolved path, mtime_ns, size): changes whenever the workbook is saved again."""
+    path = Path(path)
+    stat = path.stat()
+    return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def _entry_stem(signature: tuple[str, int, int], tag: str, cache_dir: str | Path) -> Path:
+    # One entry per (file, tag); a newer copy of the file overwrites it.
+    digest = hashlib.sha256(f"{signature[0].lower()}\0{tag}".encode()).hexdigest()[:32]
+    return Path(cache_dir) / digest
+
+
+def _load_entry(stem: Path, signature: tuple[str, int, int]) -> Any:
+    meta_path = stem.with_suffix(".meta")
+    if not meta_path.exists():
+        return None
+    try:
+        with open(meta_path, "rb") as f:
+            meta = pickle.load(f)
+        if tuple(meta["signature"]) != signature:
+            return None
+        if meta["format"] == "parquet":
+            return pd.read_parquet(stem.with_suffix(".parquet"), engine=PARQUET_ENGINE)
+        with open(stem.with_suffix(".pkl"), "rb") as f:
+            return pickle.load(f)
+    except Exception as exc:
+        logging.info("Ignoring unreadable workbook cache %s: %s", stem, exc)
+        return None
+
+
+def _write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _store_entry(stem: Path, signature: tuple[str, int, int], value: Any) -> None:
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(value, pd.DataFrame) and _parquet_safe(value):
+        fmt = "parquet"
+        _write_atomic(stem.with_suffix(".parquet"), lambda p: value.to_parquet(p, engine=PARQUET_ENGINE))
+    else:
+        fmt = "pickle"
+
+        def dump(p: Path) -> None:
+            with open(p, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        _write_atomic(stem.with_suffix(".pkl"), dump)
+
+    def dump_meta(p: Path) -> None:
+        with open(p, "wb") as f:
+            pickle.dump({"signature": signature, "format": fmt}, f)
+
+    # The meta file goes last: a reader only trusts data that a meta file vouches for.
+    _write_atomic(stem.with_suffix(".meta"), dump_meta)
+
+
+def cached_file_read(
+    path: str | Path,
+    tag: str,
+    read: Callable[[Path], Any],
+    *,
+    cache_dir: str | Path | None = EXCEL_CACHE_DIR,
+) -> Any:
+    """
+    Return `read(path)`, reusing the copy cached under `cache_dir` while the
+    file's mtime and size are unchanged. Frames are stored as Parquet when an
+    engine is installed and the dtypes allow it, anything else pickled.
+    `tag` separates different reads of the same file. `cache_dir=None`
+    disables the cache.
+    """
+    path = Path(path)
+    if cache_dir is None:
+        return read(path)
+    signature = file_signature(path)
+    stem = _entry_stem(signature, tag, cache_dir)
+    cached = _load_entry(stem, signature)
+    if cached is not None:
+        return cached
+    value = read(path)
+    try:
+        _store_entry(stem, signature, value)
+    except OSError as exc:
+        logging.warning("Could not cache %s: %s", path, exc)
+    return value
+
+
+def read_excel_fast(
+    path: str | Path,
+    *,
+    sheet_name: str | int = 0,
+    columns: Iterable[str] | None = None,
+    cache_dir: str | Path | None = EXCEL_CACHE_DIR,
+) -> pd.DataFrame:
+    """
+    Read one sheet with the fastest installed engine (calamine, else
+    openpyxl in read-only mode), keeping only `columns` that are present,
+    through the mtime/size keyed cache.
+    """
+    wanted = None if columns is None else tuple(dict.fromkeys(columns))
+    usecols = None if wanted is None else (lambda c: c in wanted)
+    tag = f"sheet={sheet_name!r};columns={wanted!r}"
+    return cached_file_read(
+        path,
+        tag,
+        lambda p: read_excel_safe(p, sheet_name=sheet_name, usecols=usecols, engine=EXCEL_ENGINE),
+        cache_dir=cache_dir,
+    )
+
+
+__all__ = ["EXCEL_ENGINE", "cached_file_read", "file_signature", "read_excel_fast"]
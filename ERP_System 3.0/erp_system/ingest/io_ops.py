@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 import tempfile
+import threading
 import uuid
 from datetime import datetime
-from io import BytesIO
+from io import BytesIO, StringIO
 
 import pandas as pd
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.utils.dataframe import dataframe_to_rows
-from sqlalchemy import text
+from sqlalchemy import bindparam, inspect, text
 
+from erp_system.contracts import KEY_LINE_COLUMN
 from erp_system.runtime.db_config import get_engine
 from erp_system.runtime.policies import GOOGLE_SHEET_SPREADSHEET, GOOGLE_SHEET_WORKSHEET
 
@@ -29,6 +32,33 @@ def engine():
     return get_engine()
 
 
+_SCHEMA_LOCK = threading.Lock()
+_SCHEMAS_READY: set[tuple[str, str]] = set()
+
+
+def ensure_schema(schema: str) -> None:
+    """
+    Create `schema` if it is missing, once per engine and one caller at a
+    time: write stages running in parallel on a fresh DuckDB otherwise race
+    on CREATE SCHEMA, and the losers fail. Raises when the schema still does
+    not exist afterwards, rather than leaving the write to fail later.
+    """
+    eng = engine()
+    key = (eng.url.render_as_string(hide_password=True), schema)
+    with _SCHEMA_LOCK:
+        if key in _SCHEMAS_READY:
+            return
+        if schema not in inspect(eng).get_schema_names():
+            try:
+                with eng.begin() as conn:
+                    conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+            except Exception as exc:
+                # Another process may have created it in the meantime.
+                if schema not in inspect(eng).get_schema_names():
+                    raise RuntimeError(f"Cannot create database schema {schema!r}: {exc}") from exc
+        _SCHEMAS_READY.add(key)
+
+
 def read_table_if_exists(schema: str, table: str) -> pd.DataFrame:
     eng = engine()
     query = f'SELECT * FROM "{schema}"."{table}"'
@@ -38,32 +68,335 @@ def read_table_if_exists(schema: str, table: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def write_to_db(df: pd.DataFrame, schema: str, table: str):
-    if df is None:
-        return
+def _prepare_for_db(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
     for c in out.columns:
         if out[c].dtype == "object":
             out[c] = out[c].map(
                 lambda v: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list, tuple, set)) else v
             )
-    out = out.where(pd.notna(out), None)
-    eng = engine()
+    return out.where(pd.notna(out), None)
+
+
+def _qualified(schema: str, table: str) -> str:
+    return f'"{schema}"."{table}"'
+
+
+def _column_list(df: pd.DataFrame) -> str:
+    return ", ".join('"' + str(c).replace('"', '""') + '"' for c in df.columns)
+
+
+def _copy_rows_postgres(conn, out: pd.DataFrame, schema: str, table: str) -> None:
+    """COPY `out` into an existing table through the connection's psycopg cursor."""
+    sql = f"COPY {_qualified(schema, table)} ({_column_list(out)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    payload = out.to_csv(index=False, header=False, na_rep="\\N")
+    cursor = conn.connection.cursor()
     try:
-        with eng.begin() as conn:
-            conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
-    except Exception:
-        pass
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, StringIO(payload))
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(payload)
+    finally:
+        cursor.close()
+
+
+def _insert_rows_duckdb(conn, out: pd.DataFrame, schema: str, table: str, *, create: bool = False) -> None:
+    """Register `out` as a DuckDB view and load it with one set-based statement."""
+    raw = conn.connection.driver_connection
+    view = f"__erp_frame_{uuid.uuid4().hex}"
+    raw.register(view, out)
+    try:
+        if create:
+            conn.exec_driver_sql(f'CREATE OR REPLACE TABLE {_qualified(schema, table)} AS SELECT * FROM "{view}"')
+        else:
+            cols = _column_list(out)
+            conn.exec_driver_sql(f'INSERT INTO {_qualified(schema, table)} ({cols}) SELECT {cols} FROM "{view}"')
+    finally:
+        raw.unregister(view)
+
+
+_BULK_APPENDERS = {
+    "postgresql": _copy_rows_postgres,
+    "duckdb": _insert_rows_duckdb,
+}
+
+
+def _create_table(conn, out: pd.DataFrame, schema: str, table: str, *, if_exists: str) -> None:
+    """Create `table` with the column types to_sql would infer; honours to_sql's if_exists."""
+    if inspect(conn).has_table(table, schema=schema):
+        if if_exists == "append":
+            return
+        if if_exists == "fail":
+            raise ValueError(f"Table '{schema}.{table}' already exists.")
+        conn.exec_driver_sql(f"DROP TABLE {_qualified(schema, table)}")
+    conn.exec_driver_sql(pd.io.sql.get_schema(out, table, schema=schema, con=conn))
+
+
+def append_rows(conn, out: pd.DataFrame, schema: str, table: str) -> None:
+    """
+    Append prepared rows to an existing table inside `conn`'s transaction:
+    COPY on PostgreSQL, a registered-frame INSERT on DuckDB, to_sql elsewhere.
+    """
+    if out.empty:
+        return
+    appender = _BULK_APPENDERS.get(conn.dialect.name)
+    if appender is None:
+        out.to_sql(table, conn, schema=schema, if_exists="append", index=False, method="multi", chunksize=2000)
+    else:
+        appender(conn, out, schema, table)
+
+
+def _bulk_write(conn, out: pd.DataFrame, schema: str, table: str, *, if_exists: str) -> None:
+    if conn.dialect.name == "duckdb" and (if_exists == "replace" or not inspect(conn).has_table(table, schema=schema)):
+        _insert_rows_duckdb(conn, out, schema, table, create=True)
+        return
+    _create_table(conn, out, schema, table, if_exists=if_exists)
+    append_rows(conn, out, schema, table)
+
+
+def write_to_db(df: pd.DataFrame, schema: str, table: str, *, if_exists: str = "replace"):
+    if df is None:
+        return
+    out = _prepare_for_db(df)
+    ensure_schema(schema)
+    eng = engine()
+    if eng.dialect.name in _BULK_APPENDERS:
+        try:
+            with eng.begin() as conn:
+                _bulk_write(conn, out, schema, table, if_exists=if_exists)
+            return
+        except Exception as exc:
+            logging.warning("Bulk load of %s.%s failed, falling back to INSERTs: %s", schema, table, exc)
     try:
-        out.to_sql(table, eng, schema=schema, if_exists="replace", index=False, method="multi", chunksize=2000)
+        out.to_sql(table, eng, schema=schema, if_exists=if_exists, index=False, method="multi", chunksize=2000)
     except Exception as exc:
         msg = str(exc)
         if ("sqlalche.me/e/20/e3q8" in msg) or ("bind parameter" in msg.lower()):
-            out.to_sql(table, eng, schema=schema, if_exists="replace", index=False, method=None, chunksize=500)
+            out.to_sql(table, eng, schema=schema, if_exists=if_exists, index=False, method=None, chunksize=500)
         else:
             raise
 
 
+def replace_item_rows(
+    df: pd.DataFrame,
+    schema: str,
+    table: str,
+    items,
+    *,
+    item_col: str = "Item",
+    batch_size: int = 1000,
+) -> int:
+    """
+    Delete the rows of `items` from an existing table and append `df` in their
+    place, in one transaction. `df` should only hold rows for those items.
+    Returns the number of rows written.
+    """
+    items = [str(v) for v in pd.unique(pd.Series(list(items), dtype="object").dropna())]
+    if not items:
+        return 0
+    out = _prepare_for_db(df)
+    delete_stmt = text(f'DELETE FROM "{schema}"."{table}" WHERE "{item_col}" IN :items').bindparams(
+        bindparam("items", expanding=True)
+    )
+    eng = engine()
+    with eng.begin() as conn:
+        for start in range(0, len(items), batch_size):
+            conn.execute(delete_stmt, {"items": items[start : start + batch_size]})
+        append_rows(conn, out, schema, table)
+    return len(out)
+
+
+STAGING_SUFFIX = "__staging"
+
+
+def staging_table(table: str) -> str:
+    """Name of the table the ETL loads `table`'s next version into before publishing."""
+    return f"{table}{STAGING_SUFFIX}"
+
+
+def clone_table(schema: str, source: str, target: str) -> None:
+    """Replace `target` with a copy of `source` (used to stage an item-level ledger update)."""
+    eng = engine()
+    with eng.begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {_qualified(schema, target)}")
+        conn.exec_driver_sql(f"CREATE TABLE {_qualified(schema, target)} AS SELECT * FROM {_qualified(schema, source)}")
+
+
+def with_key_lines(df: pd.DataFrame, key_columns) -> pd.DataFrame:
+    """Copy of `df` with KEY_LINE_COLUMN numbering the rows that share each key, in frame order."""
+    out = df.copy()
+    out[KEY_LINE_COLUMN] = out.groupby(list(key_columns), sort=False, dropna=False).cumcount().astype("int64")
+    return out
+
+
+def _comparable(prev: pd.Series, new: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    Put a column as read back from the database and as about to be written
+    on one footing (numbers, timestamps or text) so equal values hash equal.
+    """
+    types = pd.api.types
+    if any(types.is_bool_dtype(s) or types.is_numeric_dtype(s) for s in (prev, new)):
+        def conv(s):
+            return pd.to_numeric(s.astype("object"), errors="coerce").astype("float64").round(9)
+    elif any(types.is_datetime64_any_dtype(s) for s in (prev, new)):
+        def conv(s):
+            out = pd.to_datetime(s, errors="coerce", utc=True)
+            # One unit for both sides: equal instants in [s] and [ns] hash differently.
+            return out.dt.tz_convert(None).astype("datetime64[ns]")
+    else:
+        def conv(s):
+            return s.astype("string").fillna("\0")
+    return conv(prev).reset_index(drop=True), conv(new).reset_index(drop=True)
+
+
+def _row_hashes(prev: pd.DataFrame, new: pd.DataFrame, columns: list[str]) -> tuple[pd.Series, pd.Series]:
+    pairs = {c: _comparable(prev[c], new[c]) for c in columns}
+    prev_cmp = pd.DataFrame({c: p for c, (p, _) in pairs.items()}, index=range(len(prev)))
+    new_cmp = pd.DataFrame({c: n for c, (_, n) in pairs.items()}, index=range(len(new)))
+    return (
+        pd.util.hash_pandas_object(prev_cmp, index=False),
+        pd.util.hash_pandas_object(new_cmp, index=False),
+    )
+
+
+def _delete_keys(conn, schema: str, table: str, keys: pd.DataFrame, *, batch_size: int) -> None:
+    """DELETE the rows whose (key columns) tuple is in `keys`, a batch of row values at a time."""
+    cols = _column_list(keys)
+    width = keys.shape[1]
+    rows = [tuple(v.item() if hasattr(v, "item") else v for v in row) for row in keys.itertuples(index=False)]
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        values = ", ".join(
+            "(" + ", ".join(f":k{i}_{j}" for j in range(width)) + ")" for i in range(len(batch))
+        )
+        params = {f"k{i}_{j}": v for i, row in enumerate(batch) for j, v in enumerate(row)}
+        conn.execute(text(f"DELETE FROM {_qualified(schema, table)} WHERE ({cols}) IN (VALUES {values})"), params)
+
+
+def write_table_diff(
+    df: pd.DataFrame,
+    schema: str,
+    table: str,
+    key_columns,
+    *,
+    target: str | None = None,
+    batch_size: int = 300,
+) -> dict:
+    """
+    Bring `target` (default `table`) to the content of `df` by writing only
+    the rows that differ from the live `table`. Rows are matched on
+    `key_columns` plus KEY_LINE_COLUMN, which is stored with the table;
+    changed and removed keys are deleted and new/changed rows appended.
+    A table with no previous copy, different columns or null keys is
+    rewritten in full. Returns inserted/updated/deleted/unchanged counts.
+    """
+    target = target or table
+    keys = [*key_columns, KEY_LINE_COLUMN]
+    new = _prepare_for_db(with_key_lines(df, key_columns)).reset_index(drop=True)
+    prev = read_table_if_exists(schema, table)
+
+    full = (
+        prev.empty
+        or set(prev.columns) != set(new.columns)
+        or new[keys].isna().any().any()
+        or prev[keys].isna().any().any()
+        or prev.duplicated(keys).any()
+    )
+    if full:
+        write_to_db(new, schema=schema, table=target)
+        return {"inserted": len(new), "updated": 0, "deleted": len(prev), "unchanged": 0, "full_rewrite": True}
+
+    prev_hash, new_hash = _row_hashes(prev, new, [c for c in new.columns if c not in keys])
+    left = prev[keys].astype({KEY_LINE_COLUMN: "int64"}).reset_index(drop=True).assign(_prev_hash=prev_hash.to_numpy())
+    right = new[keys].assign(_new_hash=new_hash.to_numpy(), _row=range(len(new)))
+    for c in key_columns:
+        left[c] = left[c].astype(str)
+        right[c] = right[c].astype(str)
+    merged = left.merge(right, on=keys, how="outer", indicator=True)
+
+    both = merged["_merge"].eq("both")
+    updated = both & merged["_prev_hash"].ne(merged["_new_hash"])
+    inserted = merged["_merge"].eq("right_only")
+    deleted = merged["_merge"].eq("left_only")
+
+    stale = merged.loc[updated | deleted, keys].astype({KEY_LINE_COLUMN: "int64"})
+    rows = new.iloc[merged.loc[updated | inserted, "_row"].astype("int64").sort_values().to_numpy()]
+
+    if target != table:
+        clone_table(schema, table, target)
+    with engine().begin() as conn:
+        _delete_keys(conn, schema, target, stale, batch_size=batch_size)
+        append_rows(conn, rows, schema, target)
+    return {
+        "inserted": int(inserted.sum()),
+        "updated": int(updated.sum()),
+        "deleted": int(deleted.sum()),
+        "unchanged": int((both & ~updated).sum()),
+        "full_rewrite": False,
+    }
+
+
+def _ensure_runs_table(conn, schema: str, runs_table: str) -> None:
+    conn.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {_qualified(schema, runs_table)} "
+        "(version BIGINT, run_id TEXT, published_at TIMESTAMP, tables TEXT, row_counts TEXT)"
+    )
+
+
+def publish_tables(
+    schema: str,
+    tables: list[str],
+    *,
+    run_id: str,
+    runs_table: str,
+    row_counts: dict[str, int] | None = None,
+) -> int:
+    """
+    Swap every staged `<table>__staging` into place and append a row to
+    `runs_table`, all in one transaction, so readers see either the previous
+    run's tables or this run's. Returns the new version number.
+    """
+    eng = engine()
+    with eng.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            # pysqlite only opens a transaction before DML; DDL would autocommit otherwise.
+            conn.exec_driver_sql("BEGIN")
+        _ensure_runs_table(conn, schema, runs_table)
+        current = conn.execute(text(f"SELECT MAX(version) FROM {_qualified(schema, runs_table)}")).scalar()
+        version = int(current or 0) + 1
+        for table in tables:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {_qualified(schema, table)}")
+            conn.exec_driver_sql(f'ALTER TABLE {_qualified(schema, staging_table(table))} RENAME TO "{table}"')
+        conn.execute(
+            text(
+                f"INSERT INTO {_qualified(schema, runs_table)} (version, run_id, published_at, tables, row_counts) "
+                "VALUES (:version, :run_id, :published_at, :tables, :row_counts)"
+            ),
+            {
+                "version": version,
+                "run_id": run_id,
+                "published_at": datetime.now(),
+                "tables": json.dumps(list(tables)),
+                "row_counts": json.dumps(row_counts or {}, sort_keys=True),
+            },
+        )
+    return version
+
+
+def read_published_run(schema: str, runs_table: str, *, con=None) -> dict | None:
+    """Latest row of `runs_table` as a dict, or None if nothing was published yet."""
+    query = text(
+        f"SELECT version, run_id, published_at FROM {_qualified(schema, runs_table)} ORDER BY version DESC LIMIT 1"
+    )
+    try:
+        with (con or engine()).connect() as conn:
+            row = conn.execute(query).mappings().first()
+    except Exception:
+        return None
+    return dict(row) if row is not None else None
+
+
 def write_final_sales_order_to_gsheet(
     df: pd.DataFrame,
     *,
@@ -348,8 +681,18 @@ def save_not_assigned_so(
 
 
 __all__ = [
+    "STAGING_SUFFIX",
+    "append_rows",
+    "clone_table",
+    "ensure_schema",
+    "publish_tables",
+    "read_published_run",
     "read_table_if_exists",
+    "replace_item_rows",
     "save_not_assigned_so",
+    "staging_table",
+    "with_key_lines",
     "write_final_sales_order_to_gsheet",
+    "write_table_diff",
     "write_to_db",
 ]
@@ -10,13 +10,30 @@ from erp_system.runtime.db_config import get_engine
 from erp_system.transform.sales_order import normalize_wo_number
 
 from ._helpers import read_excel_safe
+from .excel_reader import read_excel_fast
+from .typed_csv import POD_CSV_SCHEMA, SALES_ORDER_CSV_SCHEMA, read_typed_csv
+
+
+# Shipping schedule columns used by validate_input_tables and transform_shipping;
+# the rest of the (growing) workbook is never materialized.
+SHIPPING_SCHEDULE_COLUMNS = (
+    "Ship to",
+    "SO NO.",
+    "Customer PO No.",
+    "Model Name",
+    "Ship Date",
+    "Order Qty",
+    "Confirmed Qty",
+    "Description",
+    "Reference",
+)
 
 
 def extract_inputs():
-    df_sales_order = pd.read_csv(str(SALES_ORDER_FILE), encoding="ISO-8859-1", engine="python")
+    df_sales_order = read_typed_csv(SALES_ORDER_FILE, SALES_ORDER_CSV_SCHEMA)
     inventory_df = pd.read_csv(str(WAREHOUSE_INV_FILE), encoding="cp1252")
-    df_shipping_schedule = read_excel_safe(SHIPPING_SCHEDULE_FILE)
-    df_pod = pd.read_csv(str(POD_FILE), encoding="ISO-8859-1", engine="python")
+    df_shipping_schedule = read_excel_fast(SHIPPING_SCHEDULE_FILE, columns=SHIPPING_SCHEDULE_COLUMNS)
+    df_pod = read_typed_csv(POD_FILE, POD_CSV_SCHEMA)
     return df_sales_order, inventory_df, df_shipping_schedule, df_pod
 
 
@@ -77,6 +94,7 @@ def fetch_pdf_orders_df_from_DB() -> pd.DataFrame:
 
 
 __all__ = [
+    "SHIPPING_SCHEDULE_COLUMNS",
     "extract_inputs",
     "fetch_pdf_orders_df_from_DB",
     "fetch_word_files_df",
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    FAST_CSV_ENGINES: tuple[str, ...] = ("pyarrow", "c")
+except ImportError:
+    FAST_CSV_ENGINES = ("c",)
+
+
+@dataclass(frozen=True)
+class CsvSchema:
+    """
+    Column types of a QuickBooks CSV export. Declared columns are read as
+    text and converted once here (numbers may carry thousands separators,
+    dates are M/D/Y); undeclared columns keep the engine's inference.
+    Declared columns missing from a file are ignored.
+    """
+
+    encoding: str
+    numbers: tuple[str, ...] = ()
+    dates: tuple[str, ...] = ()
+    strings: tuple[str, ...] = ()
+    date_format: str = "%m/%d/%Y"
+
+    def text_columns(self, columns) -> dict[str, type]:
+        declared = {*self.numbers, *self.dates, *self.strings}
+        return {c: str for c in columns if c in declared}
+
+
+SALES_ORDER_CSV_SCHEMA = CsvSchema(
+    encoding="ISO-8859-1",
+    numbers=("Qty", "Backordered", "Amount", "Open Balance"),
+    dates=("Date", "Ship Date"),
+    strings=("Unnamed: 0", "Type", "Num", "P. O. #", "Name", "Terms", "Memo", "Item", "Inventory Site"),
+)
+
+POD_CSV_SCHEMA = CsvSchema(
+    encoding="ISO-8859-1",
+    numbers=("Qty", "Rcv'd", "Backordered", "Amount", "Open Balance"),
+    dates=("Date", "Deliv Date"),
+    strings=("Unnamed: 0", "Type", "Num", "Name", "Memo", "Inventory Site", "Source Name"),
+)
+
+
+def _to_number(s: pd.Series) -> pd.Series:
+    cleaned = s.astype(str).str.replace(",", "", regex=False).str.replace("$", "", regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64")
+
+
+def _to_date(s: pd.Series, date_format: str) -> pd.Series:
+    out = pd.to_datetime(s, format=date_format, errors="coerce")
+    rest = out.isna() & s.notna()
+    if rest.any():
+        out.loc[rest] = pd.to_datetime(s.loc[rest], format="mixed", errors="coerce")
+    return out
+
+
+def apply_csv_schema(df: pd.DataFrame, schema: CsvSchema) -> pd.DataFrame:
+    """Convert declared columns to their final dtypes; text stays object with NaN for blanks."""
+    out = df.copy()
+    for c in schema.numbers:
+        if c in out.columns:
+            out[c] = _to_number(out[c])
+    for c in schema.dates:
+        if c in out.columns:
+            out[c] = _to_date(out[c], schema.date_format)
+    for c in schema.strings:
+        if c in out.columns:
+            out[c] = out[c].astype(object).where(out[c].notna(), np.nan)
+    return out
+
+
+def _make_bad_line_handler(path: str, width: int):
+    def handle(bad_line: list[str]) -> list[str] | None:
+        # QuickBooks rows with trailing empty cells are kept; anything else is dropped and logged.
+        if all(not str(v).strip() for v in bad_line[width:]):
+            return bad_line[:width]
+        logging.warning("Dropping malformed row in %s: %s", path, bad_line)
+        return None
+
+    return handle
+
+
+def read_typed_csv(path: str | Path, schema: CsvSchema) -> pd.DataFrame:
+    """
+    Read a CSV export with the fastest engine that parses it (pyarrow, then
+    C), falling back to the python engine, which trims or drops malformed
+    rows instead of failing, then apply `schema`.
+    """
+    path = str(path)
+    columns = pd.read_csv(path, encoding=schema.encoding, nrows=0).columns
+    dtype = schema.text_columns(columns)
+    for engine in FAST_CSV_ENGINES:
+        try:
+            df = pd.read_csv(path, encoding=schema.encoding, engine=engine, dtype=dtype)
+            break
+        except (pd.errors.ParserError, ValueError) as exc:
+            logging.info("%s engine could not parse %s (%s); trying the next engine", engine, path, exc)
+    else:
+        df = pd.read_csv(
+            path,
+            encoding=schema.encoding,
+            engine="python",
+            dtype=dtype,
+            on_bad_lines=_make_bad_line_handler(path, len(columns)),
+        )
+    return apply_csv_schema(df, schema)
+
+
+__all__ = [
+    "FAST_CSV_ENGINES",
+    "POD_CSV_SCHEMA",
+    "SALES_ORDER_CSV_SCHEMA",
+    "CsvSchema",
+    "apply_csv_schema",
+    "read_typed_csv",
+]
@@ -1,4 +1,8 @@
 from .assignment_readiness import *  # noqa: F401,F403
 from .atp import *  # noqa: F401,F403
+from .backtest import *  # noqa: F401,F403
+from .engine import *  # noqa: F401,F403
 from .events import *  # noqa: F401,F403
+from .incremental import *  # noqa: F401,F403
 from .ledger import *  # noqa: F401,F403
+from .scenario import *  # noqa: F401,F403
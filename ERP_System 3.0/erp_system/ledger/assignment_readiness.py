@@ -1,17 +1,18 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
 from erp_system.contracts import TABLE_CONTRACTS, ensure_contract_columns
-from erp_system.ledger.atp import earliest_atp_strict
-from erp_system.normalize.erp_normalize import normalize_item
+from erp_system.normalize.erp_normalize import normalize_series
 from erp_system.runtime.constants import PLACEHOLDER_DATE
 from erp_system.transform.common import _norm_key
 
 
-def _normalize_item_key(item: str) -> str:
-    series = pd.Series([item], dtype="string").map(normalize_item)
-    return str(_norm_key(series).iloc[0])
+def _normalize_item_keys(items: pd.Series) -> pd.Series:
+    return _norm_key(normalize_series(items.astype("string")))
 
 
 def _assignment_cutoff_dates(cutoff_date: str | None = None) -> set[pd.Timestamp]:
@@ -20,134 +21,118 @@ def _assignment_cutoff_dates(cutoff_date: str | None = None) -> set[pd.Timestamp
     return {PLACEHOLDER_DATE.normalize()}
 
 
-def _build_adjusted_item_atp(
-    ledger: pd.DataFrame,
-    *,
-    qb_num: str,
-    item: str,
-    from_date: pd.Timestamp,
-) -> pd.DataFrame:
+@dataclass(frozen=True)
+class _ReadinessLedger:
     """
-    Build an ATP view for an existing SO item by removing that SO's own demand
-    rows from the ledger first, then recomputing projected NAV.
+    Ledger rows grouped once per normalized item for readiness checks.
+    Rows with no date and IN rows dated on/after the placeholder are already
+    dropped (an item may be left with no rows); rows of item `i` live at
+    `offsets[i]:offsets[i + 1]`, sorted by date in ledger order. `out_qb`
+    holds the QB Num code of OUT rows, else -1.
     """
-    led = ledger.copy()
-    if led.empty or "Delta" not in led.columns or "Date" not in led.columns:
-        return pd.DataFrame(columns=["Item", "Date", "Projected_NAV", "FutureMin_NAV"])
-
-    normalized_item = _normalize_item_key(item)
-    if "Item" not in led.columns:
-        raise ValueError("Required column 'Item' is missing from led")
-
-    mask_item = _norm_key(led["Item"]).astype(str) == normalized_item
-    item_df = led.loc[mask_item].copy()
-    if item_df.empty:
-        return pd.DataFrame(columns=["Item", "Date", "Projected_NAV", "FutureMin_NAV"])
-
-    opening_series = pd.to_numeric(item_df.get("Opening"), errors="coerce").dropna()
-    opening = float(opening_series.iloc[0]) if not opening_series.empty else 0.0
-
-    so_col = item_df.get("QB Num", pd.Series("", index=item_df.index)).astype(str)
-    kind_col = item_df.get("Kind", pd.Series("", index=item_df.index)).astype(str)
-    remove_mask = so_col.eq(str(qb_num)) & kind_col.eq("OUT")
-
-    adjusted = item_df.loc[~remove_mask].copy()
-    if adjusted.empty:
-        base = pd.DataFrame(
-            {
-                "Item_raw": [item],
-                "Item": [item],
-                "Date": [from_date],
-                "Projected_NAV": [opening],
-            }
-        )
-        base["FutureMin_NAV"] = base["Projected_NAV"]
-        return base[["Item", "Date", "Projected_NAV", "FutureMin_NAV"]]
-
-    adjusted["Date"] = pd.to_datetime(adjusted["Date"], errors="coerce")
-    adjusted["Delta"] = pd.to_numeric(adjusted["Delta"], errors="coerce").fillna(0.0)
-    adjusted = adjusted.loc[adjusted["Date"].notna()].copy()
-    kind_col = adjusted.get("Kind", pd.Series("", index=adjusted.index)).astype(str)
-    invalid_inbound = kind_col.eq("IN") & adjusted["Date"].ge(PLACEHOLDER_DATE)
-    adjusted = adjusted.loc[~invalid_inbound].copy()
-    if adjusted.empty:
-        base = pd.DataFrame(
-            {
-                "Item_raw": [item],
-                "Item": [item],
-                "Date": [from_date],
-                "Projected_NAV": [opening],
-            }
-        )
-        base["FutureMin_NAV"] = base["Projected_NAV"]
-        return base[["Item", "Date", "Projected_NAV", "FutureMin_NAV"]]
-
-    adjusted = adjusted.sort_values("Date", kind="mergesort").reset_index(drop=True)
-    adjusted["Projected_NAV"] = opening + adjusted["Delta"].cumsum()
-    projected = pd.to_numeric(adjusted["Projected_NAV"], errors="coerce").tolist()
-    future_min: list[float] = [0.0] * len(projected)
-    current_min = float("inf")
-    for idx in range(len(projected) - 1, -1, -1):
-        value = projected[idx]
-        if pd.notna(value):
-            current_min = min(current_min, float(value))
-        future_min[idx] = current_min
-
-    item_name = str(adjusted["Item"].iloc[0])
-    return pd.DataFrame(
-        {
-            "Item": item_name,
-            "Date": adjusted["Date"].tolist(),
-            "Projected_NAV": projected,
-            "FutureMin_NAV": future_min,
-        }
+
+    items: pd.Index
+    offsets: np.ndarray
+    opening: np.ndarray
+    dates: np.ndarray
+    delta: np.ndarray
+    out_qb: np.ndarray
+    qb_codes: pd.Index
+
+
+def _prepare_readiness_ledger(ledger: pd.DataFrame) -> _ReadinessLedger:
+    led = ledger.reset_index(drop=True)
+    key = _norm_key(led["Item"]).astype(str)
+    codes, items = pd.factorize(key, sort=True)
+    opening = pd.to_numeric(led["Opening"], errors="coerce") if "Opening" in led.columns else pd.Series(np.nan, index=led.index)
+    opening_by_item = opening.groupby(codes).first().reindex(range(len(items)))
+
+    dates = pd.to_datetime(led["Date"], errors="coerce")
+    kind = led["Kind"].astype(str) if "Kind" in led.columns else pd.Series("", index=led.index)
+    qb = led["QB Num"].astype(str) if "QB Num" in led.columns else pd.Series("", index=led.index)
+    keep = dates.notna() & ~(kind.eq("IN") & dates.ge(PLACEHOLDER_DATE))
+
+    codes = codes[keep.to_numpy()]
+    row_dates = dates[keep].to_numpy(dtype="datetime64[ns]")
+    order = np.lexsort((row_dates, codes))
+    qb_codes, qb_vocab = pd.factorize(qb[keep])
+    out_qb = np.where(kind[keep].eq("OUT").to_numpy(), qb_codes, -1)
+    return _ReadinessLedger(
+        items=pd.Index(items),
+        offsets=np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(items))))).astype(np.int64),
+        opening=opening_by_item.fillna(0.0).to_numpy(dtype=np.float64),
+        dates=row_dates[order],
+        delta=pd.to_numeric(led.loc[keep, "Delta"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)[order],
+        out_qb=out_qb[order],
+        qb_codes=pd.Index(qb_vocab),
     )
 
 
-def _earliest_assignment_date_for_mode(
-    ledger: pd.DataFrame,
+def _earliest_dates_for_item(
+    rows: _ReadinessLedger,
+    pos: int,
+    *,
+    pair_qb: np.ndarray,
+    qty: np.ndarray,
+    cutoff: np.ndarray,
+    from_date: np.datetime64,
+    include_cutoff_in_check: bool,
+    max_cells: int = 4_000_000,
+) -> np.ndarray:
+    """
+    Earliest assignment date for k (SO, qty) pairs on one item at once.
+    Each pair drops its own SO's OUT rows, re-runs projected NAV and its suffix
+    min over rows up to the cutoff, then takes the first date >= from_date
+    (and before the cutoff) whose future min covers the qty.
+    """
+    lo, hi = int(rows.offsets[pos]), int(rows.offsets[pos + 1])
+    dates, delta, out_qb = rows.dates[lo:hi], rows.delta[lo:hi], rows.out_qb[lo:hi]
+    opening = float(rows.opening[pos])
+    # Nothing left once the SO's own demand is removed: the opening balance decides.
+    result = np.where((from_date < cutoff) & (opening >= qty), from_date, np.datetime64("NaT")).astype("datetime64[ns]")
+    if dates.size == 0:
+        return result
+    step = max(1, max_cells // dates.size)
+    for start in range(0, pair_qb.size, step):
+        sl = slice(start, start + step)
+        keep = out_qb[None, :] != pair_qb[sl, None]
+        nav = opening + np.cumsum(np.where(keep, delta[None, :], 0.0), axis=1)
+        cut = cutoff[sl, None]
+        in_scope = keep & ((dates[None, :] <= cut) if include_cutoff_in_check else (dates[None, :] < cut))
+        future_min = np.minimum.accumulate(np.where(in_scope, nav, np.inf)[:, ::-1], axis=1)[:, ::-1]
+        ok = in_scope & (dates[None, :] < cut) & (dates[None, :] >= from_date) & (future_min >= qty[sl, None])
+        found = np.where(ok.any(axis=1), dates[ok.argmax(axis=1)], np.datetime64("NaT"))
+        result[sl] = np.where(keep.any(axis=1), found, result[sl])
+    return result
+
+
+def _earliest_assignment_dates(
+    rows: _ReadinessLedger,
+    pairs: pd.DataFrame,
     *,
-    qb_num: str,
-    item: str,
-    qty: float,
     from_date: pd.Timestamp,
-    cutoff: pd.Timestamp,
     include_cutoff_in_check: bool,
-) -> pd.Timestamp | None:
-    adj_atp = _build_adjusted_item_atp(ledger, qb_num=qb_num, item=item, from_date=from_date)
-    if adj_atp.empty:
-        return None
-
-    date_series = pd.to_datetime(adj_atp["Date"], errors="coerce")
-    if include_cutoff_in_check:
-        scoped = adj_atp.loc[date_series <= cutoff].copy()
-    else:
-        scoped = adj_atp.loc[date_series < cutoff].copy()
-    if scoped.empty:
-        return None
-
-    scoped["Date"] = pd.to_datetime(scoped["Date"], errors="coerce")
-    scoped["Projected_NAV"] = pd.to_numeric(scoped["Projected_NAV"], errors="coerce")
-    projected = scoped["Projected_NAV"].tolist()
-    future_min: list[float] = [0.0] * len(projected)
-    current_min = float("inf")
-    for idx in range(len(projected) - 1, -1, -1):
-        value = projected[idx]
-        if pd.notna(value):
-            current_min = min(current_min, float(value))
-        future_min[idx] = current_min
-    scoped["FutureMin_NAV"] = future_min
-
-    candidates = scoped.loc[scoped["Date"] < cutoff].copy()
-    if candidates.empty:
-        return None
-    return earliest_atp_strict(
-        candidates[["Item", "Date", "Projected_NAV", "FutureMin_NAV"]],
-        _normalize_item_key(item),
-        qty,
-        from_date=from_date,
-        allow_zero=True,
-    )
+) -> np.ndarray:
+    """Vectorized per item over `pairs` (`QB Num`, `Item_key`, `Qty`, `Cutoff`)."""
+    result = np.full(len(pairs), np.datetime64("NaT"), dtype="datetime64[ns]")
+    pair_pos = rows.items.get_indexer(pairs["Item_key"])
+    pair_qb = rows.qb_codes.get_indexer(pairs["QB Num"])
+    pair_qb = np.where(pair_qb < 0, -2, pair_qb)
+    qty = pairs["Qty"].to_numpy(dtype=np.float64)
+    cutoff = pairs["Cutoff"].to_numpy(dtype="datetime64[ns]")
+    start = from_date.to_datetime64()
+    for pos in np.unique(pair_pos[pair_pos >= 0]):
+        idx = np.flatnonzero(pair_pos == pos)
+        result[idx] = _earliest_dates_for_item(
+            rows,
+            int(pos),
+            pair_qb=pair_qb[idx],
+            qty=qty[idx],
+            cutoff=cutoff[idx],
+            from_date=start,
+            include_cutoff_in_check=include_cutoff_in_check,
+        )
+    return result
 
 
 def _build_assignment_readiness_for_mode(
@@ -157,6 +142,7 @@ def _build_assignment_readiness_for_mode(
     from_date: pd.Timestamp | None = None,
     cutoff_date: str | None = None,
     mode: str = "loose",
+    prepared: _ReadinessLedger | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     summary_cols = [
         "QB Num",
@@ -213,112 +199,73 @@ def _build_assignment_readiness_for_mode(
     if pending.empty:
         return pd.DataFrame(columns=summary_cols), pd.DataFrame(columns=blocker_cols)
 
-    summary_rows: list[dict[str, object]] = []
-    blocker_rows: list[dict[str, object]] = []
-
-    for qb_num, grp in pending.groupby("QB Num", sort=True):
-        group_cutoffs = sorted(pd.to_datetime(grp["Ship Date"], errors="coerce").dropna().unique())
-        cutoff = pd.Timestamp(group_cutoffs[0]).normalize()
-        current_ship_date = ", ".join(pd.Timestamp(dt).strftime("%Y-%m-%d") for dt in group_cutoffs)
-        demands_df = grp.groupby("Item", as_index=False)["Qty(-)"].sum().sort_values("Item", kind="mergesort")
-        demand_map = {str(r["Item"]): float(r["Qty(-)"]) for _, r in demands_df.iterrows()}
-        first = grp.iloc[0]
-
-        item_dates: dict[str, pd.Timestamp] = {}
-        for item, qty in demand_map.items():
-            dt = _earliest_assignment_date_for_mode(
-                ledger,
-                qb_num=str(qb_num),
-                item=item,
-                qty=qty,
-                from_date=start_date,
-                cutoff=cutoff,
-                include_cutoff_in_check=include_cutoff_in_check,
-            )
-            if dt is not None:
-                item_dates[item] = dt
-
-        blocking_items: list[str] = []
-        for item, qty in demand_map.items():
-            dt = item_dates.get(item)
-            if dt is None:
-                blocking_items.append(item)
-                blocker_rows.append(
-                    {
-                        "QB Num": str(qb_num),
-                        "Name": str(first.get("Name") or ""),
-                        "P. O. #": str(first.get("P. O. #") or ""),
-                        "Order Date": first["Order Date"].strftime("%Y-%m-%d") if pd.notna(first["Order Date"]) else "",
-                        "Current Ship Date": current_ship_date,
-                        "Item": item,
-                        "Required Qty": qty,
-                        "Earliest Feasible Date": None,
-                        "Block Reason": (
-                            "No feasible ATP date after removing this SO's placeholder demand"
-                            if not include_cutoff_in_check
-                            else "No feasible ATP date before placeholder date under strict check"
-                        ),
-                    }
-                )
-            elif dt > cutoff:
-                blocking_items.append(item)
-                blocker_rows.append(
-                    {
-                        "QB Num": str(qb_num),
-                        "Name": str(first.get("Name") or ""),
-                        "P. O. #": str(first.get("P. O. #") or ""),
-                        "Order Date": first["Order Date"].strftime("%Y-%m-%d") if pd.notna(first["Order Date"]) else "",
-                        "Current Ship Date": current_ship_date,
-                        "Item": item,
-                        "Required Qty": qty,
-                        "Earliest Feasible Date": dt.strftime("%Y-%m-%d"),
-                        "Block Reason": "Feasible only after placeholder date",
-                    }
-                )
-
-        ready_dt = None
-        if item_dates:
-            adjusted_dates = {item: item_dates[item] for item in demand_map.keys() if item in item_dates}
-            if len(adjusted_dates) == len(demand_map):
-                ready_dt = max(adjusted_dates.values()) if adjusted_dates else None
-
-        is_ready = ready_dt is not None and ready_dt <= cutoff and not blocking_items
-
-        waiting_items = sorted(
-            set(
-                grp.loc[grp["Component_Status"].isin(["Waiting", "Shortage"]), "Item"]
-                .dropna()
-                .astype(str)
-                .str.strip()
-                .loc[lambda s: s.ne("")]
-                .tolist()
-            )
-        )
-
-        summary_rows.append(
-            {
-                "QB Num": str(qb_num),
-                "Name": str(first.get("Name") or ""),
-                "P. O. #": str(first.get("P. O. #") or ""),
-                "Order Date": first["Order Date"].strftime("%Y-%m-%d") if pd.notna(first["Order Date"]) else "",
-                "Current Ship Date": current_ship_date,
-                "Item Count": int(len(demand_map)),
-                "Ready to be assigned": bool(is_ready),
-                "Earliest Ready Date": ready_dt.strftime("%Y-%m-%d") if ready_dt is not None else None,
-                "Blocking Item Count": int(len(blocking_items)),
-                "Blocking Items": ", ".join(sorted(blocking_items)),
-                "Waiting / Shortage Items": ", ".join(waiting_items),
-            }
-        )
+    first = pending.drop_duplicates("QB Num").set_index("QB Num")
+    orders = pd.DataFrame(
+        {
+            "Name": first["Name"].fillna("").astype(str),
+            "P. O. #": first["P. O. #"].fillna("").astype(str),
+            "Order Date": first["Order Date"].dt.strftime("%Y-%m-%d").fillna(""),
+        }
+    )
+    ship_dates = pending.drop_duplicates(["QB Num", "Ship Date"]).sort_values(["QB Num", "Ship Date"], kind="mergesort")
+    orders["Current Ship Date"] = ship_dates.groupby("QB Num")["Ship Date"].agg(
+        lambda s: ", ".join(s.dt.strftime("%Y-%m-%d"))
+    )
+    orders["Cutoff"] = ship_dates.groupby("QB Num")["Ship Date"].min()
+
+    pairs = pending.groupby(["QB Num", "Item"], sort=True)["Qty(-)"].sum().rename("Qty").reset_index()
+    pairs["Item_key"] = _normalize_item_keys(pairs["Item"])
+    pairs["Cutoff"] = pairs["QB Num"].map(orders["Cutoff"])
+    rows = _prepare_readiness_ledger(ledger) if prepared is None else prepared
+    pairs["Date"] = _earliest_assignment_dates(
+        rows, pairs, from_date=start_date, include_cutoff_in_check=include_cutoff_in_check
+    )
+    missing = pairs["Date"].isna()
+    late = pairs["Date"].gt(pairs["Cutoff"])
+
+    blocker_df = pairs.loc[missing | late].join(orders.drop(columns="Cutoff"), on="QB Num")
+    blocker_df = blocker_df.rename(columns={"Qty": "Required Qty"})
+    blocker_df["Earliest Feasible Date"] = blocker_df["Date"].dt.strftime("%Y-%m-%d").astype(object)
+    blocker_df["Earliest Feasible Date"] = blocker_df["Earliest Feasible Date"].where(blocker_df["Date"].notna(), None)
+    blocker_df["Block Reason"] = np.where(
+        blocker_df["Date"].isna(),
+        (
+            "No feasible ATP date after removing this SO's placeholder demand"
+            if not include_cutoff_in_check
+            else "No feasible ATP date before placeholder date under strict check"
+        ),
+        "Feasible only after placeholder date",
+    )
+    blocker_df = blocker_df[blocker_cols]
+
+    per_so = pairs.assign(Missing=missing, Blocking=missing | late).groupby("QB Num", sort=True)
+    ready_dt = per_so["Date"].max().where(~per_so["Missing"].any())
+    blocking_count = per_so["Blocking"].sum().astype(int)
+    blocking_items = pairs.loc[missing | late].groupby("QB Num")["Item"].agg(", ".join)
+    waiting = pending.loc[pending["Component_Status"].isin(["Waiting", "Shortage"])]
+    waiting_items = (
+        waiting.drop_duplicates(["QB Num", "Item"])
+        .sort_values(["QB Num", "Item"], kind="mergesort")
+        .groupby("QB Num")["Item"]
+        .agg(", ".join)
+    )
 
-    summary_df = pd.DataFrame(summary_rows, columns=summary_cols).sort_values(
+    summary_df = orders.drop(columns="Cutoff").reindex(ready_dt.index)
+    summary_df["Item Count"] = per_so.size().astype(int)
+    summary_df["Ready to be assigned"] = (ready_dt.le(orders["Cutoff"].reindex(ready_dt.index)) & blocking_count.eq(0)).astype(bool)
+    ready_str = ready_dt.dt.strftime("%Y-%m-%d").astype(object)
+    summary_df["Earliest Ready Date"] = ready_str.where(ready_dt.notna(), None)
+    summary_df["Blocking Item Count"] = blocking_count
+    summary_df["Blocking Items"] = blocking_items.reindex(ready_dt.index).fillna("")
+    summary_df["Waiting / Shortage Items"] = waiting_items.reindex(ready_dt.index).fillna("")
+    summary_df = summary_df.rename_axis("QB Num").reset_index()[summary_cols]
+
+    summary_df = summary_df.sort_values(
         ["Ready to be assigned", "Earliest Ready Date", "QB Num"],
         ascending=[False, True, True],
         kind="mergesort",
     )
-    blocker_df = pd.DataFrame(blocker_rows, columns=blocker_cols).sort_values(
-        ["QB Num", "Item"], kind="mergesort"
-    )
+    blocker_df = blocker_df.sort_values(["QB Num", "Item"], kind="mergesort")
     return summary_df.reset_index(drop=True), blocker_df.reset_index(drop=True)
 
 
@@ -349,6 +296,7 @@ def build_assignment_run_tables(
     run_ts = pd.Timestamp.now() if run_ts is None else pd.to_datetime(run_ts)
     run_id = run_ts.strftime("run_%Y%m%d_%H%M%S")
     run_rows: list[pd.DataFrame] = []
+    prepared = _prepare_readiness_ledger(ledger) if ledger is not None and not ledger.empty else None
 
     for mode in ("strict", "loose"):
         summary_df, blocker_df = _build_assignment_readiness_for_mode(
@@ -357,6 +305,7 @@ def build_assignment_run_tables(
             from_date=from_date,
             cutoff_date=cutoff_date,
             mode=mode,
+            prepared=prepared,
         )
 
         run_df = summary_df.rename(
@@ -1,7 +1,50 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import numpy as np
 import pandas as pd
 
+from .engine import segment_suffix_min
+
+
+ATP_VIEW_COLUMNS = ["Item", "Date", "Projected_NAV", "FutureMin_NAV"]
+
+
+def _atp_view_frame(ledger: pd.DataFrame) -> pd.DataFrame:
+    """
+    (Item, Date)-sorted ATP rows with FutureMin_NAV, the backward cumulative
+    min of Projected_NAV per item. Works on factorized item codes so the
+    ledger is never copied or sorted as a whole.
+    """
+    item_col = "Item_raw" if "Item_raw" in ledger.columns else "Item"
+    if item_col not in ledger.columns or "Date" not in ledger.columns or "Projected_NAV" not in ledger.columns:
+        raise ValueError("ledger must contain 'Item' (or 'Item_raw'), 'Date', and 'Projected_NAV' columns.")
+
+    codes, uniques = pd.factorize(ledger[item_col], sort=True)
+    dates = pd.to_datetime(ledger["Date"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    nav = pd.to_numeric(ledger["Projected_NAV"], errors="coerce").to_numpy(dtype=np.float64)
+
+    # Drop missing Item/Date and pseudo "Total ..." rollups (checked once per distinct item)
+    is_total = np.asarray(pd.Index(uniques).astype(str).str.startswith("Total "), dtype=bool)
+    keep = (codes >= 0) & ~np.isnat(dates)
+    keep[keep] = ~is_total[codes[keep]]
+    codes, dates, nav = codes[keep], dates[keep], nav[keep]
+
+    order = np.lexsort((dates, codes))
+    codes, dates, nav = codes[order], dates[order], nav[order]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(uniques))))).astype(np.int64)
+    return pd.DataFrame(
+        {
+            "Item": uniques.take(codes),
+            "Date": dates,
+            "Projected_NAV": nav,
+            "FutureMin_NAV": segment_suffix_min(nav, offsets),
+        }
+    )
+
 
 def build_atp_view(ledger: pd.DataFrame) -> pd.DataFrame:
     """
@@ -22,53 +65,241 @@ def build_atp_view(ledger: pd.DataFrame) -> pd.DataFrame:
     Pseudo-items whose name starts with 'Total ' are excluded.
     """
     if ledger is None or ledger.empty:
-        return pd.DataFrame(columns=["Item", "Date", "Projected_NAV", "FutureMin_NAV"])
+        return pd.DataFrame(columns=ATP_VIEW_COLUMNS)
+    return _atp_view_frame(ledger)
 
-    df = ledger.copy()
 
-    # Basic hygiene
-    item_col = "Item_raw" if "Item_raw" in df.columns else "Item"
-    if item_col not in df.columns or "Date" not in df.columns or "Projected_NAV" not in df.columns:
+def iter_atp_view_chunks(ledger: pd.DataFrame, *, items_per_chunk: int = 5000) -> Iterator[pd.DataFrame]:
+    """
+    Yield `build_atp_view(ledger)` in item-ordered pieces of at most
+    `items_per_chunk` items, without copying the whole ledger at once.
+    Concatenating the chunks gives the same frame as `build_atp_view`.
+    """
+    if ledger is None or ledger.empty:
+        return
+    if items_per_chunk < 1:
+        raise ValueError("items_per_chunk must be >= 1")
+    item_col = "Item_raw" if "Item_raw" in ledger.columns else "Item"
+    columns = ledger.columns.get_indexer([item_col, "Date", "Projected_NAV"])
+    if (columns < 0).any():
         raise ValueError("ledger must contain 'Item' (or 'Item_raw'), 'Date', and 'Projected_NAV' columns.")
 
-    if item_col != "Item":
-        df["Item"] = df[item_col]
+    codes, _ = pd.factorize(ledger[item_col], sort=True)
+    valid = np.flatnonzero(codes >= 0)
+    positions = valid[np.argsort(codes[valid], kind="stable")]
+    sorted_codes = codes[positions]
+    n_items = int(sorted_codes[-1]) + 1 if sorted_codes.size else 0
+    for first in range(0, n_items, items_per_chunk):
+        lo, hi = np.searchsorted(sorted_codes, [first, first + items_per_chunk])
+        chunk = _atp_view_frame(ledger.iloc[positions[lo:hi], columns])
+        if not chunk.empty:
+            yield chunk
+
 
-    df = df.loc[df["Item"].notna() & df["Date"].notna()].copy()
+def build_atp_view_chunked(ledger: pd.DataFrame, *, items_per_chunk: int = 5000) -> pd.DataFrame:
+    chunks = list(iter_atp_view_chunks(ledger, items_per_chunk=items_per_chunk))
+    if not chunks:
+        return pd.DataFrame(columns=ATP_VIEW_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
 
-    # Drop pseudo "Total ..." rollups
-    df = df.loc[~df["Item"].astype(str).str.startswith("Total ")].copy()
 
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df = df.loc[df["Date"].notna()].copy()
+def _from_date(value: object, today: pd.Timestamp) -> pd.Timestamp:
+    """One request's from_date, parsed on its own as `AtpIndex.earliest` does; missing means today."""
+    if value is None or (pd.api.types.is_scalar(value) and (pd.isna(value) or value == "")):
+        return today
+    try:
+        ts = pd.Timestamp(value).normalize()
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"from_date must be a date, got {value!r}.") from exc
+    return ts if ts.tzinfo is None else ts.tz_convert(None)
 
-    df["Projected_NAV"] = pd.to_numeric(df["Projected_NAV"], errors="coerce")
 
-    # Sort ascending by date, then compute backward cumulative min per item
-    df.sort_values(["Item", "Date"], inplace=True)
+@dataclass(frozen=True)
+class AtpIndex:
+    """
+    Per-item ATP lookup table built once from an `item_atp` view.
+    Rows of item `i` live at `offsets[i]:offsets[i + 1]`, sorted by date, with
+    `future_min` re-minimized from the right so it is nondecreasing per item.
+    Earliest-date queries are then two binary searches.
+    """
 
-    # Reverse within each item, run cumulative min, then flip back
-    def _future_min(group: pd.DataFrame) -> pd.Series:
-        vals = group["Projected_NAV"].values[::-1]
-        out = []
-        current_min = float("inf")
-        for v in vals:
-            if pd.isna(v):
-                current_min = min(current_min, float("inf"))
-            else:
-                current_min = min(current_min, float(v))
-            out.append(current_min)
-        out = out[::-1]
-        return pd.Series(out, index=group.index)
+    items: np.ndarray
+    offsets: np.ndarray
+    dates: np.ndarray
+    future_min: np.ndarray
+    _lookup: dict[str, int] = field(init=False, repr=False, compare=False)
 
-    df["FutureMin_NAV"] = df.groupby("Item", group_keys=False).apply(_future_min)
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_lookup", {str(item): i for i, item in enumerate(self.items)})
 
-    # Final column selection / ordering
-    atp_view = df.loc[:, ["Item", "Date", "Projected_NAV", "FutureMin_NAV"]].copy()
-    atp_view.sort_values(["Item", "Date"], inplace=True)
-    atp_view.reset_index(drop=True, inplace=True)
+    def __contains__(self, item: object) -> bool:
+        return str(item) in self._lookup
 
-    return atp_view
+    def __len__(self) -> int:
+        return int(self.items.size)
+
+    @classmethod
+    def from_atp_view(cls, atp_view: pd.DataFrame | None, *, item_col: str = "Item") -> AtpIndex:
+        """Index an ATP view (`Item`, `Date`, `FutureMin_NAV`); rows missing any of them are skipped."""
+        if atp_view is None or atp_view.empty or not {item_col, "Date", "FutureMin_NAV"}.issubset(atp_view.columns):
+            return cls(np.empty(0, dtype=object), np.zeros(1, dtype=np.int64), np.empty(0, dtype="datetime64[ns]"), np.empty(0))
+        item = atp_view[item_col]
+        dates = pd.to_datetime(atp_view["Date"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+        future_min = pd.to_numeric(atp_view["FutureMin_NAV"], errors="coerce").to_numpy(dtype=np.float64)
+        keep = item.notna().to_numpy() & ~np.isnat(dates) & ~np.isnan(future_min)
+
+        codes, items = pd.factorize(item.loc[keep].astype(str), sort=True)
+        order = np.lexsort((dates[keep], codes))
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(items))))).astype(np.int64)
+        return cls(
+            items=np.asarray(items, dtype=object),
+            offsets=offsets,
+            dates=dates[keep][order],
+            future_min=segment_suffix_min(future_min[keep][order], offsets),
+        )
+
+    def earliest(
+        self,
+        item: str,
+        qty: float,
+        from_date: pd.Timestamp | None = None,
+        *,
+        allow_zero: bool = True,
+    ) -> pd.Timestamp | None:
+        """Same answer as `earliest_atp_strict`, in O(log n) per call."""
+        pos = self._lookup.get(str(item))
+        if pos is None:
+            return None
+        from_date = pd.Timestamp.today().normalize() if from_date is None else pd.to_datetime(from_date).normalize()
+        lo, hi = int(self.offsets[pos]), int(self.offsets[pos + 1])
+        start = lo + int(np.searchsorted(self.dates[lo:hi], from_date.to_datetime64(), side="left"))
+        side = "left" if allow_zero else "right"
+        idx = start + int(np.searchsorted(self.future_min[start:hi], float(qty), side=side))
+        return None if idx >= hi else pd.Timestamp(self.dates[idx])
+
+    def earliest_for_items(
+        self,
+        demands: dict[str, float],
+        from_date: pd.Timestamp | None = None,
+        *,
+        allow_zero: bool = True,
+    ) -> pd.Timestamp | None:
+        """Latest of the per-item earliest dates, or None if any item has no feasible date."""
+        if not demands:
+            return None
+        from_date = pd.Timestamp.today().normalize() if from_date is None else pd.to_datetime(from_date).normalize()
+        latest: pd.Timestamp | None = None
+        for itm, qty in demands.items():
+            d = self.earliest(itm, qty, from_date, allow_zero=allow_zero)
+            if d is None:
+                return None
+            latest = d if latest is None else max(latest, d)
+        return latest
+
+    @cached_property
+    def _asof_tables(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Right-hand sides for `earliest_batch`: rows sorted by date, and by FutureMin_NAV."""
+        rows = pd.DataFrame(
+            {
+                "_code": np.repeat(np.arange(len(self)), np.diff(self.offsets)),
+                "_date": self.dates,
+                "_fm": self.future_min,
+            }
+        )
+        date_rows = rows.drop(columns="_fm").sort_values("_date", kind="stable")
+        # Keep the earliest row per (item, FutureMin_NAV) so ties resolve to the earliest date.
+        fm_rows = (
+            rows.drop_duplicates(subset=["_code", "_fm"], keep="first")
+            .sort_values("_fm", kind="stable")
+            .rename(columns={"_date": "_fm_date"})
+        )
+        return date_rows, fm_rows
+
+    def earliest_batch(self, requests: pd.DataFrame, *, allow_zero: bool = True) -> pd.DataFrame:
+        """
+        Vectorized `earliest` for a frame of requests (`item`, `qty`, optional
+        `from_date`, plus any id columns, which are passed through).
+        Returns the requests with an `earliest_date` column (NaT when infeasible).
+        Each from_date is parsed on its own, so a batch mixing date formats
+        answers like single lookups; an unparseable one raises ValueError.
+
+        Two forward as-of joins per item: the first row dated >= from_date, and
+        the first row with FutureMin_NAV >= qty (> qty when not `allow_zero`).
+        FutureMin_NAV is nondecreasing per item, so the answer is the later of
+        the two dates.
+        """
+        out = requests.copy()
+        today = pd.Timestamp.today().normalize()
+        if "from_date" in out.columns:
+            # Parsed per distinct value: to_datetime over the column infers one format
+            # and turns dates written any other way into NaT.
+            parsed: dict[object, pd.Timestamp] = {}
+            dates = []
+            for value in out["from_date"].tolist():
+                if not pd.api.types.is_hashable(value):
+                    dates.append(_from_date(value, today))
+                    continue
+                if value not in parsed:
+                    parsed[value] = _from_date(value, today)
+                dates.append(parsed[value])
+            from_date = pd.Series(dates, index=out.index, dtype="datetime64[ns]")
+        else:
+            from_date = pd.Series(today, index=out.index)
+        out["earliest_date"] = pd.Series(pd.NaT, index=out.index, dtype="datetime64[ns]")
+        if out.empty or len(self) == 0:
+            return out
+
+        code = pd.Index(self.items).get_indexer(out["item"].astype(str))
+        qty = pd.to_numeric(out["qty"], errors="coerce").to_numpy(dtype=np.float64)
+        valid = (code >= 0) & ~np.isnan(qty)
+        if not valid.any():
+            return out
+        req = pd.DataFrame(
+            {
+                "_row": np.flatnonzero(valid),
+                "_code": code[valid],
+                "_from": from_date.to_numpy(dtype="datetime64[ns]")[valid],
+                "_qty": qty[valid],
+            }
+        )
+        date_rows, fm_rows = self._asof_tables
+        by_date = pd.merge_asof(
+            req.sort_values("_from"),
+            date_rows,
+            left_on="_from",
+            right_on="_date",
+            by="_code",
+            direction="forward",
+        )
+        by_qty = pd.merge_asof(
+            req.sort_values("_qty"),
+            fm_rows,
+            left_on="_qty",
+            right_on="_fm",
+            by="_code",
+            direction="forward",
+            allow_exact_matches=allow_zero,
+        )
+        found = by_date.set_index("_row")["_date"].reindex(req["_row"]).to_numpy()
+        fm_found = by_qty.set_index("_row")["_fm_date"].reindex(req["_row"]).to_numpy()
+        earliest = np.where(np.isnat(found) | np.isnat(fm_found), np.datetime64("NaT"), np.maximum(found, fm_found))
+        out.iloc[req["_row"].to_numpy(), out.columns.get_loc("earliest_date")] = earliest
+        return out
+
+
+def earliest_atp_batch(
+    atp: AtpIndex | pd.DataFrame,
+    requests: pd.DataFrame,
+    *,
+    allow_zero: bool = True,
+) -> pd.DataFrame:
+    """
+    Earliest feasible dates for many (request_id, item, qty, from_date) rows
+    at once. `atp` is an `AtpIndex` or an `item_atp` view to index first.
+    """
+    if not isinstance(atp, AtpIndex):
+        atp = AtpIndex.from_atp_view(atp)
+    return atp.earliest_batch(requests, allow_zero=allow_zero)
 
 
 def earliest_atp_strict(
@@ -87,33 +318,13 @@ def earliest_atp_strict(
     Uses precomputed FutureMin_NAV:
       - If allow_zero is True: require FutureMin_NAV >= qty
       - Else:                  require FutureMin_NAV > qty
+
+    For repeated lookups build an `AtpIndex` once instead.
     """
     if atp_view is None or atp_view.empty:
         return None
-
-    if from_date is None:
-        from_date = pd.Timestamp.today().normalize()
-    else:
-        from_date = pd.to_datetime(from_date).normalize()
-
-    df = atp_view.copy()
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-
-    mask = (df["Item"].astype(str) == str(item)) & (df["Date"] >= from_date)
-    df_item = df.loc[mask, ["Date", "FutureMin_NAV"]].dropna(subset=["Date", "FutureMin_NAV"])
-    if df_item.empty:
-        return None
-
-    df_item["FutureMin_NAV"] = pd.to_numeric(df_item["FutureMin_NAV"], errors="coerce")
-    if allow_zero:
-        ok = df_item["FutureMin_NAV"] >= float(qty)
-    else:
-        ok = df_item["FutureMin_NAV"] > float(qty)
-
-    candidates = df_item.loc[ok, "Date"]
-    if candidates.empty:
-        return None
-    return candidates.min()
+    rows = atp_view.loc[atp_view["Item"].astype(str) == str(item), ["Item", "Date", "FutureMin_NAV"]]
+    return AtpIndex.from_atp_view(rows).earliest(item, qty, from_date, allow_zero=allow_zero)
 
 
 def earliest_atp_for_items_strict(
@@ -133,22 +344,8 @@ def earliest_atp_for_items_strict(
       - If any item has no feasible date -> return None.
       - Otherwise, return max of all item dates.
     """
-    if not demands:
-        return None
-
-    dates: list[pd.Timestamp] = []
-    for itm, qty in demands.items():
-        d = earliest_atp_strict(
-            atp_view=atp_view,
-            item=itm,
-            qty=qty,
-            from_date=from_date,
-            allow_zero=allow_zero,
-        )
-        if d is None:
-            return None
-        dates.append(d)
-
-    if not dates:
+    if not demands or atp_view is None or atp_view.empty:
         return None
-    return max(dates)
+    wanted = atp_view["Item"].astype(str).isin([str(itm) for itm in demands])
+    index = AtpIndex.from_atp_view(atp_view.loc[wanted, ["Item", "Date", "FutureMin_NAV"]])
+    return index.earliest_for_items(demands, from_date, allow_zero=allow_zero)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from erp_system.runtime.constants import PLACEHOLDER_DATE
+
+
+DEFAULT_HORIZONS = (7, 14, 28)
+BACKTEST_SOURCES = ("SO", "POD", "NAV")
+LEDGER_BACKTEST_COLUMNS = ["Item", "Date", "Source", "Delta", "Projected_NAV", "Opening"]
+INVENTORY_BACKTEST_COLUMNS = ["Part_Number", "On Hand"]
+BACKTEST_DETAIL_COLUMNS = [
+    "run_date",
+    "horizon_days",
+    "target_date",
+    "Item",
+    "Predicted_NAV",
+    "Actual_On_Hand",
+    "Error",
+    "Abs_Error",
+    "Driver_Source",
+    *(f"Pred_{s}" for s in BACKTEST_SOURCES),
+    "Naive_Error",
+]
+
+
+def _key(s: pd.Series) -> pd.Series:
+    return s.astype("string").str.strip().str.upper()
+
+
+def _day(s: pd.Series) -> pd.Series:
+    # One resolution everywhere: merge_asof refuses to join datetime64[s] with [ns].
+    return pd.to_datetime(s, errors="coerce").dt.normalize().astype("datetime64[ns]")
+
+
+def _prepare_predictions(ledgers: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Ledger rows of every run sorted for as-of lookups, with per-source
+    cumulative flows, plus each (run_date, Item)'s opening quantity.
+    """
+    led = ledgers.reindex(columns=["run_date", *LEDGER_BACKTEST_COLUMNS]).copy()
+    led["run_date"] = _day(led["run_date"])
+    led["Item"] = _key(led["Item"])
+    led["Date"] = _day(led["Date"])
+    led["Delta"] = pd.to_numeric(led["Delta"], errors="coerce").fillna(0.0)
+    led["Projected_NAV"] = pd.to_numeric(led["Projected_NAV"], errors="coerce")
+    led["Opening"] = pd.to_numeric(led["Opening"], errors="coerce")
+    led = led.loc[led["Item"].notna() & led["run_date"].notna()]
+
+    opening = led.groupby(["run_date", "Item"], sort=False)["Opening"].first().fillna(0.0).rename("Opening_NAV")
+
+    dated = led.loc[led["Date"].notna() & led["Date"].ne(PLACEHOLDER_DATE) & led["Projected_NAV"].notna()]
+    # Stable sort keeps the ledger's within-day order, so the last row of a day is its closing NAV.
+    dated = dated.sort_values(["run_date", "Item", "Date"], kind="stable").reset_index(drop=True)
+    groups = [dated["run_date"], dated["Item"]]
+    source = dated["Source"].astype("string")
+    for src in BACKTEST_SOURCES:
+        dated[f"Pred_{src}"] = dated["Delta"].where(source.eq(src), 0.0).groupby(groups).cumsum()
+    dated = dated.rename(columns={"Source": "Driver_Source", "Projected_NAV": "Predicted_NAV"})
+    keep = ["run_date", "Item", "Date", "Predicted_NAV", "Driver_Source", *(f"Pred_{s}" for s in BACKTEST_SOURCES)]
+    return dated[keep], opening.reset_index()
+
+
+def _prepare_actuals(inventory: pd.DataFrame) -> pd.DataFrame:
+    inv = inventory.reindex(columns=["run_date", *INVENTORY_BACKTEST_COLUMNS]).copy()
+    out = pd.DataFrame(
+        {
+            "obs_date": _day(inv["run_date"]),
+            "Item": _key(inv["Part_Number"]),
+            "Actual_On_Hand": pd.to_numeric(inv["On Hand"], errors="coerce"),
+        }
+    )
+    out = out.dropna(subset=["obs_date", "Item", "Actual_On_Hand"])
+    return out.groupby(["obs_date", "Item"], as_index=False)["Actual_On_Hand"].sum()
+
+
+def _target_dates(run_dates: pd.Series, obs_dates: pd.Series, horizons: Iterable[int], tolerance_days: int) -> pd.DataFrame:
+    """For every run and horizon, the first observed date at or after run + horizon (within tolerance)."""
+    runs = pd.DataFrame({"run_date": pd.Series(run_dates).drop_duplicates()})
+    pairs = runs.merge(pd.DataFrame({"horizon_days": list(horizons)}), how="cross")
+    pairs["nominal_date"] = pairs["run_date"] + pd.to_timedelta(pairs["horizon_days"], unit="D")
+    pairs = pairs.sort_values("nominal_date", kind="stable")
+    obs = pd.DataFrame({"target_date": pd.Series(obs_dates).drop_duplicates().sort_values()}).reset_index(drop=True)
+    if pairs.empty or obs.empty:
+        return pd.DataFrame(columns=["run_date", "horizon_days", "target_date"])
+    out = pd.merge_asof(
+        pairs,
+        obs,
+        left_on="nominal_date",
+        right_on="target_date",
+        direction="forward",
+        tolerance=pd.Timedelta(days=tolerance_days),
+    )
+    return out.dropna(subset=["target_date"]).drop(columns=["nominal_date"])
+
+
+def backtest_projections(
+    ledgers: pd.DataFrame,
+    inventory: pd.DataFrame,
+    *,
+    horizons: Iterable[int] = DEFAULT_HORIZONS,
+    tolerance_days: int = 3,
+) -> pd.DataFrame:
+    """
+    Compare each archived ledger's Projected_NAV with the On Hand later
+    observed in the inventory snapshots.
+
+    `ledgers` stacks ledger_analytics snapshots and `inventory` stacks
+    inventory_status snapshots, both with a `run_date` column (as
+    SnapshotArchive.read returns them). For each run date and horizon the
+    prediction is the as-of NAV on the first observed date at or after
+    run + horizon: the last ledger row of the item dated on or before it,
+    else the item's opening. Returns one row per (run, horizon, item) with
+    Error = Predicted_NAV - Actual_On_Hand, the per-source predicted flows
+    (Pred_SO/POD/NAV), the source of the last event applied, and the naive
+    error of assuming On Hand stays as observed on the run date.
+    """
+    horizons = tuple(int(h) for h in horizons)
+    predictions, opening = _prepare_predictions(ledgers)
+    actuals = _prepare_actuals(inventory)
+    targets = _target_dates(opening["run_date"], actuals["obs_date"], horizons, tolerance_days)
+
+    detail = targets.merge(actuals.rename(columns={"obs_date": "target_date"}), on="target_date")
+    detail = detail.merge(opening, on=["run_date", "Item"])
+    if detail.empty:
+        return pd.DataFrame(columns=BACKTEST_DETAIL_COLUMNS)
+
+    detail = pd.merge_asof(
+        detail.sort_values("target_date", kind="stable"),
+        predictions.sort_values("Date", kind="stable"),
+        left_on="target_date",
+        right_on="Date",
+        by=["run_date", "Item"],
+        direction="backward",
+    )
+    no_event = detail["Date"].isna()
+    detail["Predicted_NAV"] = detail["Predicted_NAV"].where(~no_event, detail["Opening_NAV"])
+    detail["Driver_Source"] = detail["Driver_Source"].astype("object").where(~no_event, "OPEN")
+    for src in BACKTEST_SOURCES:
+        detail[f"Pred_{src}"] = detail[f"Pred_{src}"].fillna(0.0)
+
+    detail["Error"] = detail["Predicted_NAV"] - detail["Actual_On_Hand"]
+    detail["Abs_Error"] = detail["Error"].abs()
+
+    baseline = actuals.rename(columns={"obs_date": "run_date", "Actual_On_Hand": "Run_On_Hand"})
+    detail = detail.merge(baseline, on=["run_date", "Item"], how="left")
+    detail["Naive_Error"] = detail["Run_On_Hand"] - detail["Actual_On_Hand"]
+
+    return detail[BACKTEST_DETAIL_COLUMNS].sort_values(["run_date", "horizon_days", "Item"]).reset_index(drop=True)
+
+
+def _error_stats(df: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+    work = df.assign(
+        _sq=df["Error"] ** 2,
+        _naive_abs=df["Naive_Error"].abs(),
+    )
+    out = work.groupby(by, as_index=False, observed=True).agg(
+        Forecasts=("Error", "size"),
+        MAE=("Abs_Error", "mean"),
+        Bias=("Error", "mean"),
+        _mse=("_sq", "mean"),
+        Naive_MAE=("_naive_abs", "mean"),
+    )
+    out["RMSE"] = np.sqrt(out.pop("_mse"))
+    return out[[*by, "Forecasts", "MAE", "Bias", "RMSE", "Naive_MAE"]]
+
+
+def summarize_backtest(detail: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Error summaries of a backtest_projections frame: per item, per horizon and
+    per event source. A source's rows are the forecasts whose horizon
+    included a predicted flow from it ("none" when no event was applied).
+    """
+    by_item = _error_stats(detail, ["Item"]).sort_values("MAE", ascending=False, kind="stable")
+    by_horizon = _error_stats(detail, ["horizon_days"])
+
+    flows = detail[[f"Pred_{s}" for s in BACKTEST_SOURCES]].ne(0)
+    exposures = [detail.loc[flows[f"Pred_{s}"]].assign(Source=s) for s in BACKTEST_SOURCES]
+    exposures.append(detail.loc[~flows.any(axis=1)].assign(Source="none"))
+    by_source = _error_stats(pd.concat(exposures, ignore_index=True), ["Source"])
+    return {
+        "by_item": by_item.reset_index(drop=True),
+        "by_horizon": by_horizon,
+        "by_source": by_source,
+    }
+
+
+__all__ = [
+    "BACKTEST_DETAIL_COLUMNS",
+    "BACKTEST_SOURCES",
+    "DEFAULT_HORIZONS",
+    "INVENTORY_BACKTEST_COLUMNS",
+    "LEDGER_BACKTEST_COLUMNS",
+    "backtest_projections",
+    "summarize_backtest",
+]
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+
+KIND_ORDER: tuple[str, ...] = ("OPEN", "IN", "ADJ", "OUT")
+KIND_CODES: dict[str, int] = {kind: code for code, kind in enumerate(KIND_ORDER)}
+OPEN_SOURCE = "Snapshot"
+
+# Columns owned by the engine; every other event column is carried through
+# unchanged into the DataFrame view.
+_CORE_COLUMNS = ("Date", "Item", "Delta", "Kind", "Source", "Opening")
+_COMPUTED_COLUMNS = ("CumDelta", "Projected_NAV", "NAV_before", "NAV_after")
+_EPOCH_DAY = np.datetime64("1970-01-01", "D")
+
+
+def _to_day_ordinal(values: pd.Series) -> np.ndarray:
+    """Normalized dates -> int64 days since 1970-01-01 (NaT rows must be dropped first)."""
+    days = pd.to_datetime(values, errors="coerce").to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    return (days - _EPOCH_DAY).astype(np.int64)
+
+
+def day_ordinal_to_datetime(days: np.ndarray) -> np.ndarray:
+    return (np.asarray(days, dtype=np.int64) + _EPOCH_DAY).astype("datetime64[ns]")
+
+
+def timestamp_to_day_ordinal(value: object) -> int:
+    ts = pd.Timestamp(value).normalize()
+    return int((np.datetime64(ts.date(), "D") - _EPOCH_DAY).astype(np.int64))
+
+
+def _kind_codes(kind: pd.Series) -> np.ndarray:
+    return pd.Categorical(kind.astype("object"), categories=list(KIND_ORDER)).codes.astype(np.int8)
+
+
+def _decode(codes: np.ndarray, vocab: np.ndarray) -> np.ndarray:
+    out = np.full(codes.size, np.nan, dtype=object)
+    valid = codes >= 0
+    out[valid] = vocab[codes[valid]]
+    return out
+
+
+def _segment_cumsum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Running sum that restarts at every item boundary in `offsets`."""
+    if values.size == 0:
+        return values.astype(np.float64)
+    total = np.cumsum(values, dtype=np.float64)
+    base = np.concatenate(([0.0], total))[offsets[:-1]]
+    return total - np.repeat(base, np.diff(offsets))
+
+
+def segment_suffix_min(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Minimum of `values` from each row to the end of its item segment.
+    NaN rows are skipped (they take the minimum of the rows after them, or +inf).
+    """
+    if values.size == 0:
+        return values.astype(np.float64)
+    filled = np.where(np.isnan(values), np.inf, values).astype(np.float64)
+    codes = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    reversed_min = pd.Series(filled[::-1]).groupby(codes[::-1], sort=False).cummin().to_numpy()
+    return reversed_min[::-1].copy()
+
+
+@dataclass(frozen=True)
+class LedgerArrays:
+    """
+    Columnar ledger: one contiguous block of rows per item, ordered by
+    (Item, Date, Kind). Rows of item `i` live at `offsets[i]:offsets[i + 1]`.
+
+    Dates are int64 day ordinals, Kind/Source/QB Num are integer codes into
+    `KIND_ORDER`, `sources` and `qb_nums`. `row_ref` points back into `extras`
+    (the passthrough event columns), with -1 for synthesized OPEN rows.
+    """
+
+    items: np.ndarray
+    offsets: np.ndarray
+    opening: np.ndarray
+    date: np.ndarray
+    delta: np.ndarray
+    kind: np.ndarray
+    source: np.ndarray
+    sources: np.ndarray
+    qb_num: np.ndarray
+    qb_nums: np.ndarray
+    cum_delta: np.ndarray
+    projected_nav: np.ndarray
+    row_ref: np.ndarray
+    extras: pd.DataFrame = field(default_factory=pd.DataFrame)
+    _item_lookup: dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_item_lookup", {str(item): i for i, item in enumerate(self.items)})
+
+    def __len__(self) -> int:
+        return int(self.delta.size)
+
+    @property
+    def n_items(self) -> int:
+        return int(self.items.size)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def item_codes(self) -> np.ndarray:
+        return np.repeat(np.arange(self.n_items), self.counts)
+
+    @property
+    def nav_before(self) -> np.ndarray:
+        return np.where(self.kind == KIND_CODES["OUT"], self.projected_nav - self.delta, np.nan)
+
+    @property
+    def nav_after(self) -> np.ndarray:
+        return np.where(self.kind == KIND_CODES["OUT"], self.projected_nav, np.nan)
+
+    def item_position(self, item: str) -> int | None:
+        return self._item_lookup.get(str(item))
+
+    def item_slice(self, item: str) -> slice:
+        pos = self.item_position(item)
+        if pos is None:
+            return slice(0, 0)
+        return slice(int(self.offsets[pos]), int(self.offsets[pos + 1]))
+
+    def item_min_projected(self) -> np.ndarray:
+        if len(self) == 0:
+            return np.empty(0, dtype=np.float64)
+        return np.minimum.reduceat(self.projected_nav, self.offsets[:-1])
+
+    def first_negative_rows(self) -> tuple[np.ndarray, np.ndarray]:
+        """(item positions, row positions) of each item's first negative Projected_NAV row."""
+        neg_rows = np.flatnonzero(self.projected_nav < 0)
+        item_pos, first = np.unique(self.item_codes[neg_rows], return_index=True)
+        return item_pos, neg_rows[first]
+
+    def future_min_nav(self) -> np.ndarray:
+        return segment_suffix_min(self.projected_nav, self.offsets)
+
+    def with_deltas(self, delta: np.ndarray) -> LedgerArrays:
+        """Copy with new per-row deltas and the running balances recomputed."""
+        delta = np.asarray(delta, dtype=np.float64)
+        cum = _segment_cumsum(delta, self.offsets)
+        return LedgerArrays(
+            items=self.items,
+            offsets=self.offsets,
+            opening=self.opening,
+            date=self.date,
+            delta=delta,
+            kind=self.kind,
+            source=self.source,
+            sources=self.sources,
+            qb_num=self.qb_num,
+            qb_nums=self.qb_nums,
+            cum_delta=cum,
+            projected_nav=np.repeat(self.opening, self.counts) + cum,
+            row_ref=self.row_ref,
+            extras=self.extras,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame view in the `ledger_analytics` column layout."""
+        item_col = pd.array(np.repeat(self.items, self.counts), dtype="string")
+        frame = pd.DataFrame(
+            {
+                "Date": day_ordinal_to_datetime(self.date),
+                "Item": item_col,
+                "Delta": self.delta,
+                "Kind": pd.Categorical.from_codes(self.kind, categories=list(KIND_ORDER), ordered=True),
+                "Source": _decode(self.source, self.sources),
+            }
+        )
+        extras = self.extras.reindex(self.row_ref).reset_index(drop=True)
+        item_raw = extras["Item_raw"] if "Item_raw" in extras.columns else pd.Series(np.nan, index=frame.index, dtype=object)
+        is_open = self.row_ref < 0
+        frame["Item_raw"] = item_raw.astype(object).where(~is_open, frame["Item"].astype(object))
+        frame["Opening"] = np.repeat(self.opening, self.counts)
+        for col in extras.columns:
+            if col not in frame.columns:
+                frame[col] = extras[col].to_numpy()
+        frame["CumDelta"] = self.cum_delta
+        frame["Projected_NAV"] = self.projected_nav
+        frame["NAV_before"] = self.nav_before
+        frame["NAV_after"] = self.nav_after
+        return frame
+
+    @classmethod
+    def from_ledger(cls, ledger: pd.DataFrame) -> LedgerArrays:
+        """
+        Index an existing ledger frame (e.g. `ledger_analytics` read back from the DB).
+        Stored CumDelta/Projected_NAV are kept as-is; rows keep their relative
+        order within each (Item, Date).
+        """
+        if ledger is None or ledger.empty or not {"Item", "Date", "Delta"}.issubset(ledger.columns):
+            return _empty_arrays()
+        led = ledger.reset_index(drop=True)
+        item = led["Item"].astype("string").str.strip().str.upper()
+        date = pd.to_datetime(led["Date"], errors="coerce").dt.normalize()
+        opening_src = pd.to_numeric(led["Opening"], errors="coerce") if "Opening" in led.columns else pd.Series(0.0, index=led.index)
+        opening_by_item = opening_src.groupby(item, sort=False).first()
+
+        keep = item.notna() & item.ne("") & date.notna()
+        led = led.loc[keep].reset_index(drop=True)
+        item = item.loc[keep].reset_index(drop=True)
+        date = date.loc[keep].reset_index(drop=True)
+
+        item_codes, items = pd.factorize(item, sort=True)
+        days = _to_day_ordinal(date)
+        order = np.lexsort((days, item_codes))
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(item_codes, minlength=len(items))))).astype(np.int64)
+        items = np.asarray(items, dtype=object)
+
+        delta = pd.to_numeric(led["Delta"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)[order]
+        opening = pd.to_numeric(pd.Series(items).map(opening_by_item), errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+        if "Projected_NAV" in led.columns:
+            projected = pd.to_numeric(led["Projected_NAV"], errors="coerce").to_numpy(dtype=np.float64)[order]
+            cum = projected - np.repeat(opening, np.diff(offsets))
+        else:
+            cum = _segment_cumsum(delta, offsets)
+            projected = np.repeat(opening, np.diff(offsets)) + cum
+
+        kind = _kind_codes(led["Kind"])[order] if "Kind" in led.columns else np.full(order.size, -1, dtype=np.int8)
+        source_codes, sources = pd.factorize(led["Source"] if "Source" in led.columns else pd.Series(np.nan, index=led.index))
+        qb_codes, qb_nums = pd.factorize(led["QB Num"].astype("string").str.strip() if "QB Num" in led.columns else pd.Series(pd.NA, index=led.index, dtype="string"))
+        extra_cols = [c for c in led.columns if c not in _CORE_COLUMNS and c not in _COMPUTED_COLUMNS]
+        return cls(
+            items=items,
+            offsets=offsets,
+            opening=opening,
+            date=days[order],
+            delta=delta,
+            kind=kind,
+            source=source_codes.astype(np.int16)[order],
+            sources=np.asarray(sources, dtype=object),
+            qb_num=qb_codes.astype(np.int32)[order],
+            qb_nums=np.asarray(qb_nums, dtype=object),
+            cum_delta=cum,
+            projected_nav=projected,
+            row_ref=order.astype(np.int64),
+            extras=led.loc[:, extra_cols],
+        )
+
+
+def _empty_arrays() -> LedgerArrays:
+    empty_f = np.empty(0, dtype=np.float64)
+    return LedgerArrays(
+        items=np.empty(0, dtype=object),
+        offsets=np.zeros(1, dtype=np.int64),
+        opening=empty_f,
+        date=np.empty(0, dtype=np.int64),
+        delta=empty_f,
+        kind=np.empty(0, dtype=np.int8),
+        source=np.empty(0, dtype=np.int16),
+        sources=np.empty(0, dtype=object),
+        qb_num=np.empty(0, dtype=np.int32),
+        qb_nums=np.empty(0, dtype=object),
+        cum_delta=empty_f,
+        projected_nav=empty_f,
+        row_ref=np.empty(0, dtype=np.int64),
+        extras=pd.DataFrame(columns=["Item_raw"]),
+    )
+
+
+def _clean_events(events: pd.DataFrame) -> pd.DataFrame:
+    """Same row hygiene as `_order_events`, without the sort."""
+    if not {"Date", "Item", "Delta", "Kind"}.issubset(events.columns):
+        raise ValueError("events must have columns: ['Date','Item','Delta','Kind']")
+    out = events.reset_index(drop=True)
+    date = pd.to_datetime(out["Date"], errors="coerce").dt.normalize()
+    delta = pd.to_numeric(out["Delta"], errors="coerce")
+    kind = out["Kind"].astype("object")
+    keep = date.notna() & out["Item"].notna() & delta.notna()
+    keep &= delta.ne(0) | kind.eq("OPEN")
+    out = out.loc[keep].copy()
+    out["Date"] = date.loc[keep]
+    out["Delta"] = delta.loc[keep]
+    return out.reset_index(drop=True)
+
+
+def build_ledger_arrays(
+    events: pd.DataFrame,
+    stock: pd.DataFrame,
+    *,
+    as_of: pd.Timestamp | None = None,
+) -> LedgerArrays:
+    """
+    Build the columnar ledger from ordered-or-unordered events and an opening
+    stock frame (`Item`, `Opening`). Each stock item gets a zero-delta OPEN row
+    dated `as_of` (today by default); events for items not in stock open at 0.
+    """
+    as_of = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+    ev = _clean_events(events)
+
+    stock = stock.loc[stock["Item"].notna(), ["Item", "Opening"]]
+    stock = stock.drop_duplicates(subset=["Item"], keep="last").reset_index(drop=True)
+    n_open = len(stock)
+
+    item_all = pd.concat(
+        [stock["Item"].astype("string"), ev["Item"].astype("string")],
+        ignore_index=True,
+    )
+    item_codes, items = pd.factorize(item_all, sort=True)
+    items = np.asarray(items, dtype=object)
+
+    days = np.concatenate(
+        [np.full(n_open, timestamp_to_day_ordinal(as_of), dtype=np.int64), _to_day_ordinal(ev["Date"])]
+    )
+    kind = np.concatenate([np.full(n_open, KIND_CODES["OPEN"], dtype=np.int8), _kind_codes(ev["Kind"])])
+    kind_sort = np.where(kind < 0, len(KIND_ORDER), kind)
+    delta = np.concatenate([np.zeros(n_open), ev["Delta"].to_numpy(dtype=np.float64)])
+
+    source_src = pd.concat(
+        [
+            pd.Series(OPEN_SOURCE, index=range(n_open), dtype=object),
+            ev["Source"].astype(object) if "Source" in ev.columns else pd.Series(np.nan, index=range(len(ev)), dtype=object),
+        ],
+        ignore_index=True,
+    )
+    source_codes, sources = pd.factorize(source_src)
+    qb_src = pd.concat(
+        [
+            pd.Series(pd.NA, index=range(n_open), dtype="string"),
+            ev["QB Num"].astype("string") if "QB Num" in ev.columns else pd.Series(pd.NA, index=range(len(ev)), dtype="string"),
+        ],
+        ignore_index=True,
+    )
+    qb_codes, qb_nums = pd.factorize(qb_src)
+    row_ref = np.concatenate([np.full(n_open, -1, dtype=np.int64), np.arange(len(ev), dtype=np.int64)])
+
+    # Stable: ties within (Item, Date, Kind) keep OPEN-rows-then-events input order.
+    order = np.lexsort((kind_sort, days, item_codes))
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(item_codes, minlength=len(items))))).astype(np.int64)
+
+    opening_map = pd.Series(
+        pd.to_numeric(stock["Opening"], errors="coerce").fillna(0.0).to_numpy(),
+        index=stock["Item"].astype("string").to_numpy(),
+    )
+    opening = pd.Series(items).map(opening_map).fillna(0.0).to_numpy(dtype=np.float64)
+
+    delta = delta[order]
+    cum = _segment_cumsum(delta, offsets)
+    extra_cols = [c for c in ev.columns if c not in _CORE_COLUMNS]
+    if "Item_raw" not in extra_cols:
+        extra_cols.insert(0, "Item_raw")
+    return LedgerArrays(
+        items=items,
+        offsets=offsets,
+        opening=opening,
+        date=days[order],
+        delta=delta,
+        kind=kind[order],
+        source=source_codes.astype(np.int16)[order],
+        sources=np.asarray(sources, dtype=object),
+        qb_num=qb_codes.astype(np.int32)[order],
+        qb_nums=np.asarray(qb_nums, dtype=object),
+        cum_delta=cum,
+        projected_nav=np.repeat(opening, np.diff(offsets)) + cum,
+        row_ref=row_ref[order],
+        extras=ev.reindex(columns=extra_cols),
+    )
+
+
+__all__ = [
+    "KIND_CODES",
+    "KIND_ORDER",
+    "LedgerArrays",
+    "build_ledger_arrays",
+    "day_ordinal_to_datetime",
+    "segment_suffix_min",
+    "timestamp_to_day_ordinal",
+]
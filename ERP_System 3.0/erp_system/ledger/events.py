@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import hashlib
+import inspect
+import os
+import pickle
 import re
+import threading
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from pandas.api.types import CategoricalDtype
 
-from erp_system.normalize.erp_normalize import POD_SITE, normalize_item
-from erp_system.runtime.policies import EXCLUDED_POD_SOURCE_NAMES, PREINSTALL_KEEP_MODEL_SKIP_FIRST_COMPONENT_PREFIXES
+from erp_system.normalize.erp_normalize import POD_SITE, normalize_item, normalize_series
+from erp_system.runtime.policies import (
+    DESCRIPTION_PARSE_CACHE_SIZE,
+    EXCLUDED_POD_SOURCE_NAMES,
+    PREINSTALL_KEEP_MODEL_SKIP_FIRST_COMPONENT_PREFIXES,
+)
 from erp_system.transform.common import _norm_cols, _norm_key
 from erp_system.transform.shipping import get_shipping_model_core_group, get_shipping_model_group
 
@@ -25,18 +38,17 @@ NUVO_716_VARIANT_SPLITS: dict[str, tuple[str, str]] = {
     "NUVO-7166GC": ("Nuvo-716xGC", "CSM-7166GC"),
     "NUVO-7168GC": ("Nuvo-716xGC", "CSM-7168GC"),
 }
+SPACE_RUN = re.compile(r"\s+")  # Unicode \s also covers \r, \n, NBSP and the ideographic space
+
+
 def clean_space(s: str) -> str:
     if not isinstance(s, str):
         return ""
-    cleaned = s.replace("_x000D_", " ")
-    cleaned = cleaned.replace("\r", " ").replace("\n", " ")
-    cleaned = cleaned.replace("\u00A0", " ").replace("\u3000", " ")
-    cleaned = re.sub(r"\s+", " ", cleaned)
-    return cleaned.strip()
+    return SPACE_RUN.sub(" ", s.replace("_x000D_", " ")).strip()
 
 
-def parse_description(desc: str) -> tuple[str, list[str]]:
-    s = clean_space(desc)
+def _parse_description(s: str) -> tuple[str, tuple[str, ...]]:
+    s = clean_space(s)
     parts = INCL_SPLIT.split(s, maxsplit=1)
     parent = clean_space(parts[0].split(",")[0])
     comps = []
@@ -44,9 +56,112 @@ def parse_description(desc: str) -> tuple[str, list[str]]:
         comma_tokens = [clean_space(x) for x in parts[1].split(",") if clean_space(x)]
         for token in comma_tokens:
             comps.extend(clean_space(x) for x in ITEM_AND_SPLIT.split(token) if clean_space(x))
-    return parent, comps
+    return parent, tuple(comps)
+
+
+def _grammar_key() -> str:
+    """Digest of the parser's patterns and code; a saved cache from another grammar is ignored."""
+    digest = hashlib.sha256()
+    for pattern in (SPACE_RUN, INCL_SPLIT, ITEM_AND_SPLIT):
+        digest.update(f"{pattern.pattern}|{pattern.flags}".encode())
+    for func in (clean_space, _parse_description):
+        try:
+            digest.update(inspect.getsource(func).encode())
+        except (OSError, TypeError):
+            digest.update(func.__qualname__.encode())
+    return digest.hexdigest()
+
+
+class DescriptionParseCache:
+    """
+    Bounded LRU of parsed descriptions keyed by the raw description text.
+    `load`/`save` persist it so descriptions seen in earlier runs skip
+    parsing; `stats` counts lookups since the last `reset_stats`.
+    """
+
+    def __init__(self, maxsize: int = DESCRIPTION_PARSE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[str, tuple[str, ...]]] = OrderedDict()
+        self._from_disk: set[str] = set()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reset_stats(self) -> None:
+        self.hits = self.disk_hits = self.misses = 0
+
+    def parse(self, desc: object) -> tuple[str, tuple[str, ...]]:
+        key = desc if isinstance(desc, str) else ""
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.disk_hits += key in self._from_disk
+                return parsed
+            self.misses += 1
+        parsed = _parse_description(key)
+        with self._lock:
+            self._entries[key] = parsed
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._from_disk.discard(evicted)
+        return parsed
+
+    def stats(self) -> dict[str, float | int]:
+        lookups = self.hits + self.misses
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def load(self, path: str | Path) -> int:
+        """Merge a saved cache into this one; returns the entries added (0 when missing, stale or unreadable)."""
+        try:
+            with open(path, "rb") as f:
+                saved = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return 0
+        if not isinstance(saved, dict) or saved.get("grammar") != _grammar_key():
+            return 0
+        added = 0
+        with self._lock:
+            for key, parsed in saved.get("entries", ()):
+                if key not in self._entries and len(self._entries) < self.maxsize:
+                    # Older entries go to the cold end so this run's lookups evict them first.
+                    self._entries[key] = parsed
+                    self._entries.move_to_end(key, last=False)
+                    self._from_disk.add(key)
+                    added += 1
+        return added
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            entries = list(self._entries.items())
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        with open(tmp, "wb") as f:
+            pickle.dump({"grammar": _grammar_key(), "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return path
+
+
+DESCRIPTION_PARSE_CACHE = DescriptionParseCache()
+
+
+def parse_description(desc: str) -> tuple[str, list[str]]:
+    parent, comps = DESCRIPTION_PARSE_CACHE.parse(desc)
+    return parent, list(comps)
 
 
+@lru_cache(maxsize=DESCRIPTION_PARSE_CACHE_SIZE)
 def parse_component_token(token: str) -> tuple[str, float]:
     m = QTYX_RE.match(token)
     if m:
@@ -65,44 +180,69 @@ def keep_model_skip_first_component(item: str) -> bool:
     return normalized.startswith(PREINSTALL_KEEP_MODEL_SKIP_FIRST_COMPONENT_PREFIXES)
 
 
+_EXPANSION_COLUMNS = ["_row", "Parent_Item", "Item", "Qty_per_parent", "IsParent"]
+
+
+def _join_expansion(rows: pd.DataFrame, expansion: list[tuple[int, str, str, float, bool]]) -> pd.DataFrame:
+    """
+    Join an explode table of (row position, Parent_Item, Item, Qty_per_parent,
+    IsParent) back onto `rows` in one merge. Each output row copies its source
+    row; component rows get Qty(+) scaled by Qty_per_parent, parent rows keep it.
+    """
+    extra = [c for c in ("Parent_Item", "Qty_per_parent", "IsParent") if c not in rows.columns]
+    table = pd.DataFrame.from_records(expansion, columns=_EXPANSION_COLUMNS)
+    if table.empty:
+        return rows.iloc[0:0].reindex(columns=[*rows.columns, *extra])
+    table["IsParent"] = table["IsParent"].astype(bool)
+    base = rows.drop(columns=["Parent_Item", "Item", "Qty_per_parent", "IsParent"], errors="ignore")
+    base = base.reset_index(drop=True).rename_axis("_row").reset_index()
+    out = table.merge(base, on="_row", how="left", sort=False)
+    if "Qty(+)" in out.columns:
+        scaled = pd.to_numeric(out["Qty(+)"], errors="coerce") * out["Qty_per_parent"]
+        out["Qty(+)"] = scaled.where(~out["IsParent"], out["Qty(+)"])
+    return out[[*rows.columns, *extra]]
+
+
+def _special_group_items(value: object, include_configured_groups: bool) -> tuple[tuple[str, float], ...] | None:
+    ## Combine 716X Mapping and configured shipping model groups Mapping
+    if include_configured_groups:
+        configured_group = get_shipping_model_group(value)
+        if configured_group is not None:
+            return tuple(configured_group)
+    variant_items = split_nuvo_716_variant_item(str(value))
+    if variant_items is not None:
+        return tuple((item, 1.0) for item in variant_items)
+    return None
+
+
 def _split_special_shipping_variants(nav: pd.DataFrame, *, include_configured_groups: bool = True) -> pd.DataFrame:
     if nav.empty or "Item" not in nav.columns:
         return nav.copy()
-    ## Combine 716X Mapping and configured shipping model groups Mapping
-    def _group_items(value: object) -> list[tuple[str, float]] | tuple[tuple[str, float], ...] | None:  
-        if include_configured_groups:
-            configured_group = get_shipping_model_group(value)
-            if configured_group is not None:
-                return configured_group
-        variant_items = split_nuvo_716_variant_item(str(value))
-        if variant_items is not None:
-            return [(item, 1.0) for item in variant_items]
-        return None
-
-    special_mask = nav["Item"].astype(str).map(lambda value: _group_items(value) is not None) 
-    special_rows = nav.loc[special_mask].copy()
-    other_rows = nav.loc[~special_mask].copy()
-    if special_rows.empty:
+
+    # Group lookups run once per distinct Item, not once per row.
+    raw_items = nav["Item"].astype(str)
+    groups: dict[str, tuple[str, tuple[tuple[str, float], ...]] | None] = {}
+    for value in raw_items.unique():
+        if _special_group_items(value, include_configured_groups) is None:
+            groups[value] = None
+        else:
+            parent_item = clean_space(value)
+            groups[value] = (parent_item, _special_group_items(parent_item, include_configured_groups) or ())
+
+    special_mask = raw_items.map(lambda value: groups[value] is not None).to_numpy(dtype=bool)
+    if not special_mask.any():
         return nav.copy()
+    special_rows = nav.loc[special_mask]
+    other_rows = nav.loc[~special_mask]
+
+    expansion = [
+        (pos, parent_item, item, float(qty_per), False)
+        for pos, value in enumerate(raw_items[special_mask])
+        for parent_item, components in (groups[value],)
+        for item, qty_per in components
+    ]
+    split_df = _join_expansion(special_rows, expansion)
 
-    split_parts = []
-    for _, row in special_rows.iterrows():
-        parent_item = clean_space(str(row.get("Item", "")))
-        component_items = _group_items(parent_item) or []
-        base_qty = float(row.get("Qty(+)", 0) or 0)
-        component_rows = []
-        for item, qty_per in component_items:
-            out = row.copy()
-            out["Parent_Item"] = parent_item
-            out["Item"] = item
-            out["Qty_per_parent"] = qty_per
-            out["Qty(+)"] = base_qty * qty_per
-            out["IsParent"] = False
-            component_rows.append(out)
-        if component_rows:
-            split_parts.append(pd.DataFrame(component_rows))
-
-    split_df = pd.concat(split_parts, ignore_index=True) if split_parts else special_rows.iloc[0:0].copy()
     needed_cols = list(nav.columns)
     for col in ["Parent_Item", "Qty_per_parent", "IsParent"]:
         if col not in needed_cols:
@@ -115,10 +255,14 @@ def _split_special_shipping_variants(nav: pd.DataFrame, *, include_configured_gr
     return frames[0].copy() if len(frames) == 1 else pd.concat(frames, ignore_index=True)
 
 
-def expand_preinstalled_row(row: pd.Series) -> pd.DataFrame:
-    parent, tokens = parse_description(row.get("Description", ""))
-    base_qty = float(row.get("Qty(+)", 0) or 0)
-    row_item = clean_space(str(row.get("Item", "")))
+def _preinstalled_expansion(description: object, row_item: object) -> tuple[tuple[str, str, float, bool], ...]:
+    """
+    (Parent_Item, Item, Qty_per_parent, IsParent) rows a preinstalled line
+    expands into: its core group or parsed components, then the parent itself
+    unless a core group replaces it.
+    """
+    parent, tokens = DESCRIPTION_PARSE_CACHE.parse(description)
+    row_item = clean_space(str(row_item))
     parent_item = parent or row_item
     core_group = get_shipping_model_core_group(row_item)
     if core_group is not None:
@@ -133,39 +277,24 @@ def expand_preinstalled_row(row: pd.Series) -> pd.DataFrame:
         parent_item = row_item or parent_item
         tokens = tokens[1:]
 
-    comp_rows = []
-    for item, qty_per in core_group or ():
-        out = row.copy()
-        out["Parent_Item"] = parent_item
-        out["Item"] = item
-        out["Qty_per_parent"] = qty_per
-        out["Qty(+)"] = base_qty * qty_per
-        out["IsParent"] = False
-        comp_rows.append(out)
-
-    for tok in tokens:
-        item, qty_per = parse_component_token(tok)
-        out = row.copy()
-        out["Parent_Item"] = parent_item
-        out["Item"] = item
-        out["Qty_per_parent"] = qty_per
-        out["Qty(+)"] = base_qty * qty_per
-        out["IsParent"] = False
-        comp_rows.append(out)
-
-    parent_row = None
+    rows = [(parent_item, item, float(qty_per), False) for item, qty_per in core_group or ()]
+    rows.extend((parent_item, *parse_component_token(tok), False) for tok in tokens)
     if core_group is None:
-        parent_row = row.copy()
-        parent_row["Parent_Item"] = parent_item
-        parent_row["Item"] = parent_item
-        parent_row["Qty_per_parent"] = 1.0
-        parent_row["IsParent"] = True
-    if comp_rows:
-        frames = [pd.DataFrame(comp_rows)]
-        if parent_row is not None:
-            frames.append(pd.DataFrame([parent_row]))
-        return pd.concat(frames, ignore_index=True)
-    return pd.DataFrame([parent_row])
+        rows.append((parent_item, parent_item, 1.0, True))
+    return tuple(rows)
+
+
+def _expand_preinstalled(nav_pre: pd.DataFrame) -> pd.DataFrame:
+    """Expand every preinstalled row, parsing each distinct (Description, Item) once."""
+    descriptions = nav_pre["Description"] if "Description" in nav_pre.columns else pd.Series("", index=nav_pre.index)
+    keys = list(zip(descriptions, nav_pre["Item"]))
+    parsed = {key: _preinstalled_expansion(*key) for key in dict.fromkeys(keys)}
+    expansion = [(pos, *rec) for pos, key in enumerate(keys) for rec in parsed[key]]
+    return _join_expansion(nav_pre, expansion)
+
+
+def expand_preinstalled_row(row: pd.Series) -> pd.DataFrame:
+    return _expand_preinstalled(row.to_frame().T)
 
 
 def expand_nav_preinstalled(nav: pd.DataFrame) -> pd.DataFrame:
@@ -185,8 +314,7 @@ def expand_nav_preinstalled(nav: pd.DataFrame) -> pd.DataFrame:
     nav_pre = nav.loc[pre_mask].copy()
     nav_other = nav.loc[~pre_mask].copy()
 
-    expanded_parts = [expand_preinstalled_row(r) for _, r in nav_pre.iterrows()]
-    expanded_pre = pd.concat(expanded_parts, ignore_index=True) if expanded_parts else nav_pre.copy()
+    expanded_pre = _expand_preinstalled(nav_pre) if not nav_pre.empty else nav_pre.copy()
 
     needed_cols = list(nav.columns) + ["Parent_Item", "Qty_per_parent", "IsParent"]
     expanded_pre = expanded_pre.reindex(columns=needed_cols, fill_value=pd.NA)
@@ -204,7 +332,7 @@ def expand_nav_preinstalled(nav: pd.DataFrame) -> pd.DataFrame:
     expanded_all["Qty_per_parent"] = pd.to_numeric(expanded_all["Qty_per_parent"], errors="coerce").fillna(1.0)
     expanded_all["IsParent"] = expanded_all["IsParent"].astype(bool)
     expanded_all["Date"] = pd.to_datetime(expanded_all["Ship Date"], errors="coerce") + pd.Timedelta(days=5)
-    expanded_all["Item"] = expanded_all["Item"].astype(str).map(normalize_item)
+    expanded_all["Item"] = normalize_series(expanded_all["Item"].astype(str))
     return expanded_all
 
 
@@ -223,7 +351,7 @@ def build_opening_stock(so: pd.DataFrame, inventory: pd.DataFrame | None = None)
             stock["Item"] = stock["Item"].astype(str).str.strip()
             stock["Opening"] = pd.to_numeric(stock["Opening"], errors="coerce").fillna(0.0)
             stock = stock.loc[stock["Item"].ne("")]
-            stock["Item"] = _norm_key(stock["Item"].map(normalize_item))
+            stock["Item"] = _norm_key(normalize_series(stock["Item"]))
             return stock.groupby("Item", as_index=False)["Opening"].sum().sort_values("Item", kind="mergesort").reset_index(drop=True)
 
     src = so.copy()
@@ -350,6 +478,8 @@ def build_reconcile_events(
 
 
 __all__ = [
+    "DESCRIPTION_PARSE_CACHE",
+    "DescriptionParseCache",
     "_order_events",
     "build_events",
     "build_opening_stock",
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from erp_system.transform.common import _norm_cols
+
+from .engine import KIND_ORDER, LedgerArrays, _clean_events, build_ledger_arrays
+from .events import build_opening_stock
+from .ledger import build_ledger_arrays_from_events, summarize_ledger
+
+
+EVENT_KEY_COLUMNS = ["Source", "QB Num", "Item", "Date"]
+
+
+@dataclass(frozen=True)
+class IncrementalLedger:
+    """
+    Result of an incremental ledger build. `ledger` is the full merged ledger;
+    only rows whose Item is in `touched_items` differ from the previous run.
+    `full_rebuild` is set when the previous ledger could not be reused.
+    """
+
+    arrays: LedgerArrays
+    ledger: pd.DataFrame
+    item_summary: pd.DataFrame
+    violations: pd.DataFrame
+    touched_items: np.ndarray
+    full_rebuild: bool
+
+    @property
+    def n_touched(self) -> int:
+        return int(self.touched_items.size)
+
+
+def _stripped(values: pd.Series) -> pd.Series:
+    """`str.strip` applied to the distinct values only."""
+    codes, uniques = pd.factorize(values)
+    stripped = pd.Index(uniques).astype("string").str.strip()
+    return pd.Series(stripped.take(codes, allow_fill=True, fill_value=pd.NA), index=values.index, dtype="string")
+
+
+def _event_fingerprint(frame: pd.DataFrame) -> pd.DataFrame:
+    """Net Delta and row count per (Source, QB Num, Item, Date, Kind)."""
+    keys = pd.DataFrame(
+        {
+            "Source": frame["Source"].astype("string").fillna("") if "Source" in frame.columns else "",
+            "QB Num": _stripped(frame["QB Num"]).fillna("") if "QB Num" in frame.columns else "",
+            "Item": _stripped(frame["Item"]),
+            "Date": pd.to_datetime(frame["Date"], errors="coerce").dt.normalize(),
+            "Kind": frame["Kind"].astype("string").fillna(""),
+            "Delta": pd.to_numeric(frame["Delta"], errors="coerce").fillna(0.0),
+        },
+        index=frame.index,
+    )
+    return (
+        keys.groupby([*EVENT_KEY_COLUMNS, "Kind"], dropna=False, sort=False)
+        .agg(Delta=("Delta", "sum"), Rows=("Delta", "size"))
+        .reset_index()
+    )
+
+
+def _opening_by_item(frame: pd.DataFrame) -> pd.Series:
+    item = _stripped(frame["Item"])
+    opening = pd.to_numeric(frame["Opening"], errors="coerce").fillna(0.0)
+    return opening.groupby(item, sort=False).last()
+
+
+def diff_touched_items(
+    events: pd.DataFrame,
+    stock: pd.DataFrame,
+    previous_ledger: pd.DataFrame | None,
+    *,
+    as_of: pd.Timestamp | None = None,
+) -> np.ndarray | None:
+    """
+    Items whose events or opening stock differ from `previous_ledger`.
+    Events are matched on (Source, QB Num, Item, Date, Kind) by net Delta and
+    row count. Returns None when the previous ledger can't be diffed against
+    (missing, or its OPEN rows were dated for a different day).
+    """
+    required = {"Item", "Date", "Delta", "Kind", "Opening"}
+    if previous_ledger is None or previous_ledger.empty or not required.issubset(previous_ledger.columns):
+        return None
+    as_of = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+
+    prev = previous_ledger.loc[previous_ledger["Item"].notna()]
+    prev_is_open = prev["Kind"].astype("string").eq("OPEN").fillna(False)
+    prev_open_dates = pd.to_datetime(prev.loc[prev_is_open, "Date"], errors="coerce").dt.normalize()
+    if prev_open_dates.ne(as_of).any():
+        return None
+
+    ev = _clean_events(events)
+    ev = ev.loc[ev["Kind"].astype("string").ne("OPEN").fillna(True)]
+    merged = _event_fingerprint(ev).merge(
+        _event_fingerprint(prev.loc[~prev_is_open]),
+        on=[*EVENT_KEY_COLUMNS, "Kind"],
+        how="outer",
+        suffixes=("", "_prev"),
+        indicator=True,
+    )
+    changed = merged["_merge"].ne("both")
+    changed |= ~np.isclose(merged["Delta"].fillna(0.0), merged["Delta_prev"].fillna(0.0))
+    changed |= merged["Rows"].ne(merged["Rows_prev"])
+    touched = set(merged.loc[changed, "Item"].dropna())
+
+    stock = stock.loc[stock["Item"].notna()].drop_duplicates(subset=["Item"], keep="last")
+    opening = pd.concat(
+        [_opening_by_item(stock).rename("new"), _opening_by_item(prev.loc[prev_is_open]).rename("prev")],
+        axis=1,
+    )
+    opening_changed = opening["new"].isna() | opening["prev"].isna() | ~np.isclose(
+        opening["new"].fillna(0.0), opening["prev"].fillna(0.0)
+    )
+    touched.update(opening.index[opening_changed])
+    return np.asarray(sorted(touched), dtype=object)
+
+
+def build_ledger_incremental(
+    so: pd.DataFrame,
+    events: pd.DataFrame,
+    inventory: pd.DataFrame | None,
+    previous_ledger: pd.DataFrame | None,
+    *,
+    as_of: pd.Timestamp | None = None,
+) -> IncrementalLedger:
+    """
+    Rebuild Projected_NAV only for items whose events changed since
+    `previous_ledger`, reusing the stored rows of every other item.
+    Falls back to a full build when the previous ledger can't be diffed.
+    """
+    so = _norm_cols(so)
+    stock = build_opening_stock(so, inventory)
+    touched = diff_touched_items(events, stock, previous_ledger, as_of=as_of)
+    if touched is None:
+        arrays, ledger, item_summary, violations = build_ledger_arrays_from_events(so, events, inventory, as_of=as_of)
+        return IncrementalLedger(arrays, ledger, item_summary, violations, arrays.items, True)
+
+    touched_set = pd.Index(touched, dtype="string")
+    event_items = _stripped(events["Item"])
+    partial = build_ledger_arrays(
+        events.loc[event_items.isin(touched_set).fillna(False)],
+        stock.loc[stock["Item"].astype("string").isin(touched_set).fillna(False)],
+        as_of=as_of,
+    ).to_frame()
+
+    prev_items = _stripped(previous_ledger["Item"])
+    kept = previous_ledger.loc[~prev_items.isin(touched_set).fillna(False) & prev_items.notna()]
+    columns = list(partial.columns) + [c for c in kept.columns if c not in partial.columns]
+    ledger = pd.concat([kept, partial], ignore_index=True, sort=False).reindex(columns=columns)
+    ledger["Date"] = pd.to_datetime(ledger["Date"], errors="coerce")
+    ledger["Item"] = ledger["Item"].astype("string")
+    ledger["Kind"] = pd.Categorical(ledger["Kind"].astype("object"), categories=list(KIND_ORDER), ordered=True)
+    # Stored rows may come back from the DB unordered. Within one (Item, Date, Kind)
+    # the running CumDelta rises for IN and falls for OUT, which restores event order.
+    direction = np.select([ledger["Kind"].eq("IN"), ledger["Kind"].eq("OUT")], [1.0, -1.0], 0.0)
+    ledger["_run_order"] = pd.to_numeric(ledger["CumDelta"], errors="coerce").to_numpy() * direction
+    ledger = (
+        ledger.sort_values(["Item", "Date", "Kind", "_run_order"], kind="mergesort")
+        .drop(columns="_run_order")
+        .reset_index(drop=True)
+    )
+
+    arrays = LedgerArrays.from_ledger(ledger)
+    item_summary, violations = summarize_ledger(arrays, ledger, so, stock, inventory)
+    return IncrementalLedger(arrays, ledger, item_summary, violations, touched, False)
+
+
+__all__ = ["EVENT_KEY_COLUMNS", "IncrementalLedger", "build_ledger_incremental", "diff_touched_items"]
@@ -7,50 +7,62 @@ from erp_system.normalize.erp_normalize import normalize_item
 from erp_system.runtime.constants import PLACEHOLDER_DATE
 from erp_system.transform.common import _norm_cols, _norm_key
 
-from .events import _order_events, build_opening_stock
+from .engine import LedgerArrays, build_ledger_arrays, day_ordinal_to_datetime
+from .events import build_opening_stock
 
 
-def build_ledger_from_events(
+def build_ledger_arrays_from_events(
     so: pd.DataFrame,
     events: pd.DataFrame,
     inventory: pd.DataFrame | None = None,
-) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    *,
+    as_of: pd.Timestamp | None = None,
+) -> tuple[LedgerArrays, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Build the columnar ledger plus its DataFrame view, opening as of `as_of`
+    (today by default). Returns (arrays, ledger, item_summary, violations);
+    the arrays are what ATP and assignment readiness query, the frame is
+    what gets written to DB.
+    """
     so = _norm_cols(so)
     stock = build_opening_stock(so, inventory)
 
-    events = events.copy()
-    events = events.merge(stock, on="Item", how="left")
-    events["Opening"] = events["Opening"].fillna(0.0)
+    arrays = build_ledger_arrays(events, stock, as_of=as_of)
+    ledger = arrays.to_frame()
+    item_summary, violations = summarize_ledger(arrays, ledger, so, stock, inventory)
+    return arrays, ledger, item_summary, violations
 
-    today = pd.Timestamp.today().normalize()
-    open_df = pd.DataFrame(
-        {
-            "Date": [today] * len(stock),
-            "Item": stock["Item"].values,
-            "Delta": 0.0,
-            "Kind": "OPEN",
-            "Source": "Snapshot",
-            "Item_raw": stock["Item"].values,
-            "Opening": stock["Opening"].values,
-        }
+
+def violation_rows(ledger: pd.DataFrame) -> pd.DataFrame:
+    """Dated SO OUT rows that take Projected_NAV below zero, by date."""
+    mask = (
+        (ledger["Projected_NAV"] < 0)
+        & ledger["Date"].notna()
+        & ledger["Date"].ne(PLACEHOLDER_DATE)
+        & ledger["Kind"].eq("OUT")
+        & ledger["Source"].eq("SO")
+        & ~ledger["Item"].fillna("").str.startswith("Total ")
     )
+    return ledger.loc[mask].sort_values(by="Date").copy()
+
 
-    ledger = pd.concat([open_df, events], ignore_index=True, sort=False)
-    ledger = _order_events(ledger)
-    ledger["CumDelta"] = ledger.groupby("Item", sort=False)["Delta"].cumsum()
-    ledger["Projected_NAV"] = ledger["Opening"] + ledger["CumDelta"]
-
-    is_out = ledger["Kind"].eq("OUT")
-    ledger["NAV_before"] = np.where(is_out, ledger["Projected_NAV"] - ledger["Delta"], np.nan)
-    ledger["NAV_after"] = np.where(is_out, ledger["Projected_NAV"], np.nan)
-
-    item_min = ledger.groupby("Item", as_index=False)["Projected_NAV"].min().rename(columns={"Projected_NAV": "Min_Projected_NAV"})
-    first_neg = (
-        ledger.loc[ledger["Projected_NAV"] < 0]
-        .sort_values(["Item", "Date"])
-        .groupby("Item", as_index=False)
-        .first()[["Item", "Date", "Projected_NAV"]]
-        .rename(columns={"Date": "First_Shortage_Date", "Projected_NAV": "NAV_at_First_Shortage"})
+def summarize_ledger(
+    arrays: LedgerArrays,
+    ledger: pd.DataFrame,
+    so: pd.DataFrame,
+    stock: pd.DataFrame,
+    inventory: pd.DataFrame | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Per-item summary and SO violation rows for an already-built ledger."""
+    so = _norm_cols(so)
+    item_min = pd.DataFrame({"Item": pd.array(arrays.items, dtype="string"), "Min_Projected_NAV": arrays.item_min_projected()})
+    neg_items, neg_rows = arrays.first_negative_rows()
+    first_neg = pd.DataFrame(
+        {
+            "Item": pd.array(arrays.items[neg_items], dtype="string"),
+            "First_Shortage_Date": day_ordinal_to_datetime(arrays.date[neg_rows]),
+            "NAV_at_First_Shortage": arrays.projected_nav[neg_rows],
+        }
     )
 
     so_for_users = so.copy()
@@ -97,17 +109,17 @@ def build_ledger_from_events(
     item_summary["On PO"] = pd.to_numeric(item_summary["On PO"], errors="coerce").fillna(0.0)
     item_summary["OK"] = item_summary["Min_Projected_NAV"].fillna(0) >= 0
 
-    mask = (
-        (ledger["Projected_NAV"] < 0)
-        & ledger["Date"].notna()
-        & ledger["Date"].ne(PLACEHOLDER_DATE)
-        & ledger["Kind"].eq("OUT")
-        & ledger["Source"].eq("SO")
-        & ~ledger["Item"].fillna("").str.startswith("Total ")
-    )
-    violations = ledger.loc[mask].sort_values(by="Date").copy()
-    ledger.sort_values(["Item", "Date", "Kind"], inplace=True, kind="mergesort")
+    violations = violation_rows(ledger)
     item_summary.sort_values(["OK", "Min_Projected_NAV"], ascending=[True, True], inplace=True)
+    return item_summary, violations
+
+
+def build_ledger_from_events(
+    so: pd.DataFrame,
+    events: pd.DataFrame,
+    inventory: pd.DataFrame | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    _, ledger, item_summary, violations = build_ledger_arrays_from_events(so, events, inventory)
     return ledger, item_summary, violations
 
 
@@ -147,4 +159,10 @@ def earliest_atp_by_projected_nav(
     return None if candidates.empty else candidates.min()
 
 
-__all__ = ["build_ledger_from_events", "earliest_atp_by_projected_nav"]
+__all__ = [
+    "build_ledger_arrays_from_events",
+    "build_ledger_from_events",
+    "earliest_atp_by_projected_nav",
+    "summarize_ledger",
+    "violation_rows",
+]
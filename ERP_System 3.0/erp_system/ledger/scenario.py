@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+from .atp import AtpIndex, build_atp_view
+from .engine import _COMPUTED_COLUMNS, _clean_events, build_ledger_arrays
+from .ledger import violation_rows
+
+
+SCENARIO_SOURCE = "Scenario"
+SCENARIO_VIOLATION_COLUMNS = ["Item", "QB Num", "Date", "Base_Projected_NAV", "Scenario_Projected_NAV", "Status"]
+SCENARIO_ATP_COLUMNS = ["Item", "Base_ATP", "Scenario_ATP", "ATP_Shift_Days", "Base_Min_NAV", "Scenario_Min_NAV"]
+
+
+def _key(values: pd.Series) -> pd.Series:
+    return values.astype("string").str.strip().str.upper()
+
+
+def _key_value(value: object) -> str:
+    return str(value).strip().upper()
+
+
+def _date_field(name: str, value: object) -> pd.Timestamp:
+    try:
+        ts = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        ts = pd.NaT
+    if pd.isna(ts):
+        raise ValueError(f"{name} must be a date, got {value!r}.")
+    return ts.normalize()
+
+
+def _number_field(name: str, value: object) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a number, got {value!r}.")
+    return number
+
+
+@dataclass(frozen=True)
+class MoveEvents:
+    """Move the events of `qb_num` (optionally one item/source) to `to_date`, or by `shift_days`."""
+
+    qb_num: str
+    item: str | None = None
+    source: str | None = None
+    to_date: str | pd.Timestamp | None = None
+    shift_days: int = 0
+
+    def __post_init__(self) -> None:
+        if self.to_date is not None:
+            object.__setattr__(self, "to_date", _date_field("to_date", self.to_date))
+        days = _number_field("shift_days", self.shift_days)
+        if not days.is_integer():
+            raise ValueError(f"shift_days must be a whole number of days, got {self.shift_days!r}.")
+        object.__setattr__(self, "shift_days", int(days))
+
+
+@dataclass(frozen=True)
+class ChangeQty:
+    """Set the quantity of the matching events; IN/OUT direction is kept."""
+
+    qb_num: str
+    qty: float
+    item: str | None = None
+    source: str | None = None
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "qty", _number_field("qty", self.qty))
+
+
+@dataclass(frozen=True)
+class RemoveEvents:
+    qb_num: str
+    item: str | None = None
+    source: str | None = None
+
+
+@dataclass(frozen=True)
+class AddEvent:
+    """
+    A new IN (receipt) or OUT (demand) of `qty` for `item` on `date`. The
+    source defaults to POD for a receipt and SO for a demand, so an added
+    demand that drives NAV negative is reported like any other SO violation.
+    """
+
+    item: str
+    date: str | pd.Timestamp
+    qty: float
+    kind: str = "OUT"
+    qb_num: str = SCENARIO_SOURCE
+    source: str | None = None
+
+    def __post_init__(self) -> None:
+        kind = str(self.kind).strip().upper()
+        if kind not in ("IN", "OUT"):
+            raise ValueError(f"kind must be IN or OUT, got {self.kind!r}.")
+        object.__setattr__(self, "kind", kind)
+        object.__setattr__(self, "date", _date_field("date", self.date))
+        object.__setattr__(self, "qty", abs(_number_field("qty", self.qty)))
+        if self.source is None:
+            object.__setattr__(self, "source", "POD" if kind == "IN" else "SO")
+
+
+Override = Union[MoveEvents, ChangeQty, RemoveEvents, AddEvent]
+
+_OVERRIDE_TYPES: dict[str, type] = {
+    "move": MoveEvents,
+    "qty": ChangeQty,
+    "remove": RemoveEvents,
+    "add": AddEvent,
+}
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    overrides: tuple[Override, ...] = ()
+
+
+def override_from_dict(data: Mapping[str, Any]) -> Override:
+    """`{"op": "move" | "qty" | "remove" | "add", ...fields}` -> override."""
+    fields = dict(data)
+    op = str(fields.pop("op", "")).strip().lower()
+    if op not in _OVERRIDE_TYPES:
+        raise ValueError(f"Unknown scenario override op {op!r}; expected one of {sorted(_OVERRIDE_TYPES)}.")
+    try:
+        return _OVERRIDE_TYPES[op](**fields)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Bad {op!r} override {data!r}: {exc}") from None
+
+
+def scenario_from_dict(data: Mapping[str, Any]) -> Scenario:
+    return Scenario(
+        name=str(data.get("name") or "scenario"),
+        overrides=tuple(override_from_dict(o) for o in data.get("overrides") or ()),
+    )
+
+
+@dataclass(frozen=True)
+class ScenarioBase:
+    """
+    Events and opening stock a scenario is applied to. Overrides only touch
+    the items of the events they match, so `events_for`/`stock_for` hand the
+    evaluator just those items' rows.
+    """
+
+    events: pd.DataFrame
+    stock: pd.DataFrame
+    as_of: pd.Timestamp
+    _rows_by_item: dict[str, np.ndarray] = field(init=False, repr=False, compare=False)
+    _item_names: dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        ev = self.events
+        object.__setattr__(self, "_rows_by_item", ev.groupby("_item", sort=False).indices)
+        names = pd.concat([self.stock["Item"], ev["Item"]], ignore_index=True).astype(str)
+        object.__setattr__(self, "_item_names", dict(zip(_key(names), names)))
+
+    @classmethod
+    def from_events(cls, events: pd.DataFrame, stock: pd.DataFrame, *, as_of: pd.Timestamp | None = None) -> ScenarioBase:
+        as_of = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+        ev = _clean_events(events)
+        ev = ev.loc[ev["Kind"].astype("string").ne("OPEN").fillna(True)].reset_index(drop=True)
+        for col in ("Source", "QB Num"):
+            if col not in ev.columns:
+                ev[col] = pd.NA
+        ev["_item"] = _key(ev["Item"])
+        ev["_qb"] = _key(ev["QB Num"])
+        ev["_source"] = _key(ev["Source"])
+        stock = stock.loc[stock["Item"].notna(), ["Item", "Opening"]].drop_duplicates(subset=["Item"], keep="last")
+        return cls(ev, stock.assign(_item=_key(stock["Item"])).reset_index(drop=True), as_of)
+
+    @classmethod
+    def from_ledger(cls, ledger: pd.DataFrame) -> ScenarioBase:
+        """Recover events and opening stock from a built ledger (e.g. ledger_analytics)."""
+        kind = ledger["Kind"].astype("string")
+        is_open = kind.eq("OPEN").fillna(False)
+        opens = ledger.loc[is_open]
+        open_dates = pd.to_datetime(opens["Date"], errors="coerce").dropna()
+        as_of = open_dates.max() if not open_dates.empty else None
+        events = ledger.loc[~is_open].drop(columns=[c for c in (*_COMPUTED_COLUMNS, "Opening") if c in ledger.columns])
+        return cls.from_events(events, opens[["Item", "Opening"]], as_of=as_of)
+
+    def item_name(self, item: str) -> str:
+        return self._item_names.get(_key_value(item), str(item).strip())
+
+    def events_for(self, items: Iterable[str]) -> pd.DataFrame:
+        rows = [self._rows_by_item[k] for k in items if k in self._rows_by_item]
+        if not rows:
+            return self.events.iloc[0:0].copy()
+        return self.events.iloc[np.sort(np.concatenate(rows))].copy()
+
+    def stock_for(self, items: Iterable[str]) -> pd.DataFrame:
+        return self.stock.loc[self.stock["_item"].isin(list(items))]
+
+
+def _match(events: pd.DataFrame, ov: Override) -> pd.Series:
+    mask = events["_qb"].eq(_key_value(ov.qb_num)).fillna(False)
+    if ov.item is not None:
+        mask &= events["_item"].eq(_key_value(ov.item)).fillna(False)
+    if ov.source is not None:
+        mask &= events["_source"].eq(_key_value(ov.source)).fillna(False)
+    return mask
+
+
+def _scenario_events(base: ScenarioBase, overrides: Iterable[Override]) -> tuple[pd.DataFrame, list[str], list[int]]:
+    """(events of the affected items with overrides applied, affected item keys, unmatched override positions)."""
+    overrides = list(overrides)
+    affected: dict[str, None] = {}
+    unmatched: list[int] = []
+    for i, ov in enumerate(overrides):
+        if isinstance(ov, AddEvent):
+            affected[_key_value(ov.item)] = None
+            continue
+        matched = base.events.loc[_match(base.events, ov), "_item"].dropna().unique()
+        if matched.size == 0:
+            unmatched.append(i)
+        affected.update(dict.fromkeys(matched))
+    items = list(affected)
+
+    ev = base.events_for(items)
+    for i, ov in enumerate(overrides):
+        if i in unmatched:
+            continue
+        if isinstance(ov, AddEvent):
+            row = {
+                "Date": ov.date,
+                "Item": base.item_name(ov.item),
+                "Delta": ov.qty if ov.kind == "IN" else -ov.qty,
+                "Kind": ov.kind,
+                "Source": ov.source,
+                "QB Num": ov.qb_num,
+                "_item": _key_value(ov.item),
+                "_qb": _key_value(ov.qb_num),
+                "_source": _key_value(ov.source),
+            }
+            ev = pd.concat([ev, pd.DataFrame([row])], ignore_index=True)
+            continue
+        mask = _match(ev, ov)
+        if isinstance(ov, MoveEvents):
+            if ov.to_date is not None:
+                ev.loc[mask, "Date"] = ov.to_date
+            if ov.shift_days:
+                ev.loc[mask, "Date"] = ev.loc[mask, "Date"] + pd.Timedelta(days=ov.shift_days)
+        elif isinstance(ov, ChangeQty):
+            direction = np.where(ev.loc[mask, "Kind"].astype("string").eq("IN"), 1.0, -1.0)
+            ev.loc[mask, "Delta"] = direction * abs(ov.qty)
+        elif isinstance(ov, RemoveEvents):
+            ev = ev.loc[~mask]
+    return ev.reset_index(drop=True), items, unmatched
+
+
+def _ledger_for(events: pd.DataFrame, base: ScenarioBase, items: list[str]) -> pd.DataFrame:
+    return build_ledger_arrays(events.drop(columns=["_item", "_qb", "_source"]), base.stock_for(items), as_of=base.as_of).to_frame()
+
+
+def _violation_changes(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    keys = ["Item", "QB Num", "Date"]
+
+    def frame(ledger: pd.DataFrame, nav_col: str) -> pd.DataFrame:
+        rows = violation_rows(ledger).reindex(columns=[*keys, "Projected_NAV"])
+        rows["Item"] = rows["Item"].astype(str)
+        rows["QB Num"] = rows["QB Num"].astype("string").fillna("")
+        rows["_occ"] = rows.groupby(keys, sort=False).cumcount()
+        return rows.rename(columns={"Projected_NAV": nav_col})
+
+    merged = frame(before, "Base_Projected_NAV").merge(
+        frame(after, "Scenario_Projected_NAV"), on=[*keys, "_occ"], how="outer", indicator=True
+    )
+    merged["Status"] = merged["_merge"].map({"left_only": "resolved", "right_only": "new", "both": "changed"})
+    same = merged["_merge"].eq("both") & np.isclose(merged["Base_Projected_NAV"], merged["Scenario_Projected_NAV"])
+    merged = merged.loc[~same]
+    return merged[SCENARIO_VIOLATION_COLUMNS].sort_values(["Date", "Item"], kind="stable").reset_index(drop=True)
+
+
+def _atp_changes(before: pd.DataFrame, after: pd.DataFrame, items: list[str], qty: float, as_of: pd.Timestamp) -> pd.DataFrame:
+    def earliest(ledger: pd.DataFrame) -> pd.DataFrame:
+        view = build_atp_view(ledger[["Item", "Date", "Projected_NAV"]]) if not ledger.empty else None
+        index = AtpIndex.from_atp_view(view)
+        names = pd.Series(ledger["Item"].astype(str).unique())
+        requests = pd.DataFrame({"item": names, "qty": qty, "from_date": as_of})
+        out = index.earliest_batch(requests).rename(columns={"item": "Item", "earliest_date": "ATP"})
+        min_nav = ledger.groupby(ledger["Item"].astype(str))["Projected_NAV"].min()
+        return out.assign(Min_NAV=out["Item"].map(min_nav))[["Item", "ATP", "Min_NAV"]]
+
+    merged = earliest(before).merge(earliest(after), on="Item", how="outer", suffixes=("_base", "_scn"))
+    out = pd.DataFrame(
+        {
+            "Item": merged["Item"],
+            "Base_ATP": merged["ATP_base"],
+            "Scenario_ATP": merged["ATP_scn"],
+            "ATP_Shift_Days": (merged["ATP_scn"] - merged["ATP_base"]).dt.days,
+            "Base_Min_NAV": merged["Min_NAV_base"],
+            "Scenario_Min_NAV": merged["Min_NAV_scn"],
+        }
+    )
+    out = out.loc[_key(out["Item"]).isin(items)]
+    return out[SCENARIO_ATP_COLUMNS].sort_values("Item").reset_index(drop=True)
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    """Effect of one scenario on the items it touches (violations only where they differ)."""
+
+    name: str
+    affected_items: tuple[str, ...]
+    violations: pd.DataFrame
+    atp: pd.DataFrame
+    unmatched: tuple[int, ...] = ()
+
+    def to_dict(self) -> dict[str, Any]:
+        def records(df: pd.DataFrame) -> list[dict[str, Any]]:
+            out = df.copy()
+            for col in out.columns:
+                if pd.api.types.is_datetime64_any_dtype(out[col]):
+                    out[col] = out[col].dt.strftime("%Y-%m-%d")
+            return out.astype(object).where(out.notna(), None).to_dict(orient="records")
+
+        return {
+            "name": self.name,
+            "affected_items": list(self.affected_items),
+            "unmatched_overrides": list(self.unmatched),
+            "violations": records(self.violations),
+            "atp": records(self.atp),
+        }
+
+
+def evaluate_scenario(base: ScenarioBase, scenario: Scenario, *, qty: float = 1.0) -> ScenarioResult:
+    """
+    Apply `scenario` to `base` and rebuild the ledger of the affected items
+    only, before and after. Returns the violations that appear, disappear or
+    change NAV, and each affected item's earliest ATP date for `qty`.
+    """
+    events, items, unmatched = _scenario_events(base, scenario.overrides)
+    before = _ledger_for(base.events_for(items), base, items)
+    after = _ledger_for(events, base, items)
+    return ScenarioResult(
+        name=scenario.name,
+        affected_items=tuple(base.item_name(k) for k in items),
+        violations=_violation_changes(before, after),
+        atp=_atp_changes(before, after, items, qty, base.as_of),
+        unmatched=tuple(unmatched),
+    )
+
+
+_WORKER_BASE: ScenarioBase | None = None
+
+
+def _init_worker(base: ScenarioBase) -> None:
+    global _WORKER_BASE
+    _WORKER_BASE = base
+
+
+def _evaluate_in_worker(scenario: Scenario, qty: float) -> ScenarioResult:
+    assert _WORKER_BASE is not None
+    return evaluate_scenario(_WORKER_BASE, scenario, qty=qty)
+
+
+def evaluate_scenarios(
+    base: ScenarioBase,
+    scenarios: Iterable[Scenario],
+    *,
+    qty: float = 1.0,
+    jobs: int = 1,
+) -> list[ScenarioResult]:
+    """
+    Evaluate many scenarios against one shared base, in order. With jobs > 1
+    they run on spawned worker processes that each receive the base once;
+    that is for batch scripts, since a spawned worker re-imports the caller's
+    main module. Long-running callers such as the web server keep jobs=1.
+    """
+    scenarios = list(scenarios)
+    jobs = min(jobs, len(scenarios), os.cpu_count() or 1)
+    if jobs <= 1:
+        return [evaluate_scenario(base, s, qty=qty) for s in scenarios]
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(base,),
+    ) as pool:
+        return list(pool.map(_evaluate_in_worker, scenarios, [qty] * len(scenarios)))
+
+
+__all__ = [
+    "AddEvent",
+    "ChangeQty",
+    "MoveEvents",
+    "Override",
+    "RemoveEvents",
+    "SCENARIO_ATP_COLUMNS",
+    "SCENARIO_VIOLATION_COLUMNS",
+    "Scenario",
+    "ScenarioBase",
+    "ScenarioResult",
+    "evaluate_scenario",
+    "evaluate_scenarios",
+    "override_from_dict",
+    "scenario_from_dict",
+]
@@ -11,7 +11,7 @@ import pandas as pd
 import requests
 from sqlalchemy import text
 
-from erp_system.ledger.atp import earliest_atp_strict
+from erp_system.ledger.atp import AtpIndex
 from erp_system.runtime.config import DB_SCHEMA, TBL_INVENTORY, TBL_ITEM_ATP, TBL_STRUCTURED
 from erp_system.runtime.db_config import get_engine
 from erp_system.normalize.erp_normalize import normalize_item
@@ -30,6 +30,7 @@ class DataCache:
         self.engine = get_engine()
         self.inventory: pd.DataFrame | None = None
         self.item_atp: pd.DataFrame | None = None
+        self.item_atp_index: AtpIndex = AtpIndex.from_atp_view(None)
         self.structured: pd.DataFrame | None = None
         self.loaded_at: datetime | None = None
 
@@ -40,6 +41,7 @@ class DataCache:
     def reload(self) -> None:
         self.inventory = self._read_table(DB_SCHEMA, TBL_INVENTORY)
         self.item_atp = self._read_table(DB_SCHEMA, TBL_ITEM_ATP)
+        self.item_atp_index = AtpIndex.from_atp_view(self.item_atp)
         self.structured = self._read_table(DB_SCHEMA, TBL_STRUCTURED)
         self.loaded_at = datetime.now()
 
@@ -207,7 +209,7 @@ def tool_earliest_atp_date(cache: DataCache, item: str, qty: float) -> ToolResul
         "atp-date: rule=earliest Date where FutureMin_NAV >= qty",
         f"atp-date: source={DB_SCHEMA}.{TBL_ITEM_ATP}",
     ]
-    dt = earliest_atp_strict(atp, key, qty)
+    dt = cache.item_atp_index.earliest(key, qty)
     if dt is None:
         return ToolResult(False, {}, trace, "no feasible ATP date found")
     return ToolResult(True, {"item": key, "date": dt.strftime("%Y-%m-%d")}, trace)
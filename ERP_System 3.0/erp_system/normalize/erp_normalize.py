@@ -3,6 +3,7 @@ from __future__ import annotations
 import re
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 # Direct canonical-name mappings used across all ingestion sources
@@ -226,43 +227,127 @@ def format_pod_site_entries(site_map: dict[str, str]) -> str:
     return "\n".join(lines)
 
 
-def normalize_item(value: Any) -> Any:
-    """
-    Normalize a single item name/identifier:
-    1) Preserve missing values.
-    2) Strip whitespace and apply direct ITEM_MAPPINGS.
-    3) Apply regex patterns (Jetson JetPack variants) for canonical names.
-    """
+def _is_missing(value: Any) -> bool:
     if value is None:
-        return value
+        return True
     try:
-        if pd.isna(value):
-            return value
-    except Exception:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
         # Fallback if the object is not pandas-aware
-        pass
+        return False
+
+
+def _combined_pattern(patterns: list[tuple[re.Pattern, str]]) -> re.Pattern | None:
+    """
+    One alternation of every pattern, each as a named group `p<i>`, so a name
+    is scanned once instead of once per pattern. Alternatives are tried in
+    list order, so the first matching pattern still wins. None when a pattern
+    uses flags other than IGNORECASE that cannot be scoped to its group.
+    """
+    parts = []
+    for i, (pattern, _) in enumerate(patterns):
+        flags = pattern.flags & ~re.UNICODE
+        if flags & ~re.IGNORECASE:
+            return None
+        scope = "?i:" if flags & re.IGNORECASE else "?:"
+        parts.append(f"(?P<p{i}>({scope}{pattern.pattern}))")
+    return re.compile("|".join(parts)) if parts else None
+
+
+class ItemNormalizer:
+    """
+    Memoized item-name normalizer. `normalize` maps one value and remembers
+    the result per distinct name; `normalize_series` normalizes only a
+    Series' unique values and broadcasts them back through factorize codes.
+    Call `clear` after editing the mappings it was built from.
+    """
+
+    def __init__(
+        self,
+        item_mappings: dict[str, str] = ITEM_MAPPINGS,
+        pattern_mappings: list[tuple[re.Pattern, str]] = PATTERN_MAPPINGS,
+        *,
+        maxsize: int = 100_000,
+    ) -> None:
+        self.item_mappings = item_mappings
+        self.pattern_mappings = pattern_mappings
+        self.maxsize = maxsize
+        self._memo: dict[str, str] = {}
+        self._pattern = _combined_pattern(pattern_mappings)
 
-    name = str(value).strip()
-    if not name:
+    def clear(self) -> None:
+        self._memo = {}
+        self._pattern = _combined_pattern(self.pattern_mappings)
+
+    def _lookup(self, name: str) -> str:
+        direct = self.item_mappings.get(name)
+        if direct:
+            return direct
+        if self._pattern is not None:
+            m = self._pattern.match(name)
+            if m is not None:
+                replacement = self.pattern_mappings[int(m.lastgroup[1:])][1]
+                return self.item_mappings.get(replacement, replacement)
+        else:
+            for pattern, replacement in self.pattern_mappings:
+                if pattern.match(name):
+                    return self.item_mappings.get(replacement, replacement)
         return name
 
-    direct = ITEM_MAPPINGS.get(name)
-    if direct:
-        return direct
+    def normalize(self, value: Any) -> Any:
+        """
+        Normalize a single item name/identifier:
+        1) Preserve missing values.
+        2) Strip whitespace and apply direct ITEM_MAPPINGS.
+        3) Apply regex patterns (Jetson JetPack variants) for canonical names.
+        """
+        key = value if isinstance(value, str) else None
+        if key is None:
+            if _is_missing(value):
+                return value
+            key = str(value)
+        result = self._memo.get(key)
+        if result is None:
+            name = key.strip()
+            result = self._lookup(name) if name else name
+            if len(self._memo) >= self.maxsize:
+                self._memo = {}
+            self._memo[key] = result
+        return result
 
-    for pattern, replacement in PATTERN_MAPPINGS:
-        if pattern.match(name):
-            return ITEM_MAPPINGS.get(replacement, replacement)
+    def normalize_series(self, series: pd.Series) -> pd.Series:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # map() already works on the categories only.
+            return series.map(self.normalize)
+        if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+            # factorize would merge equal mixed values such as 5 and 5.0, whose names differ.
+            return series.map(self.normalize)
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        mapped = np.array([self.normalize(v) for v in uniques] + [None], dtype=object)
+        values = mapped[codes]
+        missing = codes == -1
+        if missing.any():
+            # Keep each missing value as it was (None, NaN or pd.NA).
+            values[missing] = series.to_numpy(dtype=object)[missing]
+        return pd.Series(values, index=series.index, name=series.name, dtype=object)
 
-    return name
+
+ITEM_NORMALIZER = ItemNormalizer()
+
+
+def normalize_item(value: Any) -> Any:
+    """Normalize one item name through the shared ITEM_NORMALIZER (see ItemNormalizer.normalize)."""
+    return ITEM_NORMALIZER.normalize(value)
 
 
 def normalize_series(series: pd.Series) -> pd.Series:
     """Vectorized helper to normalize a pandas Series of item names."""
-    return series.apply(normalize_item)
+    return ITEM_NORMALIZER.normalize_series(series)
 
 
 __all__ = [
+    "ITEM_NORMALIZER",
+    "ItemNormalizer",
     "normalize_item",
     "normalize_series",
     "ITEM_MAPPINGS",
@@ -0,0 +1,5 @@
+from .archive import *  # noqa: F401,F403
+from .cache import *  # noqa: F401,F403
+from .metrics import *  # noqa: F401,F403
+from .scheduler import *  # noqa: F401,F403
+from .shared_frames import *  # noqa: F401,F403
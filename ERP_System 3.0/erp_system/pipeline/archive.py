@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import pickle
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping
+
+import pandas as pd
+
+from .cache import PARQUET_ENGINE
+
+_PARTITION = "run_date="
+_SUFFIXES = (".parquet", ".pkl")
+
+
+def _as_date(value) -> dt.date:
+    return pd.Timestamp(value).date()
+
+
+def _archivable(df: pd.DataFrame) -> pd.DataFrame:
+    """Columns Parquet can store: string names, and mixed object columns as text (raw workbook cells)."""
+    out = df.copy()
+    out.columns = [str(c) for c in out.columns]
+    for col in out.columns:
+        if out[col].dtype == object and pd.api.types.infer_dtype(out[col], skipna=True).startswith("mixed"):
+            out[col] = out[col].map(lambda v: None if pd.api.types.is_scalar(v) and pd.isna(v) else str(v))
+    return out
+
+
+@dataclass(frozen=True)
+class SnapshotArchive:
+    """
+    Dated history of pipeline frames under `root`, one directory per dataset
+    partitioned by run date: `<root>/<dataset>/run_date=YYYY-MM-DD/<run_id>.parquet`.
+    Frames are written as compressed Parquet when an engine is installed,
+    else pickled. Reads are lazy: only the partitions in range are opened.
+    """
+
+    root: Path
+
+    def _partition(self, dataset: str, run_date) -> Path:
+        return Path(self.root) / dataset / f"{_PARTITION}{_as_date(run_date).isoformat()}"
+
+    def write(self, dataset: str, df: pd.DataFrame, *, run_date, run_id: str) -> Path:
+        partition = self._partition(dataset, run_date)
+        partition.mkdir(parents=True, exist_ok=True)
+        out = _archivable(df)
+        tmp = partition / f".{run_id}.{uuid.uuid4().hex}"
+        if PARQUET_ENGINE is not None:
+            path = partition / f"{run_id}.parquet"
+            compression = "zstd" if PARQUET_ENGINE == "pyarrow" else "snappy"
+            out.to_parquet(tmp, engine=PARQUET_ENGINE, index=False, compression=compression)
+        else:
+            path = partition / f"{run_id}.pkl"
+            out.to_pickle(tmp, compression=None)
+        os.replace(tmp, path)
+        return path
+
+    def write_run(self, frames: Mapping[str, pd.DataFrame], *, run_date, run_id: str) -> list[Path]:
+        return [self.write(name, df, run_date=run_date, run_id=run_id) for name, df in frames.items()]
+
+    def datasets(self) -> list[str]:
+        root = Path(self.root)
+        return sorted(p.name for p in root.iterdir() if p.is_dir()) if root.exists() else []
+
+    def run_dates(self, dataset: str) -> list[dt.date]:
+        base = Path(self.root) / dataset
+        if not base.exists():
+            return []
+        return sorted(
+            dt.date.fromisoformat(p.name[len(_PARTITION):]) for p in base.iterdir() if p.name.startswith(_PARTITION)
+        )
+
+    def _files(self, dataset: str, start, end, latest_per_day: bool) -> Iterator[tuple[dt.date, Path]]:
+        lo = None if start is None else _as_date(start)
+        hi = None if end is None else _as_date(end)
+        for run_date in self.run_dates(dataset):
+            if (lo is not None and run_date < lo) or (hi is not None and run_date > hi):
+                continue
+            partition = self._partition(dataset, run_date)
+            files = sorted(p for p in partition.iterdir() if p.suffix in _SUFFIXES and not p.name.startswith("."))
+            # run ids are run_YYYYMMDD_HHMMSS, so name order is time order.
+            for path in files[-1:] if latest_per_day else files:
+                yield run_date, path
+
+    def scan(
+        self,
+        dataset: str,
+        start=None,
+        end=None,
+        *,
+        columns: Iterable[str] | None = None,
+        latest_per_day: bool = True,
+    ) -> Iterator[tuple[dt.date, str, pd.DataFrame]]:
+        """Yield (run_date, run_id, frame) per archived run in [start, end], loading one at a time."""
+        wanted = None if columns is None else list(columns)
+        for run_date, path in self._files(dataset, start, end, latest_per_day):
+            if path.suffix == ".parquet":
+                df = pd.read_parquet(path, engine=PARQUET_ENGINE, columns=wanted)
+            else:
+                with open(path, "rb") as f:
+                    df = pickle.load(f)
+                if wanted is not None:
+                    df = df.reindex(columns=wanted)
+            yield run_date, path.stem, df
+
+    def read(
+        self,
+        dataset: str,
+        start=None,
+        end=None,
+        *,
+        columns: Iterable[str] | None = None,
+        latest_per_day: bool = True,
+    ) -> pd.DataFrame:
+        """All runs in [start, end] stacked, with `run_date` and `run_id` columns in front."""
+        columns = None if columns is None else list(columns)
+        parts = [
+            df.assign(run_date=pd.Timestamp(run_date), run_id=run_id)
+            for run_date, run_id, df in self.scan(dataset, start, end, columns=columns, latest_per_day=latest_per_day)
+        ]
+        if not parts:
+            return pd.DataFrame(columns=["run_date", "run_id", *(columns or [])])
+        out = pd.concat(parts, ignore_index=True)
+        return out[["run_date", "run_id", *[c for c in out.columns if c not in ("run_date", "run_id")]]]
+
+
+__all__ = ["SnapshotArchive"]
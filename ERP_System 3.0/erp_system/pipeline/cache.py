@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+import erp_system
+
+try:
+    import pyarrow  # noqa: F401
+
+    PARQUET_ENGINE: str | None = "pyarrow"
+except ImportError:
+    try:
+        import fastparquet  # noqa: F401
+
+        PARQUET_ENGINE = "fastparquet"
+    except ImportError:
+        PARQUET_ENGINE = None
+
+
+PACKAGE_ROOT = Path(erp_system.__file__).resolve().parent
+_META_FILE = "meta.json"
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    """Digest of the package version and every erp_system source file."""
+    digest = hashlib.sha256(erp_system.__version__.encode())
+    for path in sorted(PACKAGE_ROOT.rglob("*.py")):
+        digest.update(str(path.relative_to(PACKAGE_ROOT)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def fingerprint(value: Any) -> str:
+    """Content hash of a stage input; frames hash by values, index, columns and dtypes."""
+    digest = hashlib.sha256()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(type(value).__name__.encode())
+        digest.update(repr(value.dtypes.to_dict() if isinstance(value, pd.DataFrame) else value.dtype).encode())
+        digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        try:
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cells (lists, dicts, mixed objects): fall back to the pickled bytes.
+            digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def _parquet_safe(df: pd.DataFrame) -> bool:
+    """Only frames whose dtypes survive a Parquet round trip; mixed object columns go to pickle."""
+    if PARQUET_ENGINE is None or not all(isinstance(c, str) for c in df.columns) or df.columns.has_duplicates:
+        return False
+    for col in df.columns:
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) not in ("string", "empty"):
+            return False
+    return True
+
+
+@dataclass(frozen=True)
+class StageCache:
+    """
+    Content-addressed store for stage outputs under `root`. The key covers
+    the stage name and function, its kwargs, a fingerprint of every input, the
+    package code version and the run date (ledger builds date OPEN rows today).
+    Frames are stored as Parquet when an engine is installed, else pickled.
+    """
+
+    root: Path
+
+    def key(self, name: str, func: Any, args: Iterable[Any], kwargs: dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            code_version(),
+            name,
+            f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}",
+            fingerprint(dict(kwargs)),
+            pd.Timestamp.today().strftime("%Y-%m-%d"),
+            *(fingerprint(a) for a in args),
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return Path(self.root) / key[:2] / key
+
+    def load(self, key: str) -> list[Any] | None:
+        """Stored outputs in declaration order, or None on a miss or unreadable entry."""
+        entry = self._entry(key)
+        meta_path = entry / _META_FILE
+        if not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            values = []
+            for file_name in meta["files"]:
+                path = entry / file_name
+                if file_name.endswith(".parquet"):
+                    values.append(pd.read_parquet(path, engine=PARQUET_ENGINE))
+                else:
+                    with open(path, "rb") as f:
+                        values.append(pickle.load(f))
+        except Exception:
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(meta_path)
+        return values
+
+    def store(self, key: str, values: list[Any]) -> None:
+        entry = self._entry(key)
+        tmp = entry.with_name(f".{entry.name}.{uuid.uuid4().hex}")
+        tmp.mkdir(parents=True, exist_ok=True)
+        try:
+            files = []
+            for i, value in enumerate(values):
+                if isinstance(value, pd.DataFrame) and _parquet_safe(value):
+                    file_name = f"{i}.parquet"
+                    value.to_parquet(tmp / file_name, engine=PARQUET_ENGINE)
+                else:
+                    file_name = f"{i}.pkl"
+                    with open(tmp / file_name, "wb") as f:
+                        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                files.append(file_name)
+            (tmp / _META_FILE).write_text(json.dumps({"files": files, "created": time.time()}), encoding="utf-8")
+            if entry.exists():
+                shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def evict(self, *, max_age_days: float | None = None, max_bytes: int | None = None) -> int:
+        """
+        Drop entries not used within `max_age_days`, then least recently used
+        entries until the cache fits in `max_bytes`. Returns entries removed.
+        """
+        root = Path(self.root)
+        if not root.exists():
+            return 0
+        entries = []
+        for meta_path in root.glob(f"*/*/{_META_FILE}"):
+            entry = meta_path.parent
+            size = sum(p.stat().st_size for p in entry.iterdir() if p.is_file())
+            entries.append((meta_path.stat().st_mtime, size, entry))
+        entries.sort(key=lambda e: e[0])
+
+        removed = 0
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for used_at, size, entry in entries:
+            too_old = max_age_days is not None and now - used_at > max_age_days * 86400
+            too_big = max_bytes is not None and total > max_bytes
+            if not (too_old or too_big):
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+
+__all__ = ["PARQUET_ENGINE", "StageCache", "code_version", "fingerprint"]
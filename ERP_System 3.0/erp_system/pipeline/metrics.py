@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def peak_rss_bytes() -> int | None:
+    """High-water resident set size of this process, or None when unavailable."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return int(peak if sys.platform == "darwin" else peak * 1024)
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return int(getattr(info, "peak_wset", info.rss))
+    return None
+
+
+def row_count(value: Any) -> int | None:
+    """Rows of a DataFrame/Series value; None for anything else."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(len(value))
+    return None
+
+
+@dataclass(frozen=True)
+class StageMetrics:
+    """
+    Measurements for one stage run. `status` is ok, cached or failed; a cached
+    stage's `seconds` is the cache load time. `peak_rss_delta_mb` is how far
+    the stage raised its process's peak RSS; stages sharing a process
+    (threads) can claim each other's growth, so treat it as an upper bound.
+    """
+
+    stage: str
+    kind: str
+    status: str
+    started_at: str
+    seconds: float | None = None
+    peak_rss_delta_mb: float | None = None
+    peak_rss_mb: float | None = None
+    pid: int | None = None
+    input_rows: dict[str, int] = field(default_factory=dict)
+    output_rows: dict[str, int] = field(default_factory=dict)
+    error: str = ""
+
+
+def measure_call(func: Callable[..., Any], args: list[Any], kwargs: Mapping[str, Any]) -> tuple[Any, dict[str, Any]]:
+    """Call `func` and return (result, timing); module-level so worker processes can run it."""
+    before = peak_rss_bytes()
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - started
+    after = peak_rss_bytes()
+    timing = {
+        "seconds": round(seconds, 6),
+        "peak_rss_delta_mb": None if before is None or after is None else round((after - before) / 2**20, 3),
+        "peak_rss_mb": None if after is None else round(after / 2**20, 3),
+        "pid": os.getpid(),
+    }
+    return result, timing
+
+
+def _counts(values: Mapping[str, Any]) -> dict[str, int]:
+    return {name: rows for name, value in values.items() if (rows := row_count(value)) is not None}
+
+
+class MetricsRecorder:
+    """Thread-safe collector the scheduler appends a StageMetrics to per stage."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stages: list[StageMetrics] = []
+        self.started_at = pd.Timestamp.now()
+
+    def record(
+        self,
+        stage: str,
+        kind: str,
+        *,
+        started_at: pd.Timestamp,
+        inputs: Mapping[str, Any],
+        outputs: Mapping[str, Any] | None = None,
+        timing: Mapping[str, Any] | None = None,
+        error: BaseException | None = None,
+        cached: bool = False,
+    ) -> StageMetrics:
+        metrics = StageMetrics(
+            stage=stage,
+            kind=kind,
+            status="failed" if error is not None else ("cached" if cached else "ok"),
+            started_at=started_at.isoformat(timespec="seconds"),
+            input_rows=_counts(inputs),
+            output_rows=_counts(outputs or {}),
+            error="" if error is None else f"{type(error).__name__}: {error}",
+            **dict(timing or {}),
+        )
+        with self._lock:
+            self.stages.append(metrics)
+        return metrics
+
+    def to_frame(self, run_id: str) -> pd.DataFrame:
+        """One row per stage, row counts flattened to JSON, for a metrics table."""
+        rows = []
+        for m in self.stages:
+            row = asdict(m)
+            row["input_rows"] = json.dumps(m.input_rows, sort_keys=True)
+            row["output_rows"] = json.dumps(m.output_rows, sort_keys=True)
+            rows.append({"run_id": run_id, **row})
+        return pd.DataFrame(rows, columns=["run_id", *StageMetrics.__dataclass_fields__])
+
+    def report(self, run_id: str, **meta: Any) -> dict[str, Any]:
+        finished = pd.Timestamp.now()
+        return {
+            "run_id": run_id,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": finished.isoformat(timespec="seconds"),
+            "wall_seconds": round((finished - self.started_at).total_seconds(), 3),
+            "status": "failed" if any(m.status == "failed" for m in self.stages) else "ok",
+            **meta,
+            "stages": [asdict(m) for m in self.stages],
+        }
+
+    def write_report(self, path: str | Path, run_id: str, **meta: Any) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(run_id, **meta), indent=2, default=str), encoding="utf-8")
+        return path
+
+
+__all__ = ["MetricsRecorder", "StageMetrics", "measure_call", "peak_rss_bytes", "row_count"]
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping
+
+import pandas as pd
+
+from .cache import StageCache
+from .metrics import MetricsRecorder, measure_call
+
+
+STAGE_KINDS = ("io", "cpu")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One pipeline step. `func` is called with the values named in `inputs`
+    (positionally) plus `kwargs`; the result is stored under `outputs`, and a
+    tuple is unpacked when more than one output is declared. `after` orders
+    stages that share no values. With jobs > 1, "io" stages run on threads and
+    "cpu" stages on a process pool, so a "cpu" `func` must be picklable.
+    `cache` marks a deterministic stage whose outputs may be reused from a
+    StageCache when its inputs, kwargs and code are unchanged.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    kind: str = "io"
+    after: tuple[str, ...] = ()
+    kwargs: Mapping[str, Any] = field(default_factory=dict)
+    cache: bool = False
+
+
+def stage_dependencies(stages: Iterable[Stage], provided: Iterable[str] = ()) -> dict[str, frozenset[str]]:
+    """
+    Names of the stages each stage waits on. Raises ValueError for duplicate
+    names or outputs, unknown kinds, inputs nobody produces, and cycles.
+    """
+    stages = list(stages)
+    provided = set(provided)
+    names: set[str] = set()
+    producer: dict[str, str] = {}
+    for stage in stages:
+        if stage.name in names:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        if stage.kind not in STAGE_KINDS:
+            raise ValueError(f"Stage {stage.name} has unknown kind {stage.kind!r}; expected one of {STAGE_KINDS}")
+        names.add(stage.name)
+        for out in stage.outputs:
+            if out in producer or out in provided:
+                raise ValueError(f"Value {out!r} is produced more than once (stage {stage.name})")
+            producer[out] = stage.name
+
+    deps: dict[str, frozenset[str]] = {}
+    for stage in stages:
+        missing = [v for v in stage.inputs if v not in producer and v not in provided]
+        if missing:
+            raise ValueError(f"Stage {stage.name} needs {missing} which no stage produces")
+        unknown = [s for s in stage.after if s not in names]
+        if unknown:
+            raise ValueError(f"Stage {stage.name} runs after unknown stages {unknown}")
+        deps[stage.name] = frozenset(producer[v] for v in stage.inputs if v in producer) | frozenset(stage.after)
+
+    topological_order(stages, deps)
+    return deps
+
+
+def topological_order(stages: Iterable[Stage], deps: Mapping[str, frozenset[str]]) -> list[Stage]:
+    """Stages in run order, keeping declaration order wherever the graph allows."""
+    pending = list(stages)
+    done: set[str] = set()
+    order: list[Stage] = []
+    while pending:
+        stage = next((s for s in pending if deps[s.name] <= done), None)
+        if stage is None:
+            raise ValueError(f"Stage graph has a cycle among: {sorted(s.name for s in pending)}")
+        pending.remove(stage)
+        done.add(stage.name)
+        order.append(stage)
+    return order
+
+
+def _store(stage: Stage, result: Any, values: dict[str, Any]) -> None:
+    if len(stage.outputs) == 1:
+        values[stage.outputs[0]] = result
+    elif stage.outputs:
+        if not isinstance(result, tuple) or len(result) != len(stage.outputs):
+            raise ValueError(f"Stage {stage.name} must return {len(stage.outputs)} values")
+        values.update(zip(stage.outputs, result))
+
+
+def _outputs(stage: Stage, values: dict[str, Any]) -> list[Any]:
+    return [values[v] for v in stage.outputs]
+
+
+def _from_cache(
+    stage: Stage,
+    args: list[Any],
+    values: dict[str, Any],
+    cache: StageCache | None,
+    recorder: MetricsRecorder | None,
+) -> str | None:
+    """
+    Fill `stage`'s outputs from the cache. Returns None on a hit, the key to
+    store the fresh result under on a miss, or "" when the stage isn't cached.
+    """
+    if cache is None or not stage.cache:
+        return ""
+    started_at = pd.Timestamp.now()
+    start = time.perf_counter()
+    key = cache.key(stage.name, stage.func, args, dict(stage.kwargs))
+    cached = cache.load(key)
+    if cached is None:
+        return key
+    values.update(zip(stage.outputs, cached))
+    if recorder is not None:
+        recorder.record(
+            stage.name,
+            stage.kind,
+            started_at=started_at,
+            inputs={v: values[v] for v in stage.inputs},
+            outputs={v: values[v] for v in stage.outputs},
+            timing={"seconds": round(time.perf_counter() - start, 6), "pid": os.getpid()},
+            cached=True,
+        )
+    return None
+
+
+def _finish(
+    stage: Stage,
+    result: Any,
+    values: dict[str, Any],
+    recorder: MetricsRecorder | None,
+    started_at: pd.Timestamp,
+    cache: StageCache | None = None,
+    cache_key: str = "",
+) -> None:
+    timing = None
+    if recorder is not None:
+        result, timing = result
+    _store(stage, result, values)
+    if cache is not None and cache_key:
+        try:
+            cache.store(cache_key, _outputs(stage, values))
+        except Exception as exc:
+            logging.warning("Could not cache stage %s: %s", stage.name, exc)
+    if recorder is not None:
+        recorder.record(
+            stage.name,
+            stage.kind,
+            started_at=started_at,
+            inputs={v: values[v] for v in stage.inputs},
+            outputs={v: values[v] for v in stage.outputs},
+            timing=timing,
+        )
+
+
+def _fail(
+    stage: Stage,
+    exc: BaseException,
+    values: dict[str, Any],
+    recorder: MetricsRecorder | None,
+    started_at: pd.Timestamp,
+) -> None:
+    logging.error("Stage %s failed", stage.name)
+    if recorder is not None:
+        recorder.record(
+            stage.name,
+            stage.kind,
+            started_at=started_at,
+            inputs={v: values[v] for v in stage.inputs},
+            error=exc,
+        )
+
+
+def run_stages(
+    stages: Iterable[Stage],
+    *,
+    jobs: int = 1,
+    values: Mapping[str, Any] | None = None,
+    recorder: MetricsRecorder | None = None,
+    cache: StageCache | None = None,
+) -> dict[str, Any]:
+    """
+    Run `stages` as a DAG and return every value by name (including `values`).
+    jobs <= 1 runs in declaration order in this process. Otherwise each stage
+    starts as soon as its inputs are ready, with up to `jobs` threads and
+    `jobs` worker processes. The first failing stage's exception is re-raised
+    after running stages finish; stages not yet started are skipped.
+    With a `recorder`, every stage is timed in the process that runs it.
+    With a `cache`, stages marked `cache=True` reuse stored outputs.
+    """
+    stages = list(stages)
+    values = dict(values or {})
+    deps = stage_dependencies(stages, values)
+
+    if jobs <= 1:
+        for stage in topological_order(stages, deps):
+            args = [values[v] for v in stage.inputs]
+            cache_key = _from_cache(stage, args, values, cache, recorder)
+            if cache_key is None:
+                continue
+            started_at = pd.Timestamp.now()
+            try:
+                if recorder is None:
+                    result = stage.func(*args, **stage.kwargs)
+                else:
+                    result = measure_call(stage.func, args, stage.kwargs)
+            except Exception as exc:
+                _fail(stage, exc, values, recorder, started_at)
+                raise
+            _finish(stage, result, values, recorder, started_at, cache, cache_key)
+        return values
+
+    pending = list(stages)
+    done: set[str] = set()
+    running: dict[Future, tuple[Stage, pd.Timestamp, str]] = {}
+    threads = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="stage")
+    processes: ProcessPoolExecutor | None = None
+    try:
+        while pending or running:
+            ready = [s for s in pending if deps[s.name] <= done]
+            for stage in ready:
+                pending.remove(stage)
+                args = [values[v] for v in stage.inputs]
+                cache_key = _from_cache(stage, args, values, cache, recorder)
+                if cache_key is None:
+                    done.add(stage.name)
+                    continue
+                if stage.kind == "cpu":
+                    if processes is None:
+                        processes = ProcessPoolExecutor(
+                            max_workers=min(jobs, os.cpu_count() or 1),
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+                    executor = processes
+                else:
+                    executor = threads
+                started_at = pd.Timestamp.now()
+                if recorder is None:
+                    future = executor.submit(stage.func, *args, **stage.kwargs)
+                else:
+                    future = executor.submit(measure_call, stage.func, args, stage.kwargs)
+                running[future] = (stage, started_at, cache_key)
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, started_at, cache_key = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    _fail(stage, exc, values, recorder, started_at)
+                    raise
+                _finish(stage, result, values, recorder, started_at, cache, cache_key)
+                done.add(stage.name)
+    finally:
+        threads.shutdown(wait=True, cancel_futures=True)
+        if processes is not None:
+            processes.shutdown(wait=True, cancel_futures=True)
+    return values
+
+
+__all__ = ["STAGE_KINDS", "Stage", "run_stages", "stage_dependencies", "topological_order"]
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+except ImportError:
+    pa = None
+
+SHARED_FRAME_FORMAT = "arrow" if pa is not None else "npy"
+_CURRENT_FILE = "CURRENT"
+_LOCK_FILE = "build.lock"
+_EXTRAS_FILE = "extras.pkl"
+_REST_FILE = "rest.pkl"
+
+
+def _fixed_width(s: pd.Series) -> bool:
+    """Columns np.load can memory-map: plain numpy numbers, bools and naive datetimes."""
+    return isinstance(s.dtype, np.dtype) and s.dtype.kind in "biufcmM"
+
+
+def _text(s: pd.Series) -> bool:
+    """Object columns holding only strings and nulls; shared as Arrow strings or dictionary codes."""
+    return s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) == "string"
+
+
+def _mixed(s: pd.Series) -> bool:
+    """Object columns mixing types (raw workbook cells); pickled as-is rather than coerced."""
+    return s.dtype == object and pd.api.types.infer_dtype(s, skipna=True).startswith("mixed")
+
+
+def _write_npy(frame: pd.DataFrame, folder: Path) -> None:
+    folder.mkdir()
+    mapped, categories = [], {}
+    for i, (name, col) in enumerate(frame.items()):
+        if _fixed_width(col):
+            np.save(folder / f"{i}.npy", col.to_numpy(), allow_pickle=False)
+            mapped.append(name)
+        elif _text(col):
+            codes = pd.Categorical(col)
+            np.save(folder / f"{i}.npy", codes.codes, allow_pickle=False)
+            # Code -1 (null) picks the last entry: the column's own null value.
+            nulls = col[col.isna()]
+            null = nulls.iloc[0] if len(nulls) else None
+            categories[name] = np.append(codes.categories.to_numpy(dtype=object), null)
+    rest = frame.drop(columns=[*mapped, *categories])
+    with open(folder / _REST_FILE, "wb") as f:
+        pickle.dump(
+            (list(frame.columns), mapped, categories, frame.index, rest), f, protocol=pickle.HIGHEST_PROTOCOL
+        )
+
+
+def _read_npy(folder: Path) -> pd.DataFrame:
+    with open(folder / _REST_FILE, "rb") as f:
+        columns, mapped, categories, index, rest = pickle.load(f)
+    mapped = set(mapped)
+    data = {}
+    for i, name in enumerate(columns):
+        if name in mapped or name in categories:
+            values = np.asarray(np.load(folder / f"{i}.npy", mmap_mode="r"))
+            if name in categories:
+                # Only the distinct strings are unpickled; every row references one of them,
+                # so the column keeps its object dtype at 8 bytes a row.
+                values = categories[name].take(values)
+            data[name] = values
+        else:
+            # `.array` keeps the pickled columns' string, category and nullable dtypes.
+            data[name] = rest[name].array
+    # copy=False keeps the memory-mapped columns backed by the shared pages.
+    return pd.DataFrame(data, index=index, columns=columns, copy=False)
+
+
+def _write_arrow(frame: pd.DataFrame, path: Path) -> None:
+    mixed = [name for name, col in frame.items() if _mixed(col)]
+    # large_string is what string[pyarrow] holds in memory, so reading it back needs no cast.
+    text = {name: col.astype(pd.StringDtype("pyarrow")) for name, col in frame.items() if _text(col)}
+    table = pa.Table.from_pandas(frame.drop(columns=mixed).assign(**text), preserve_index=True)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    with open(path.with_suffix(".pkl"), "wb") as f:
+        pickle.dump((list(frame.columns), frame[mixed]), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_arrow(path: Path) -> pd.DataFrame:
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    # The pandas metadata records text as plain "string" (Python storage), which would
+    # rebuild every value; map large_string back to string[pyarrow] over the mapped buffers.
+    frame = table.to_pandas(split_blocks=True, types_mapper={pa.large_string(): pd.StringDtype("pyarrow")}.get)
+    with open(path.with_suffix(".pkl"), "rb") as f:
+        columns, mixed = pickle.load(f)
+    for name, col in mixed.items():
+        frame.insert(columns.index(name), name, col.array)
+    return frame
+
+
+@dataclass(frozen=True)
+class SharedFrames:
+    """One published version: its frames, picklable `extras` and JSON `meta`."""
+
+    version: int
+    frames: dict[str, pd.DataFrame]
+    extras: Any = None
+    meta: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SharedFrameStore:
+    """
+    Versioned frames written once and mapped read-only by every process that
+    loads them. Each version is a directory `<root>/v<version>/` holding one
+    Arrow IPC file per frame when pyarrow is installed, else one folder per
+    frame of memory-mapped .npy columns (text as dictionary codes); columns
+    neither can map are pickled alongside. `CURRENT`
+    names the live version and is replaced atomically, so readers poll it
+    cheaply with `current()`. The newest `keep` versions are retained for
+    processes still mapping an older one.
+    """
+
+    root: Path
+    keep: int = 2
+
+    def _version_dir(self, version: int) -> Path:
+        return Path(self.root) / f"v{version}"
+
+    def current(self) -> dict[str, Any] | None:
+        """Contents of CURRENT ({"version", "published_at", "format", "frames", "meta"}), or None."""
+        try:
+            return json.loads((Path(self.root) / _CURRENT_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def current_version(self) -> int | None:
+        info = self.current()
+        return None if info is None else int(info["version"])
+
+    def publish(
+        self,
+        frames: Mapping[str, pd.DataFrame],
+        *,
+        extras: Any = None,
+        meta: Mapping[str, Any] | None = None,
+    ) -> int:
+        """Write a new version and make it current; returns its version number."""
+        root = Path(self.root)
+        root.mkdir(parents=True, exist_ok=True)
+        version = (self.current_version() or 0) + 1
+        while self._version_dir(version).exists():
+            version += 1
+        tmp = root / f".v{version}.{uuid.uuid4().hex}"
+        tmp.mkdir()
+        for name, frame in frames.items():
+            if SHARED_FRAME_FORMAT == "arrow":
+                _write_arrow(frame, tmp / f"{name}.arrow")
+            else:
+                _write_npy(frame, tmp / name)
+        with open(tmp / _EXTRAS_FILE, "wb") as f:
+            pickle.dump(extras, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._version_dir(version))
+
+        info = {
+            "version": version,
+            "published_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "format": SHARED_FRAME_FORMAT,
+            "frames": list(frames),
+            "meta": dict(meta or {}),
+        }
+        current_tmp = root / f".{_CURRENT_FILE}.{uuid.uuid4().hex}"
+        current_tmp.write_text(json.dumps(info, default=str), encoding="utf-8")
+        os.replace(current_tmp, root / _CURRENT_FILE)
+        self._prune(version)
+        return version
+
+    def _prune(self, latest: int) -> None:
+        for path in Path(self.root).glob("v*"):
+            try:
+                version = int(path.name[1:])
+            except ValueError:
+                continue
+            if version <= latest - self.keep:
+                # A process may still map these files; Windows refuses and we retry next publish.
+                shutil.rmtree(path, ignore_errors=True)
+
+    def load(self) -> SharedFrames | None:
+        """
+        Map the current version's frames; None when nothing is published.
+        Fixed-width and text columns stay backed by the shared files (read-only):
+        text comes back as string[pyarrow]. Without pyarrow, text is stored as
+        mapped dictionary codes and each process rebuilds only references to
+        the distinct strings. Mixed-type object columns are unpickled per process.
+        """
+        info = self.current()
+        if info is None:
+            return None
+        folder = self._version_dir(int(info["version"]))
+        frames = {}
+        for name in info["frames"]:
+            if info.get("format") == "arrow":
+                frames[name] = _read_arrow(folder / f"{name}.arrow")
+            else:
+                frames[name] = _read_npy(folder / name)
+        with open(folder / _EXTRAS_FILE, "rb") as f:
+            extras = pickle.load(f)
+        return SharedFrames(version=int(info["version"]), frames=frames, extras=extras, meta=info.get("meta", {}))
+
+    def try_lock(self, *, stale_seconds: float = 600) -> bool:
+        """Claim the right to build the next version; a lock older than `stale_seconds` is taken over."""
+        root = Path(self.root)
+        root.mkdir(parents=True, exist_ok=True)
+        path = root / _LOCK_FILE
+        try:
+            if time.time() - path.stat().st_mtime > stale_seconds:
+                path.unlink()
+        except OSError:
+            pass
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+
+    def is_locked(self) -> bool:
+        return (Path(self.root) / _LOCK_FILE).exists()
+
+    def unlock(self) -> None:
+        try:
+            (Path(self.root) / _LOCK_FILE).unlink()
+        except OSError:
+            pass
+
+
+__all__ = ["SHARED_FRAME_FORMAT", "SharedFrameStore", "SharedFrames"]
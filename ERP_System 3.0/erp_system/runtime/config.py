@@ -18,3 +18,5 @@ TBL_LEDGER = "ledger_analytics"
 TBL_ITEM_SUMMARY = "item_summary"
 TBL_ITEM_ATP = "item_atp"
 TBL_SO_ASSIGNMENT_RUNS = "so_assignment_runs"
+TBL_ETL_RUN_METRICS = "etl_run_metrics"
+TBL_ETL_RUNS = "etl_runs"
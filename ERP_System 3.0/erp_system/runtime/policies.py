@@ -1,9 +1,26 @@
+import os
+
 WORD_FILE_API_URLS = (
     "http://127.0.0.1:5001/api/word-files",
     "http://localhost:5001/api/word-files",
     "http://192.168.60.133:5001/api/word-files",
 )
 
+STAGE_CACHE_DIR = os.getenv("ERP_STAGE_CACHE_DIR", ".stage_cache")
+STAGE_CACHE_MAX_AGE_DAYS = 7
+STAGE_CACHE_MAX_BYTES = 2 * 1024**3
+# Parsed copies of input workbooks, reused until the source file's mtime/size changes.
+EXCEL_CACHE_DIR = os.getenv("ERP_EXCEL_CACHE_DIR", os.path.join(STAGE_CACHE_DIR, "excel"))
+# Web snapshot written once and memory-mapped by every server worker; unset keeps a per-process load.
+SHARED_SNAPSHOT_DIR = os.getenv("ERP_SHARED_SNAPSHOT_DIR") or None
+# parse_description results: entries kept in memory, and their on-disk copy reused across runs.
+DESCRIPTION_PARSE_CACHE_SIZE = 50_000
+DESCRIPTION_PARSE_CACHE_PATH = os.getenv(
+    "ERP_DESCRIPTION_PARSE_CACHE", os.path.join(STAGE_CACHE_DIR, "description_parse.pkl")
+)
+# Dated Parquet history of each run's inputs and outputs (for backtesting).
+SNAPSHOT_ARCHIVE_DIR = os.getenv("ERP_SNAPSHOT_DIR", os.path.join("data", "snapshots"))
+
 GOOGLE_SHEET_SPREADSHEET = "PDF_WO"
 GOOGLE_SHEET_WORKSHEET = "Open Sales Order"
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
-from erp_system.normalize.erp_normalize import normalize_item
+from erp_system.normalize.erp_normalize import normalize_series
 
 from .common import _norm_key
 from .sales_order import normalize_wo_number
@@ -43,7 +43,7 @@ def build_wip_lookup(so_full: pd.DataFrame, word_files_df: pd.DataFrame) -> pd.D
     )
 
     wip = wip_qty.merge(wip_list, on="Part_Number", how="outer")
-    wip["Part_Number"] = wip["Part_Number"].astype(str).str.strip().map(normalize_item)
+    wip["Part_Number"] = normalize_series(wip["Part_Number"].astype(str).str.strip())
     wip["WIP_Qty"] = pd.to_numeric(wip["WIP_Qty"], errors="coerce").fillna(0)
     wip["WIP"] = wip["WIP"].fillna("")
     return wip
@@ -52,7 +52,7 @@ def build_wip_lookup(so_full: pd.DataFrame, word_files_df: pd.DataFrame) -> pd.D
 def transform_inventory(inventory_df: pd.DataFrame, wip_lookup: pd.DataFrame | None = None) -> pd.DataFrame:
     inv = inventory_df.copy()
     inv = inv.rename(columns={"Unnamed: 0": "Part_Number"})
-    inv["Part_Number"] = inv["Part_Number"].astype(str).str.strip().map(normalize_item)
+    inv["Part_Number"] = normalize_series(inv["Part_Number"].astype(str).str.strip())
     for c in ["On Hand", "On Sales Order", "On PO", "Available", "On Hand - WIP", "WIP_Qty"]:
         if c in inv.columns:
             inv[c] = pd.to_numeric(inv[c], errors="coerce").fillna(0)
@@ -62,7 +62,7 @@ def transform_inventory(inventory_df: pd.DataFrame, wip_lookup: pd.DataFrame | N
         if "Part_Number" not in wip.columns and "Item" in wip.columns:
             wip["Part_Number"] = wip["Item"]
         if "Part_Number" in wip.columns:
-            wip["Part_Number"] = wip["Part_Number"].astype(str).str.strip().map(normalize_item)
+            wip["Part_Number"] = normalize_series(wip["Part_Number"].astype(str).str.strip())
             keep_cols = [c for c in ["Part_Number", "WIP", "WIP_Qty", "On Hand - WIP"] if c in wip.columns]
             wip = wip.loc[:, keep_cols].drop_duplicates(subset=["Part_Number"])
             inv = inv.merge(wip, on="Part_Number", how="left", suffixes=("", "_src"))
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import pandas as pd
 
-from erp_system.normalize.erp_normalize import normalize_item
+from erp_system.normalize.erp_normalize import normalize_series
 from erp_system.runtime.constants import PLACEHOLDER_DATE
 from erp_system.runtime.policies import EXCLUDED_POD_SOURCE_NAMES
 
@@ -52,7 +52,7 @@ def transform_pod(df_pod: pd.DataFrame) -> pd.DataFrame:
     if "Source Name" in pod.columns and "Deliv Date" in pod.columns:
         mask = ~pod["Source Name"].astype(str).isin(EXCLUDED_POD_SOURCE_NAMES)
         pod.loc[mask, "Ship Date"] = pod.loc[mask, "Deliv Date"]
-    pod["Item"] = pod["Item"].astype(str).str.strip().map(normalize_item)
+    pod["Item"] = normalize_series(pod["Item"].astype(str).str.strip())
     for c in ["Qty(+)", "Qty", "Rcv'd", "Amount"]:
         if c in pod.columns:
             pod[c] = pd.to_numeric(pod[c], errors="coerce")
@@ -4,7 +4,7 @@ import re
 
 import pandas as pd
 
-from erp_system.normalize.erp_normalize import normalize_item
+from erp_system.normalize.erp_normalize import normalize_series
 
 
 def normalize_wo_number(wo: str) -> str:
@@ -24,7 +24,7 @@ def transform_sales_order(df_sales_order: pd.DataFrame) -> pd.DataFrame:
     df = df[~df["Item"].str.lower().isin(["forwarding charge", "tariff (estimation)"])]
     if "Inventory Site" in df.columns:
         df = df[df["Inventory Site"].astype(str).str.strip() == "WH01S-NTA"]
-    df["Item"] = df["Item"].map(normalize_item)
+    df["Item"] = normalize_series(df["Item"])
     return df
 
 
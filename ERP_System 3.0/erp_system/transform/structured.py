@@ -3,7 +3,7 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
-from erp_system.normalize.erp_normalize import normalize_item
+from erp_system.normalize.erp_normalize import normalize_series
 from erp_system.runtime.constants import PLACEHOLDER_DATE
 from erp_system.runtime.policies import EXCLUDED_PREINSTALLED_PO_VENDORS
 
@@ -61,7 +61,7 @@ def build_structured_df(
 
     pdf_ref = pdf_orders_df.rename(columns={"WO": "QB Num", "Product Number": "Item"})
     final_sales_order = reorder_df_out_by_output(pdf_ref, df_out)
-    final_sales_order["Item"] = final_sales_order["Item"].map(normalize_item)
+    final_sales_order["Item"] = normalize_series(final_sales_order["Item"])
     final_sales_order = final_sales_order.loc[:, ~final_sales_order.columns.duplicated()]
 
     word_pick = word_files_df.copy()
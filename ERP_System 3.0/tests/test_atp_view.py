@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from erp_system.ledger.atp import (
+    AtpIndex,
+    build_atp_view,
+    build_atp_view_chunked,
+    earliest_atp_batch,
+    earliest_atp_strict,
+)
+
+
+def _ledger() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Item_raw": ["B", "A", "A", "Total A", "A", "B", None],
+            "Date": pd.to_datetime(
+                ["2026-07-02", "2026-07-03", "2026-07-01", "2026-07-01", "2026-07-02", "2026-07-01", "2026-07-01"]
+            ),
+            "Projected_NAV": [4, 1, 5, -9, np.nan, 6, 0],
+        }
+    )
+
+
+def test_build_atp_view_future_min_per_item() -> None:
+    view = build_atp_view(_ledger())
+
+    assert view["Item"].tolist() == ["A", "A", "A", "B", "B"]
+    assert view["Date"].dt.day.tolist() == [1, 2, 3, 1, 2]
+    assert view["FutureMin_NAV"].tolist() == [1, 1, 1, 4, 4]
+
+
+def test_build_atp_view_chunked_matches_full_view() -> None:
+    ledger = _ledger()
+
+    pd.testing.assert_frame_equal(build_atp_view_chunked(ledger, items_per_chunk=1), build_atp_view(ledger))
+
+
+def test_atp_index_matches_earliest_atp_strict() -> None:
+    view = build_atp_view(
+        pd.DataFrame(
+            {
+                "Item": ["A", "A", "A", "A"],
+                "Date": pd.to_datetime(["2026-07-01", "2026-07-02", "2026-07-03", "2026-07-04"]),
+                "Projected_NAV": [3, 1, 4, 6],
+            }
+        )
+    )
+    index = AtpIndex.from_atp_view(view)
+    start = pd.Timestamp("2026-07-01")
+
+    for qty in (0, 1, 2, 4, 6, 7):
+        for allow_zero in (True, False):
+            expected = earliest_atp_strict(view, "A", qty, start, allow_zero=allow_zero)
+            assert index.earliest("A", qty, start, allow_zero=allow_zero) == expected
+    assert index.earliest("A", 1, start) == pd.Timestamp("2026-07-01")
+    assert index.earliest("A", 1, start, allow_zero=False) == pd.Timestamp("2026-07-03")
+    assert index.earliest("A", 4, pd.Timestamp("2026-07-04")) == pd.Timestamp("2026-07-04")
+    assert index.earliest("B", 1, start) is None
+    assert index.earliest_for_items({"A": 2, "B": 1}, start) is None
+
+
+def test_earliest_atp_batch_matches_single_lookups() -> None:
+    view = build_atp_view(
+        pd.DataFrame(
+            {
+                "Item": ["A", "A", "A", "B", "B"],
+                "Date": pd.to_datetime(["2026-07-01", "2026-07-02", "2026-07-03", "2026-07-01", "2026-07-05"]),
+                "Projected_NAV": [3, 1, 4, 2, 2],
+            }
+        )
+    )
+    requests = pd.DataFrame(
+        {
+            "request_id": ["r1", "r2", "r3", "r4", "r5"],
+            "item": ["A", "A", "B", "C", "A"],
+            "qty": [1, 4, 2, 1, 1],
+            "from_date": pd.to_datetime(["2026-07-01", "2026-07-01", "2026-07-02", "2026-07-01", "2026-07-04"]),
+        }
+    )
+
+    out = earliest_atp_batch(view, requests)
+
+    assert out["request_id"].tolist() == ["r1", "r2", "r3", "r4", "r5"]
+    assert out["earliest_date"].dt.strftime("%Y-%m-%d").fillna("").tolist() == [
+        "2026-07-01",
+        "2026-07-03",
+        "2026-07-05",
+        "",
+        "",
+    ]
+
+
+def test_earliest_atp_batch_parses_each_from_date_on_its_own() -> None:
+    view = build_atp_view(
+        pd.DataFrame(
+            {
+                "Item": ["A", "A", "A"],
+                "Date": pd.to_datetime(["2026-07-01", "2026-07-10", "2026-07-20"]),
+                "Projected_NAV": [5, 5, 5],
+            }
+        )
+    )
+    index = AtpIndex.from_atp_view(view)
+    mixed = ["2026-07-05", "07/05/2026", "2026-07-05T00:00:00", pd.Timestamp("2026-07-15 13:00"), "2026-07-05T08:00:00+00:00"]
+    requests = pd.DataFrame({"item": "A", "qty": 1, "from_date": mixed})
+
+    out = index.earliest_batch(requests)
+
+    singles = [index.earliest("A", 1, value) for value in mixed]
+    assert out["earliest_date"].tolist() == singles == pd.to_datetime(["2026-07-10"] * 3 + ["2026-07-20", "2026-07-10"]).tolist()
+
+    today = pd.Timestamp.today().normalize()
+    soon = AtpIndex.from_atp_view(
+        build_atp_view(
+            pd.DataFrame({"Item": ["A", "A"], "Date": [today - pd.Timedelta(days=1), today + pd.Timedelta(days=5)], "Projected_NAV": [0, 5]})
+        )
+    )
+    missing = soon.earliest_batch(pd.DataFrame({"item": "A", "qty": 1, "from_date": [None, "", np.nan]}))
+    assert missing["earliest_date"].tolist() == [soon.earliest("A", 1)] * 3 == [today + pd.Timedelta(days=5)] * 3
+
+    for bad in ("not a date", ["2026-07-05"]):
+        with pytest.raises(ValueError, match="from_date"):
+            index.earliest_batch(pd.DataFrame({"item": ["A", "A"], "qty": 1, "from_date": ["2026-07-05", bad]}))
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from erp_system.cli import backtest as backtest_cli
+from erp_system.ledger.backtest import backtest_projections, summarize_backtest
+from erp_system.pipeline import SnapshotArchive
+
+
+def _ledger(run_date: str) -> pd.DataFrame:
+    # Item A opens at 10: an SO takes 4 on 07/03, a POD brings 6 on 07/09 (same-day SO takes 1 after it).
+    return pd.DataFrame(
+        {
+            "Item": ["A", "A", "A", "A", "b "],
+            "Date": pd.to_datetime([run_date, "2026-07-03", "2026-07-09", "2026-07-09", run_date]),
+            "Kind": ["OPEN", "OUT", "IN", "OUT", "OPEN"],
+            "Source": ["OPEN", "SO", "POD", "SO", "OPEN"],
+            "Delta": [0.0, -4.0, 6.0, -1.0, 0.0],
+            "Opening": [10.0, 10.0, 10.0, 10.0, 3.0],
+            "Projected_NAV": [10.0, 6.0, 12.0, 11.0, 3.0],
+        }
+    )
+
+
+def _inventory(on_hand_a: float, on_hand_b: float) -> pd.DataFrame:
+    return pd.DataFrame({"Part_Number": ["A", "B"], "On Hand": [on_hand_a, on_hand_b]})
+
+
+def test_backtest_uses_as_of_projection_per_horizon() -> None:
+    ledgers = _ledger("2026-07-01").assign(run_date=pd.Timestamp("2026-07-01"))
+    inventory = pd.concat(
+        [
+            _inventory(10, 3).assign(run_date=pd.Timestamp("2026-07-01")),
+            _inventory(7, 3).assign(run_date=pd.Timestamp("2026-07-06")),  # horizon 4 slips to 07/06
+            _inventory(13, 2).assign(run_date=pd.Timestamp("2026-07-09")),
+        ],
+        ignore_index=True,
+    )
+
+    detail = backtest_projections(ledgers, inventory, horizons=[4, 8], tolerance_days=1)
+
+    a = detail.loc[detail["Item"].eq("A")].set_index("horizon_days")
+    assert a.loc[4, "target_date"] == pd.Timestamp("2026-07-06")
+    assert (a.loc[4, "Predicted_NAV"], a.loc[4, "Error"], a.loc[4, "Driver_Source"]) == (6.0, -1.0, "SO")
+    # Closing NAV of 07/09 is the last row of the day; flows split by source.
+    assert (a.loc[8, "Predicted_NAV"], a.loc[8, "Pred_SO"], a.loc[8, "Pred_POD"]) == (11.0, -5.0, 6.0)
+    assert a.loc[8, "Naive_Error"] == -3.0
+    b = detail.loc[detail["Item"].eq("B")].set_index("horizon_days")
+    assert (b.loc[8, "Predicted_NAV"], b.loc[8, "Driver_Source"], b.loc[8, "Error"]) == (3.0, "OPEN", 1.0)
+
+    summary = summarize_backtest(detail)
+    by_source = summary["by_source"].set_index("Source")
+    assert by_source.loc["POD", "Forecasts"] == 1 and by_source.loc["SO", "Forecasts"] == 2
+    assert by_source.loc["none", "MAE"] == pytest.approx(0.5)
+
+
+def test_backtest_cli_reads_the_archive(tmp_path, capsys) -> None:
+    archive = SnapshotArchive(tmp_path / "archive")
+    for day, (a, b) in {"2026-07-01": (10, 3), "2026-07-05": (6, 3), "2026-07-09": (11, 3)}.items():
+        run_id = f"run_{day.replace('-', '')}_060000"
+        archive.write("ledger_analytics", _ledger(day), run_date=day, run_id=run_id)
+        archive.write("inventory_status", _inventory(a, b), run_date=day, run_id=run_id)
+
+    code = backtest_cli.main(["--archive", str(tmp_path / "archive"), "--horizons", "4", "--out", str(tmp_path / "out")])
+
+    assert code == 0
+    assert "Backtested 3 ledger runs x 1 horizons: 4 forecasts" in capsys.readouterr().out
+    assert len(list((tmp_path / "out").glob("*_summary.xlsx"))) == 1
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from erp_system.ingest import io_ops
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Item": ["A", "B", "C"],
+            "Qty": [1.5, np.nan, 3.0],
+            "Name": ["x", "", None],
+            "Date": pd.to_datetime(["2026-07-01", None, "2026-07-03"]),
+        }
+    )
+
+
+def test_write_to_db_and_replace_item_rows_round_trip(tmp_path, monkeypatch) -> None:
+    eng = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    monkeypatch.setattr(io_ops, "engine", lambda: eng)
+
+    io_ops.write_to_db(_frame(), schema="main", table="t")
+    io_ops.write_to_db(_frame().iloc[:1], schema="main", table="t", if_exists="append")
+    io_ops.replace_item_rows(_frame().iloc[[1]].assign(Qty=9.0), schema="main", table="t", items=["B"])
+
+    out = pd.read_sql('SELECT * FROM "main"."t" ORDER BY "Item", "Qty"', eng)
+    assert out["Item"].tolist() == ["A", "A", "B", "C"]
+    assert out["Qty"].tolist() == [1.5, 1.5, 9.0, 3.0]
+
+
+class _Psycopg2Cursor:
+    def __init__(self, sink: dict) -> None:
+        self.sink = sink
+
+    def copy_expert(self, sql: str, file: StringIO) -> None:
+        self.sink["sql"] = sql
+        self.sink["payload"] = file.read()
+
+    def close(self) -> None:
+        pass
+
+
+class _Connection:
+    def __init__(self, sink: dict) -> None:
+        self.connection = self
+        self.sink = sink
+
+    def cursor(self) -> _Psycopg2Cursor:
+        return _Psycopg2Cursor(self.sink)
+
+
+def test_postgres_copy_payload_keeps_nulls_apart_from_empty_strings() -> None:
+    sink: dict = {}
+    io_ops._copy_rows_postgres(_Connection(sink), io_ops._prepare_for_db(_frame()), "public", "t")
+
+    assert sink["sql"] == (
+        'COPY "public"."t" ("Item", "Qty", "Name", "Date") FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'
+    )
+    assert sink["payload"].splitlines() == [
+        "A,1.5,x,2026-07-01",
+        "B,\\N,,\\N",
+        "C,3.0,\\N,2026-07-03",
+    ]
+
+
+def test_write_to_db_fails_loudly_when_the_schema_cannot_be_created(tmp_path, monkeypatch) -> None:
+    eng = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    monkeypatch.setattr(io_ops, "engine", lambda: eng)
+
+    io_ops.ensure_schema("main")  # exists already; nothing to create
+    with pytest.raises(RuntimeError, match="schema 'missing'"):
+        io_ops.write_to_db(_frame(), schema="missing", table="t")
+
+
+def test_parallel_writes_to_a_fresh_duckdb_all_bulk_load(tmp_path, monkeypatch, caplog) -> None:
+    pytest.importorskip("duckdb_engine")
+    eng = create_engine(f"duckdb:///{tmp_path / 'erp.duckdb'}")
+    monkeypatch.setattr(io_ops, "engine", lambda: eng)
+    tables = [f"t{i}" for i in range(8)]
+
+    with caplog.at_level(logging.WARNING), ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda table: io_ops.write_to_db(_frame(), schema="public", table=table), tables))
+
+    assert not [r for r in caplog.records if "falling back" in r.getMessage()]
+    assert sorted(inspect(eng).get_table_names(schema="public")) == tables
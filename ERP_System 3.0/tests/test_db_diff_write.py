@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from erp_system.contracts import KEY_LINE_COLUMN
+from erp_system.ingest import io_ops
+
+
+KEYS = ("QB Num", "Item")
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "QB Num": ["SO1", "SO1", "SO1", "SO2"],
+            "Item": ["A", "A", "B", "C"],
+            "Qty": [1.0, 2.0, 3.0, 4.0],
+            "Ship Date": pd.to_datetime(["2026-07-01", "2026-07-02", None, "2026-07-04"]),
+            "Picked_Flag": [True, False, False, True],
+        }
+    )
+
+
+def _read(eng, table: str) -> pd.DataFrame:
+    return pd.read_sql(f'SELECT * FROM "main"."{table}" ORDER BY "QB Num", "Item", "{KEY_LINE_COLUMN}"', eng)
+
+
+def test_write_table_diff_applies_only_changed_rows(tmp_path, monkeypatch) -> None:
+    eng = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    monkeypatch.setattr(io_ops, "engine", lambda: eng)
+
+    first = io_ops.write_table_diff(_frame(), "main", "wo", KEYS)
+    assert first["full_rewrite"] and first["inserted"] == 4
+    assert _read(eng, "wo")[KEY_LINE_COLUMN].tolist() == [0, 1, 0, 0]
+
+    # Unchanged content round-trips through the database without a write.
+    same = io_ops.write_table_diff(_frame(), "main", "wo", KEYS)
+    assert (same["unchanged"], same["inserted"], same["updated"], same["deleted"]) == (4, 0, 0, 0)
+
+    # Second SO1/A line changes, SO2/C goes away, SO3/D is new.
+    current = pd.concat(
+        [_frame().iloc[:3], pd.DataFrame({"QB Num": ["SO3"], "Item": ["D"], "Qty": [5.0]})], ignore_index=True
+    )
+    current.loc[1, "Qty"] = 9.0
+    counts = io_ops.write_table_diff(current, "main", "wo", KEYS, target="wo__staging")
+    assert (counts["inserted"], counts["updated"], counts["deleted"], counts["unchanged"]) == (1, 1, 1, 2)
+
+    staged = _read(eng, "wo__staging")
+    assert staged["QB Num"].tolist() == ["SO1", "SO1", "SO1", "SO3"]
+    assert staged["Qty"].tolist() == [1.0, 9.0, 3.0, 5.0]
+    assert len(_read(eng, "wo")) == 4  # the live table is left for the publish swap
+
+
+def test_write_table_diff_ignores_datetime_units(tmp_path, monkeypatch) -> None:
+    eng = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    monkeypatch.setattr(io_ops, "engine", lambda: eng)
+    io_ops.write_table_diff(_frame(), "main", "wo", KEYS)
+
+    for unit in ("s", "us"):
+        frame = _frame().astype({"Ship Date": f"datetime64[{unit}]"})
+        counts = io_ops.write_table_diff(frame, "main", "wo", KEYS)
+        assert (counts["unchanged"], counts["updated"], counts["inserted"], counts["deleted"]) == (4, 0, 0, 0)
+
+    changed = _frame().astype({"Ship Date": "datetime64[s]"})
+    changed.loc[0, "Ship Date"] = pd.Timestamp("2026-08-01")
+    counts = io_ops.write_table_diff(changed.drop(index=3), "main", "wo", KEYS)
+    assert (counts["unchanged"], counts["updated"], counts["deleted"]) == (2, 1, 1)
+
+
+def test_write_table_diff_rewrites_when_columns_change(tmp_path, monkeypatch) -> None:
+    eng = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    monkeypatch.setattr(io_ops, "engine", lambda: eng)
+
+    io_ops.write_table_diff(_frame(), "main", "wo", KEYS)
+    counts = io_ops.write_table_diff(_frame().assign(Extra="x"), "main", "wo", KEYS)
+
+    assert counts["full_rewrite"]
+    assert _read(eng, "wo")["Extra"].tolist() == ["x"] * 4
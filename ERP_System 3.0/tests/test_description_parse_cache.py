@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pickle
+
+from erp_system.ledger.events import DescriptionParseCache, parse_description
+
+
+DESCRIPTION = "SEMIL-1708-FF, including i7-9700E, DDR4-16GB-32-IK2 and M.280-SSD-1TB-PCIe4-TLCWT-IK1"
+
+
+def test_cache_counts_hits_and_evicts_least_recent() -> None:
+    cache = DescriptionParseCache(maxsize=2)
+
+    first = cache.parse(DESCRIPTION)
+    assert cache.parse(DESCRIPTION) is first
+    cache.parse("A, including B")
+    cache.parse("C, including D")
+
+    assert len(cache) == 2
+    assert cache.stats() == {"lookups": 4, "hits": 1, "disk_hits": 0, "misses": 3, "hit_rate": 0.25, "entries": 2}
+    cache.parse(DESCRIPTION)
+    assert cache.misses == 4
+    assert (first[0], list(first[1])) == parse_description(DESCRIPTION)
+
+
+def test_saved_cache_serves_the_next_run(tmp_path) -> None:
+    path = tmp_path / "parse.pkl"
+    writer = DescriptionParseCache()
+    writer.parse(DESCRIPTION)
+    writer.save(path)
+
+    reader = DescriptionParseCache()
+    assert reader.load(path) == 1
+    assert reader.parse(DESCRIPTION) == ("SEMIL-1708-FF", ("i7-9700E", "DDR4-16GB-32-IK2", "M.280-SSD-1TB-PCIe4-TLCWT-IK1"))
+    assert reader.stats()["disk_hits"] == 1
+    assert reader.stats()["misses"] == 0
+
+
+def test_cache_from_another_grammar_is_ignored(tmp_path) -> None:
+    path = tmp_path / "parse.pkl"
+    path.write_bytes(pickle.dumps({"grammar": "old", "entries": [(DESCRIPTION, ("WRONG", ()))]}))
+
+    cache = DescriptionParseCache()
+    assert cache.load(path) == 0
+    assert cache.load(tmp_path / "missing.pkl") == 0
+    assert cache.parse(DESCRIPTION)[0] == "SEMIL-1708-FF"
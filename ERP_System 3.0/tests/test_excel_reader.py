@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import os
+
+import pandas as pd
+
+from erp_system.ingest.excel_reader import cached_file_read, read_excel_fast
+
+
+def test_read_excel_fast_keeps_requested_columns(tmp_path) -> None:
+    path = tmp_path / "schedule.xlsx"
+    pd.DataFrame({"Model Name": ["A", "B"], "Unused": [1, 2], "Order Qty": [3, 4]}).to_excel(path, index=False)
+
+    df = read_excel_fast(path, columns=["Model Name", "Order Qty", "Missing"], cache_dir=tmp_path / "cache")
+
+    assert df.columns.tolist() == ["Model Name", "Order Qty"]
+    assert df["Order Qty"].tolist() == [3, 4]
+
+
+def test_cached_file_read_reuses_copy_until_file_changes(tmp_path) -> None:
+    path = tmp_path / "book.xlsx"
+    path.write_bytes(b"v1")
+    calls: list[bytes] = []
+
+    def read(p):
+        calls.append(p.read_bytes())
+        return {"content": p.read_bytes()}
+
+    for _ in range(2):
+        assert cached_file_read(path, "t", read, cache_dir=tmp_path / "cache") == {"content": b"v1"}
+    cached_file_read(path, "other", read, cache_dir=tmp_path / "cache")
+
+    path.write_bytes(b"v22")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    assert cached_file_read(path, "t", read, cache_dir=tmp_path / "cache") == {"content": b"v22"}
+    assert calls == [b"v1", b"v1", b"v22"]
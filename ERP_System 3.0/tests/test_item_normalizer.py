@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from erp_system.normalize.erp_normalize import ItemNormalizer, normalize_item, normalize_series
+
+
+def test_normalize_series_matches_per_value_normalization() -> None:
+    values = [
+        " PA-280W-CW6P-2P-1 ",
+        "gc_orinnx16g jp5.1",
+        "GC-Jetson-NX16G-Orin-Nvidia JetPack 6",
+        "GC-ORINNX8G-JETPACK",
+        "PART-1",
+        "",
+        None,
+        np.nan,
+        "PART-1",
+    ]
+    series = pd.Series(values, index=range(10, 19), name="Item")
+
+    out = normalize_series(series)
+
+    assert out.index.equals(series.index) and out.name == "Item"
+    assert out.tolist()[:6] == [normalize_item(v) for v in values[:6]]
+    assert out.tolist()[:6] == [
+        "PA-280W-CW6P-2P",
+        "GC-JETSON-NX16G-ORIN-NVIDIA",
+        "GC-Jetson-NX16G-Orin-Nvidia",
+        "GC-JETSON-NX8G-ORIN-NVIDIA",
+        "PART-1",
+        "",
+    ]
+    assert out.iloc[6] is None and np.isnan(out.iloc[7])
+    # Mixed object values keep their own string forms.
+    assert normalize_series(pd.Series([5, 5.0], dtype=object)).tolist() == ["5", "5.0"]
+
+
+def test_first_matching_pattern_wins_in_the_combined_regex() -> None:
+    normalizer = ItemNormalizer(
+        {"CANON-B": "CANON-B-FULL"},
+        [(re.compile(r"^X-\d+$"), "CANON-A"), (re.compile(r"^x-.*$", re.IGNORECASE), "CANON-B")],
+    )
+
+    assert normalizer.normalize("X-12") == "CANON-A"
+    assert normalizer.normalize("x-ab") == "CANON-B-FULL"
+    assert normalizer.normalize("Y-1") == "Y-1"
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from erp_system.ledger.engine import LedgerArrays, build_ledger_arrays, segment_suffix_min
+
+
+def _events() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"Date": "2099-07-03", "Item": "B", "Delta": -2, "Kind": "OUT", "Source": "SO", "QB Num": "SO-2"},
+            {"Date": "2099-07-01", "Item": "A", "Delta": -4, "Kind": "OUT", "Source": "SO", "QB Num": "SO-1"},
+            {"Date": "2099-07-01", "Item": "A", "Delta": 3, "Kind": "IN", "Source": "POD", "QB Num": "PO-1"},
+            {"Date": "2099-07-05", "Item": "A", "Delta": -1, "Kind": "OUT", "Source": "SO", "QB Num": "SO-3"},
+        ]
+    )
+
+
+def test_build_ledger_arrays_projects_nav_per_item() -> None:
+    stock = pd.DataFrame({"Item": ["A", "B"], "Opening": [2, 1]})
+
+    arrays = build_ledger_arrays(_events(), stock)
+
+    assert arrays.items.tolist() == ["A", "B"]
+    assert arrays.offsets.tolist() == [0, 4, 6]
+    a = arrays.item_slice("A")
+    # OPEN first, then IN before OUT on the same day.
+    assert arrays.projected_nav[a].tolist() == [2, 5, 1, 0]
+    assert arrays.item_min_projected().tolist() == [0, -1]
+    item_pos, rows = arrays.first_negative_rows()
+    assert item_pos.tolist() == [1]
+    assert rows.tolist() == [5]
+
+    frame = arrays.to_frame()
+    assert frame["Kind"].astype(str).tolist() == ["OPEN", "IN", "OUT", "OUT", "OPEN", "OUT"]
+    assert frame["QB Num"].tolist()[1:4] == ["PO-1", "SO-1", "SO-3"]
+
+
+def test_ledger_arrays_round_trip_from_frame() -> None:
+    stock = pd.DataFrame({"Item": ["A", "B"], "Opening": [2, 1]})
+    arrays = build_ledger_arrays(_events(), stock)
+
+    rebuilt = LedgerArrays.from_ledger(arrays.to_frame())
+
+    assert rebuilt.items.tolist() == arrays.items.tolist()
+    np.testing.assert_array_equal(rebuilt.projected_nav, arrays.projected_nav)
+    np.testing.assert_array_equal(rebuilt.opening, arrays.opening)
+
+
+def test_segment_suffix_min_restarts_per_item() -> None:
+    values = np.array([3.0, 1.0, np.nan, 5.0, 2.0, 4.0])
+    offsets = np.array([0, 3, 6])
+
+    out = segment_suffix_min(values, offsets)
+
+    assert out.tolist() == [1.0, 1.0, np.inf, 2.0, 2.0, 4.0]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from erp_system.ledger.incremental import build_ledger_incremental
+from erp_system.ledger.ledger import build_ledger_from_events
+
+
+AS_OF = pd.Timestamp("2099-07-01")
+
+
+def _so() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"Item": "A", "On Hand": 5, "Qty(-)": 2, "QB Num": "SO-1", "Name": "Cust"},
+            {"Item": "B", "On Hand": 1, "Qty(-)": 1, "QB Num": "SO-2", "Name": "Cust"},
+        ]
+    )
+
+
+def _events(qty_a: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"Date": "2099-07-03", "Item": "A", "Delta": -qty_a, "Kind": "OUT", "Source": "SO", "QB Num": "SO-1"},
+            {"Date": "2099-07-04", "Item": "B", "Delta": -1, "Kind": "OUT", "Source": "SO", "QB Num": "SO-2"},
+        ]
+    )
+
+
+def test_incremental_ledger_only_touches_changed_items() -> None:
+    previous, _, _ = build_ledger_from_events(_so(), _events(2), None)
+    previous["Date"] = previous["Date"].mask(previous["Kind"].eq("OPEN"), AS_OF)
+    previous = previous.astype({"Kind": str})
+
+    unchanged = build_ledger_incremental(_so(), _events(2), None, previous, as_of=AS_OF)
+    assert not unchanged.full_rebuild
+    assert unchanged.n_touched == 0
+
+    result = build_ledger_incremental(_so(), _events(7), None, previous, as_of=AS_OF)
+    assert result.touched_items.tolist() == ["A"]
+    rows = result.ledger.loc[result.ledger["Item"].eq("A")]
+    assert rows["Projected_NAV"].tolist() == [5, -2]
+    assert result.violations["QB Num"].tolist() == ["SO-1"]
+
+
+def test_incremental_ledger_rebuilds_without_previous_run() -> None:
+    result = build_ledger_incremental(_so(), _events(2), None, pd.DataFrame(), as_of=AS_OF)
+
+    assert result.full_rebuild
+    assert result.touched_items.tolist() == ["A", "B"]
+
+
+def test_incremental_ledger_fallback_opens_as_of() -> None:
+    # OPEN rows dated elsewhere can't be diffed against AS_OF, which forces the full build.
+    previous, _, _ = build_ledger_from_events(_so(), _events(2), None)
+    previous = previous.astype({"Kind": str})
+
+    result = build_ledger_incremental(_so(), _events(2), None, previous, as_of=AS_OF)
+
+    assert result.full_rebuild
+    opens = result.ledger.loc[result.ledger["Kind"].eq("OPEN"), "Date"]
+    assert opens.eq(AS_OF).all()
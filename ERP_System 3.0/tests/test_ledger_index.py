@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Webpage"))
+
+from ledger_index import LedgerItemIndex  # noqa: E402
+
+
+def _groupby_index(ledger: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """The per-item dict the server built before LedgerItemIndex."""
+    work = ledger.copy()
+    work["Item"] = work["Item"].astype(str).str.strip()
+    work["__item_lookup__"] = work["Item"].str.upper()
+    return {
+        str(key): grp.drop(columns=["__item_lookup__"]).copy()
+        for key, grp in work.groupby("__item_lookup__", sort=False)
+    }
+
+
+def _mask_lookup(ledger: pd.DataFrame, key: str) -> pd.DataFrame:
+    """The boolean-mask fallback for items missing from that dict."""
+    return ledger.loc[ledger["Item"].astype(str).str.strip().str.upper() == key]
+
+
+def _old_resolve(index: dict[str, pd.DataFrame], item: object) -> str:
+    raw = str(item or "").strip().upper()
+    if not raw or raw in index:
+        return raw
+    for key in index:
+        if str(key).upper() == raw:
+            return str(key)
+    return raw
+
+
+@pytest.fixture(scope="module")
+def ledger() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    items = np.array(["PART-1", "part-1", " Part-2 ", "PART-10", "X", "x ", "ß-9", "SS-9", "b"], dtype=object)
+    n = 400
+    return pd.DataFrame(
+        {
+            "Date": pd.Timestamp("2026-07-01") + pd.to_timedelta(rng.integers(0, 90, n), unit="D"),
+            "Item": items[rng.integers(0, len(items), n)],
+            "Delta": rng.normal(size=n).round(2),
+            "Projected_NAV": rng.normal(size=n).cumsum().round(2),
+        },
+        index=pd.RangeIndex(1000, 1000 + n),
+    )
+
+
+def test_slices_match_the_groupby_and_mask_lookups(ledger: pd.DataFrame) -> None:
+    index = LedgerItemIndex(ledger)
+    expected = _groupby_index(ledger)
+
+    assert sorted(index.keys()) == sorted(expected) == sorted(set(index))
+    assert len(index) == len(expected)
+    for key, frame in expected.items():
+        pd.testing.assert_frame_equal(index[key], frame)
+        pd.testing.assert_frame_equal(index.get(key), frame)
+        pd.testing.assert_frame_equal(
+            index[key].drop(columns="Item"), _mask_lookup(ledger, key).drop(columns="Item")
+        )
+    # Items that differ only in case or padding share one key, in ledger order.
+    assert index["PART-1"].index.tolist() == ledger.index[ledger["Item"].str.upper() == "PART-1"].tolist()
+    assert set(index["X"]["Item"]) == {"X", "x"}
+
+
+def test_offsets_tile_the_item_sorted_frame(ledger: pd.DataFrame) -> None:
+    index = LedgerItemIndex(ledger)
+    bounds = sorted(index.offsets.values())
+
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(index.frame) == len(ledger)
+    assert all(stop == start for (_, stop), (start, _) in zip(bounds, bounds[1:]))
+    assert all(start < stop for start, stop in bounds)
+    keys = index.frame["Item"].str.upper().tolist()
+    for key, (start, stop) in index.offsets.items():
+        assert set(keys[start:stop]) == {key}
+    pd.testing.assert_frame_equal(index.frame.drop(columns="Item").sort_index(), ledger.drop(columns="Item"))
+
+
+@pytest.mark.parametrize("item", ["part-1", " PART-1 ", "Part-2", "part-10", "x", "ß-9", "ss-9", "B", "nope", "PART", "", None])
+def test_resolve_matches_the_old_key_scan(ledger: pd.DataFrame, item) -> None:
+    index = LedgerItemIndex(ledger)
+    old = _groupby_index(ledger)
+    key = index.resolve(item)
+
+    assert key == _old_resolve(old, item)
+    if key in old:
+        pd.testing.assert_frame_equal(index[key], old[key])
+    else:
+        assert key not in index and index.get(key) is None
+        assert _mask_lookup(ledger, key).empty
+
+
+def test_casefold_resolve_finds_keys_upper_case_misses() -> None:
+    # Capital sharp s has no upper-case "SS" form, but casefolds to "ss".
+    index = LedgerItemIndex(pd.DataFrame({"Item": ["STRAẞE", "ff-1"], "Delta": [1.0, 2.0]}))
+
+    assert _old_resolve({"STRAẞE": None}, "strasse") == "STRASSE"
+    assert index.resolve("strasse") == "STRAẞE" and index.resolve("Straße") == "STRAẞE"
+    assert index.resolve("ﬀ-1") == "FF-1" and index["FF-1"]["Delta"].tolist() == [2.0]
+
+
+def test_from_sorted_wraps_the_frame_without_copying(ledger: pd.DataFrame) -> None:
+    built = LedgerItemIndex(ledger)
+    wrapped = LedgerItemIndex.from_sorted(built.frame, built.offsets)
+
+    assert wrapped.frame is built.frame and wrapped.offsets == built.offsets
+    assert np.shares_memory(wrapped["PART-1"]["Delta"].to_numpy(), built.frame["Delta"].to_numpy())
+    assert wrapped.resolve("part-10") == "PART-10"
+
+
+def test_empty_and_null_items() -> None:
+    assert len(LedgerItemIndex(None)) == 0 and LedgerItemIndex(None).get("A") is None
+    assert LedgerItemIndex(pd.DataFrame({"Delta": [1.0]})).frame.empty
+
+    index = LedgerItemIndex(pd.DataFrame({"Item": ["A", None, np.nan], "Delta": [1.0, 2.0, 3.0]}))
+    assert index["A"]["Delta"].tolist() == [1.0]
+    # Nulls stay null in the frame instead of becoming the text "None"/"nan".
+    assert index.frame["Item"].isna().sum() == 2
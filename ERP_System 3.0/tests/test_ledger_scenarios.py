@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from erp_system.ledger import (
+    ScenarioBase,
+    build_ledger_from_events,
+    evaluate_scenario,
+    evaluate_scenarios,
+    override_from_dict,
+    scenario_from_dict,
+)
+
+
+AS_OF = pd.Timestamp("2026-07-01")
+
+
+def _events() -> pd.DataFrame:
+    rows = [
+        ("2026-07-10", "CPU-A", -8.0, "OUT", "SO", "SO-1"),
+        ("2026-07-05", "CPU-A", 5.0, "IN", "POD", "POD-9"),
+        ("2026-07-20", "CPU-A", -3.0, "OUT", "SO", "SO-2"),
+        ("2026-07-08", "RAM-B", -1.0, "OUT", "SO", "SO-1"),
+    ]
+    return pd.DataFrame(rows, columns=["Date", "Item", "Delta", "Kind", "Source", "QB Num"]).assign(
+        Date=lambda d: pd.to_datetime(d["Date"])
+    )
+
+
+def _base() -> ScenarioBase:
+    return ScenarioBase.from_events(_events(), pd.DataFrame({"Item": ["CPU-A", "RAM-B"], "Opening": [7.0, 5.0]}), as_of=AS_OF)
+
+
+def test_slipping_a_pod_creates_violations_and_moves_atp() -> None:
+    scenario = scenario_from_dict({"name": "POD-9 slips", "overrides": [{"op": "move", "qb_num": "pod-9", "shift_days": 14}]})
+
+    result = evaluate_scenario(_base(), scenario)
+
+    assert result.affected_items == ("CPU-A",)
+    new = result.violations
+    assert new["Status"].tolist() == ["new"] and new["QB Num"].tolist() == ["SO-1"]
+    assert new["Scenario_Projected_NAV"].tolist() == [-1.0]
+    atp = result.atp.set_index("Item")
+    assert atp.loc["CPU-A", "Base_ATP"] == AS_OF
+    assert atp.loc["CPU-A", "Scenario_ATP"] == pd.Timestamp("2026-07-19")
+    assert atp.loc["CPU-A", "ATP_Shift_Days"] == 18
+    assert result.to_dict()["violations"][0]["Date"] == "2026-07-10"
+
+
+def test_scenarios_run_in_parallel_against_one_base_built_from_a_ledger() -> None:
+    ledger, _, _ = build_ledger_from_events(
+        pd.DataFrame({"Item": [], "Qty(-)": []}), _events(), pd.DataFrame({"Part_Number": ["CPU-A", "RAM-B"], "On Hand": [7.0, 5.0]})
+    )
+    base = ScenarioBase.from_ledger(ledger)
+    scenarios = [
+        scenario_from_dict({"name": "cut SO-2", "overrides": [{"op": "qty", "qb_num": "SO-2", "qty": 1}]}),
+        scenario_from_dict(
+            {"name": "rush order", "overrides": [{"op": "add", "item": "ram-b", "date": "2026-07-09", "qty": 6}]}
+        ),
+        scenario_from_dict({"name": "typo", "overrides": [{"op": "remove", "qb_num": "SO-404"}]}),
+    ]
+
+    results = evaluate_scenarios(base, scenarios, jobs=2)
+
+    assert [r.name for r in results] == ["cut SO-2", "rush order", "typo"]
+    assert results[0].violations.empty and results[0].atp["Scenario_Min_NAV"].tolist() == [3.0]
+    assert results[1].affected_items == ("RAM-B",)
+    assert results[1].atp["Scenario_Min_NAV"].tolist() == [-2.0]
+    assert results[2].unmatched == (0,) and results[2].affected_items == ()
+
+
+def test_added_demand_reports_its_own_violation() -> None:
+    scenario = scenario_from_dict({"name": "rush", "overrides": [{"op": "add", "item": "ram-b", "date": "2026-07-09", "qty": 6}]})
+
+    result = evaluate_scenario(_base(), scenario)
+
+    new = result.violations
+    assert new["Status"].tolist() == ["new"] and new["QB Num"].tolist() == ["Scenario"]
+    assert new["Scenario_Projected_NAV"].tolist() == [-2.0]
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        {"op": "move", "qb_num": "SO-1", "to_date": "garbage"},
+        {"op": "move", "qb_num": "SO-1", "shift_days": "soon"},
+        {"op": "move", "qb_num": "SO-1", "shift_days": 1.5},
+        {"op": "qty", "qb_num": "SO-1", "qty": "lots"},
+        {"op": "add", "item": "CPU-A", "date": "2026-07-09", "qty": 1, "kind": "MAYBE"},
+        {"op": "add", "item": "CPU-A", "date": None, "qty": 1},
+    ],
+)
+def test_bad_override_values_are_rejected_up_front(override: dict) -> None:
+    with pytest.raises(ValueError, match="Bad"):
+        override_from_dict(override)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from erp_system.ingest import io_ops
+
+
+def _stage(table: str, n: int) -> None:
+    io_ops.write_to_db(pd.DataFrame({"n": range(n)}), schema="main", table=io_ops.staging_table(table))
+
+
+def test_publish_tables_swaps_all_tables_and_bumps_version(tmp_path, monkeypatch) -> None:
+    eng = create_engine(f"sqlite:///{tmp_path / 'erp.db'}")
+    monkeypatch.setattr(io_ops, "engine", lambda: eng)
+
+    assert io_ops.read_published_run("main", "etl_runs") is None
+    for n in (1, 2):
+        _stage("ledger", n)
+        _stage("atp", n)
+        version = io_ops.publish_tables("main", ["ledger", "atp"], run_id=f"run_{n}", runs_table="etl_runs")
+        assert version == n
+
+    run = io_ops.read_published_run("main", "etl_runs", con=eng)
+    assert (run["version"], run["run_id"]) == (2, "run_2")
+    assert len(pd.read_sql('SELECT * FROM "main"."atp"', eng)) == 2
+    assert "ledger__staging" not in pd.read_sql("SELECT name FROM sqlite_master", eng)["name"].tolist()
+
+    # A missing staged table aborts the whole publish: nothing is swapped and the version stays.
+    _stage("ledger", 5)
+    with pytest.raises(Exception):
+        io_ops.publish_tables("main", ["ledger", "atp"], run_id="run_3", runs_table="etl_runs")
+    assert len(pd.read_sql('SELECT * FROM "main"."ledger"', eng)) == 2
+    assert io_ops.read_published_run("main", "etl_runs")["version"] == 2
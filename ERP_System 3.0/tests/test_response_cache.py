@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import gzip
+import sys
+from pathlib import Path
+
+from flask import Flask, request
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Webpage"))
+
+import response_cache  # noqa: E402
+from response_cache import GZIP_MIN_BYTES, CachedResponse, LruCache, ResponseCache  # noqa: E402
+
+
+def _entry(size: int, *, ttl: float | None = None) -> CachedResponse:
+    # Not a compressible mimetype, so nbytes is the body length.
+    return CachedResponse.build(b"x" * size, "text/plain", ttl=ttl)
+
+
+def test_lru_evicts_the_least_recently_used_entry() -> None:
+    cache = ResponseCache(maxsize=2, max_bytes=1000)
+    cache.put("a", _entry(10))
+    cache.put("b", _entry(10))
+    assert cache.get("a") is not None
+
+    cache.put("c", _entry(10))
+
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats() == {"entries": 2, "bytes": 20, "hits": 3, "misses": 1}
+
+
+def test_byte_budget_evicts_oldest_and_skips_oversized_entries() -> None:
+    cache = ResponseCache(maxsize=10, max_bytes=100)
+    cache.put("a", _entry(40))
+    cache.put("b", _entry(40))
+    cache.put("c", _entry(40))
+
+    assert cache.get("a") is None and len(cache) == 2 and cache.stats()["bytes"] == 80
+
+    cache.put("big", _entry(101))
+    assert cache.get("big") is None and len(cache) == 2
+
+    cache.put("b", _entry(5))
+    assert cache.stats()["bytes"] == 45
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
+
+
+def test_entries_expire_after_their_ttl(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache()
+    cache.put("short", _entry(10, ttl=30))
+    cache.put("forever", _entry(10))
+
+    now[0] += 29.9
+    assert cache.get("short") is not None
+    now[0] += 0.1
+    assert cache.get("short") is None and len(cache) == 1
+    now[0] += 10**6
+    assert cache.get("forever") is not None
+
+
+def test_gzip_only_pays_for_large_compressible_bodies() -> None:
+    html = b"<p>row</p>" * GZIP_MIN_BYTES
+    entry = CachedResponse.build(html, "text/html")
+
+    assert gzip.decompress(entry.gzipped) == html
+    assert entry.etag == CachedResponse.build(html, "text/html").etag
+    assert entry.nbytes == len(html) + len(entry.gzipped)
+    assert CachedResponse.build(b"<p/>", "text/html").gzipped is None
+    assert CachedResponse.build(html, "image/svg+xml").gzipped is None
+
+
+def test_weak_etag_revalidation_answers_304() -> None:
+    app = Flask(__name__)
+    entry = CachedResponse.build(b'{"rows": []}' * 200, "application/json")
+
+    @app.route("/page")
+    def page():
+        return entry.respond(request.if_none_match, accept_gzip="gzip" in request.headers.get("Accept-Encoding", ""))
+
+    client = app.test_client()
+    first = client.get("/page", headers={"Accept-Encoding": "gzip, br"})
+    assert first.status_code == 200 and first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["ETag"] == f'W/"{entry.etag}"'
+    assert first.headers["Cache-Control"] == "no-cache" and "Accept-Encoding" in first.headers["Vary"]
+    assert gzip.decompress(first.data) == entry.body
+
+    for sent in (first.headers["ETag"], f'"{entry.etag}"', f'"other", W/"{entry.etag}"', "*"):
+        again = client.get("/page", headers={"If-None-Match": sent})
+        assert again.status_code == 304 and again.data == b"" and again.headers["ETag"] == first.headers["ETag"]
+
+    stale = client.get("/page", headers={"If-None-Match": 'W/"other"'})
+    assert stale.status_code == 200 and stale.data == entry.body and "Content-Encoding" not in stale.headers
+
+
+def test_view_lru_keeps_recently_used_entries() -> None:
+    views = LruCache(maxsize=2)
+    assert views.put("a", 1) == 1
+    views.put("b", [])
+    assert views.get("b") == [] and views.get("a") == 1
+
+    views.put("c", 3)
+
+    assert views.get("b") is None and views.get("b", "miss") == "miss"
+    assert views.get("a") == 1 and views.get("c") == 3 and len(views) == 2
+    assert len(LruCache(maxsize=0)) == 0 and LruCache(maxsize=0).put("a", 1) == 1
@@ -12,7 +12,7 @@ def test_warehouse_inventory_file_uses_expected_daily_update_csv() -> None:
 
 def test_extract_inputs_reads_warehouse_inventory_as_cp1252(mocker) -> None:
     read_csv = mocker.patch.object(pd, "read_csv", return_value=pd.DataFrame())
-    mocker.patch.object(sources, "read_excel_safe", return_value=pd.DataFrame())
+    mocker.patch.object(sources, "read_excel_fast", return_value=pd.DataFrame())
 
     sources.extract_inputs()
 
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Webpage"))
+
+from search_index import SearchIndex  # noqa: E402
+
+
+def _linear_suggest(labels: list[str], texts: list[str], q: str, limit: int = 20) -> list[int]:
+    """The scan the typeahead routes used before the index: prefix hits, then substring hits, in entry order."""
+    ql = q.lower()
+    starts = [i for i, label in enumerate(labels) if label.lower().startswith(ql)]
+    seen = set(starts)
+    contains = [i for i, text in enumerate(texts) if ql in text.lower() and i not in seen]
+    return (starts + contains)[:limit]
+
+
+@pytest.fixture(scope="module")
+def entries() -> tuple[list[str], list[str]]:
+    rng = random.Random(7)
+    labels = [f"{rng.choice(['PART', 'part', 'Pa', 'SO', 'X'])}-{rng.randrange(400):03d}{rng.choice(['', 'a', 'B'])}" for _ in range(600)]
+    texts = [f"{label} customer {rng.choice(['acme', 'Bolt Co', 'zeta'])}" for label in labels]
+    return labels, texts
+
+
+@pytest.mark.parametrize("q", ["p", "PA", "part-0", "Part-01", "so-3", "x-", "-1", "a", "acme", "BOLT C", "t-00", "zz", "ta"])
+def test_search_matches_the_linear_scan(entries, q: str) -> None:
+    labels, texts = entries
+    index = SearchIndex(labels, texts)
+
+    for limit in (1, 5, 20, 1000):
+        assert index.search(q, limit) == _linear_suggest(labels, texts, q, limit)
+
+
+def test_prefix_keeps_entry_order_past_the_limit() -> None:
+    labels = ["b-2", "B-1", "a-1", "b-1", "b", "B-3"]
+    index = SearchIndex(labels)
+
+    assert index.prefix("b", 20) == [0, 1, 3, 4, 5]
+    assert index.prefix("B", 3) == [0, 1, 3]
+    assert index.prefix("b-1", 20) == [1, 3]
+    assert index.prefix("", 20) == [] and index.prefix("c", 20) == []
+    assert index.exact("B") == [4] and index.exact("b-1") == [1, 3] and index.exact("b-") == []
+
+
+def test_substring_reads_short_grams_and_verifies_long_queries() -> None:
+    labels = ["alpha", "beta", "gamma", "alphabet", "delta", "abcxbcd", "abcd"]
+    index = SearchIndex(labels, [label.upper() for label in labels])
+
+    assert index.substring("a") == [0, 1, 2, 3, 4, 5, 6]
+    assert index.substring("ta") == [1, 4]
+    assert index.substring("LPH") == [0, 3]
+    assert index.substring("habe") == [3]
+    # "abcxbcd" holds both trigrams of "abcd" but not the query itself.
+    assert index.substring("abcd") == [6]
+    assert index.substring("mmx") == [] and index.substring("") == []
+    assert index.substring("a", 2) == [0, 1]
+
+
+def test_substring_skips_excluded_ids_without_spending_the_limit() -> None:
+    index = SearchIndex(["ab", "cab", "abc", "xab", "zab"])
+
+    assert index.substring("ab", 2, exclude={0, 2}) == [1, 3]
+    assert index.search("ab", 4) == [0, 2, 1, 3]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from erp_system.pipeline import SharedFrameStore
+from erp_system.pipeline import shared_frames
+
+
+@pytest.fixture(params=["npy", "arrow"])
+def frame_format(request, monkeypatch) -> str:
+    """Publish in each format; the arrow run needs pyarrow."""
+    if request.param == "arrow" and shared_frames.pa is None:
+        pytest.skip("pyarrow is not installed")
+    monkeypatch.setattr(shared_frames, "SHARED_FRAME_FORMAT", request.param)
+    return request.param
+
+
+def test_published_frames_round_trip_and_map_read_only(tmp_path, frame_format) -> None:
+    store = SharedFrameStore(tmp_path, keep=2)
+    ledger = pd.DataFrame(
+        {
+            "Item": ["A", "B", None],
+            "Delta": [1.5, -2.0, 3.0],
+            "Date": pd.to_datetime(["2026-07-01", None, "2026-07-03"]),
+            "IsParent": [True, False, True],
+        },
+        index=[10, 11, 12],
+    )
+
+    assert store.load() is None
+    version = store.publish({"ledger": ledger}, extras={"suggest": ["A", "B"]}, meta={"db_version": 7})
+
+    assert store.current_version() == version == 1
+    shared = store.load()
+    assert shared.version == 1 and shared.meta == {"db_version": 7} and shared.extras == {"suggest": ["A", "B"]}
+    # Arrow keeps text as string[pyarrow] over the mapped file; npy restores object columns.
+    expected = ledger.astype({"Item": pd.StringDtype("pyarrow")}) if frame_format == "arrow" else ledger
+    pd.testing.assert_frame_equal(shared.frames["ledger"], expected)
+    if frame_format == "npy":
+        assert not shared.frames["ledger"]["Delta"].to_numpy().flags.writeable
+        with pytest.raises(ValueError):
+            shared.frames["ledger"].loc[10, "Delta"] = 0.0
+
+
+def test_publish_bumps_current_prunes_old_versions_and_locks(tmp_path) -> None:
+    store = SharedFrameStore(tmp_path, keep=2)
+    for qty in (1, 2, 3):
+        store.publish({"inv": pd.DataFrame({"On Hand": [qty]})})
+
+    assert store.load().frames["inv"]["On Hand"].tolist() == [3]
+    assert sorted(p.name for p in tmp_path.glob("v*")) == ["v2", "v3"]
+
+    assert store.try_lock()
+    assert not store.try_lock() and store.is_locked()
+    store.unlock()
+    assert store.try_lock(stale_seconds=600)
+    store.unlock()
+
+
+def test_published_frames_keep_extension_dtypes(tmp_path, frame_format) -> None:
+    store = SharedFrameStore(tmp_path)
+    frame = pd.DataFrame(
+        {
+            "Item": pd.array(["A", None, "C"], dtype="string"),
+            "Kind": pd.Categorical(["IN", "OUT", "IN"]),
+            "Qty": pd.array([1, None, 3], dtype="Int64"),
+            "Ship": pd.to_datetime(["2026-07-01", None, "2026-07-03"]).tz_localize("UTC"),
+            "Note": ["x", 2, None],
+            "Delta": [1.0, 2.0, 3.0],
+        },
+        index=[5, 5, 6],
+    )
+
+    store.publish({"frame": frame})
+
+    loaded = store.load().frames["frame"]
+    pd.testing.assert_frame_equal(loaded, frame)
+    assert loaded.dtypes.to_dict() == frame.dtypes.to_dict()
+
+
+def test_text_columns_are_not_copied_per_process(tmp_path, frame_format) -> None:
+    n = 20_000
+    frame = pd.DataFrame(
+        {
+            "Item": [f"PART-{i % 50:04d}" for i in range(n)],
+            "Memo": [None if i % 7 == 0 else f"line {i}" for i in range(n)],
+            "Delta": np.arange(n, dtype=float),
+        }
+    )
+    store = SharedFrameStore(tmp_path)
+    store.publish({"ledger": frame})
+
+    if frame_format == "arrow":
+        pa = shared_frames.pa
+        before = pa.total_allocated_bytes()
+        loaded = store.load().frames["ledger"]
+        # Arrow-backed and nothing allocated: the string columns are views of the mapped file.
+        assert loaded["Item"].dtype == pd.StringDtype("pyarrow")
+        assert pa.total_allocated_bytes() == before
+    else:
+        loaded = store.load().frames["ledger"]
+        codes = np.load(tmp_path / "v1" / "ledger" / "0.npy", mmap_mode="r")
+        assert codes.dtype == np.int8 and len(codes) == n
+        # Each distinct string is one object, referenced by every row that holds it.
+        assert len({id(v) for v in loaded["Item"]}) == 50
+
+    assert loaded["Item"].tolist() == frame["Item"].tolist()
+    assert loaded["Memo"].isna().sum() == n // 7 + 1
+    assert loaded["Memo"].dropna().tolist() == frame["Memo"].dropna().tolist()
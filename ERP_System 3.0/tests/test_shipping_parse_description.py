@@ -194,3 +194,26 @@ def test_pod_260978_flyc_300_group_parses_into_ledger_items() -> None:
             "IsParent": False,
         },
     ]
+
+
+def test_preinstalled_expansion_keeps_each_row_quantity_for_shared_descriptions() -> None:
+    description = "SEMIL-1708-FF, including i7-9700E, 2 x DDR4-16GB-32-IK2"
+    nav = pd.DataFrame(
+        [
+            {"QB Num": "POD-1", "Item": "SEMIL-1708-FF", "Description": description, "Ship Date": "2026-07-01", "Qty(+)": 1, "Pre/Bare": "Pre"},
+            {"QB Num": "POD-2", "Item": "PART-A", "Description": "", "Ship Date": "2026-07-01", "Qty(+)": 4, "Pre/Bare": "Bare"},
+            {"QB Num": "POD-3", "Item": "SEMIL-1708-FF", "Description": description, "Ship Date": "2026-07-02", "Qty(+)": 3, "Pre/Bare": "Pre"},
+        ]
+    )
+
+    expanded = expand_nav_preinstalled(nav)
+
+    assert expanded[["QB Num", "Item", "Qty(+)", "IsParent"]].values.tolist() == [
+        ["POD-1", "i7-9700E", 1.0, False],
+        ["POD-1", "DDR4-16GB-32-IK2", 2.0, False],
+        ["POD-1", "SEMIL-1708-FF", 1.0, True],
+        ["POD-3", "i7-9700E", 3.0, False],
+        ["POD-3", "DDR4-16GB-32-IK2", 6.0, False],
+        ["POD-3", "SEMIL-1708-FF", 3.0, True],
+        ["POD-2", "PART-A", 4.0, True],
+    ]
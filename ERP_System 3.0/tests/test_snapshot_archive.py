@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import pandas as pd
+
+from erp_system.pipeline import SnapshotArchive
+
+
+def test_archive_reads_date_ranges_lazily(tmp_path) -> None:
+    archive = SnapshotArchive(tmp_path)
+    for day, on_hand in ((1, 5), (2, 6), (3, 7)):
+        frame = pd.DataFrame({"Part_Number": ["A", "B"], "On Hand": [on_hand, 1], "Ship Date": ["TBC", dt.date(2026, 7, 1)]})
+        archive.write("inventory_status", frame, run_date=f"2026-07-0{day}", run_id=f"run_2026070{day}_060000")
+    # A second run the same day supersedes the first unless every run is asked for.
+    archive.write(
+        "inventory_status",
+        pd.DataFrame({"Part_Number": ["A"], "On Hand": [8]}),
+        run_date="2026-07-03",
+        run_id="run_20260703_180000",
+    )
+
+    assert archive.datasets() == ["inventory_status"]
+    assert archive.run_dates("inventory_status")[0] == dt.date(2026, 7, 1)
+
+    out = archive.read("inventory_status", "2026-07-02", dt.date(2026, 7, 3), columns=["Part_Number", "On Hand"])
+    assert out.columns.tolist() == ["run_date", "run_id", "Part_Number", "On Hand"]
+    assert out["On Hand"].tolist() == [6, 1, 8]
+    assert out["run_id"].iloc[-1] == "run_20260703_180000"
+
+    every = list(archive.scan("inventory_status", start="2026-07-03", latest_per_day=False))
+    assert [run_id for _, run_id, _ in every] == ["run_20260703_060000", "run_20260703_180000"]
+    # Mixed raw workbook cells are stored as text.
+    assert every[0][2]["Ship Date"].tolist() == ["TBC", "2026-07-01"]
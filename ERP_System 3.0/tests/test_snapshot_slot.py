@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from flask import Flask
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Webpage"))
+
+from snapshot_slot import SnapshotSlot  # noqa: E402
+
+
+def test_a_request_keeps_its_snapshot_across_a_swap() -> None:
+    app = Flask(__name__)
+    slot: SnapshotSlot[dict] = SnapshotSlot()
+    old, new = {"version": 1}, {"version": 2}
+
+    @app.route("/")
+    def view():
+        first = slot.pinned()
+        slot.install(new)  # a background reload finishing mid-request
+        return {"first": first["version"], "later": slot.pinned()["version"], "current": slot.current["version"]}
+
+    slot.install(old)
+    client = app.test_client()
+
+    assert client.get("/").get_json() == {"first": 1, "later": 1, "current": 2}
+    assert client.get("/").get_json()["first"] == 2
+
+
+def test_nothing_is_pinned_before_the_first_snapshot() -> None:
+    app = Flask(__name__)
+    slot: SnapshotSlot[dict] = SnapshotSlot()
+
+    with app.test_request_context():
+        assert slot.pinned() is None
+        slot.install({"version": 1})
+        assert slot.pinned() == {"version": 1}
+    assert slot.pinned() == {"version": 1}
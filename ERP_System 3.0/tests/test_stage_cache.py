@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pandas as pd
+
+from erp_system.pipeline import MetricsRecorder, Stage, StageCache, fingerprint, run_stages
+
+
+CALLS: list[int] = []
+
+
+def _double(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    CALLS.append(len(df))
+    return df.assign(b=df["a"] * 2), len(df)
+
+
+def _stages(n: int) -> list[Stage]:
+    return [
+        Stage("load", pd.DataFrame, outputs=("frame",), kwargs={"data": {"a": range(n)}}),
+        Stage("double", _double, inputs=("frame",), outputs=("doubled", "rows"), kind="cpu", cache=True),
+    ]
+
+
+def test_fingerprint_tracks_frame_content() -> None:
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.assign(a=[1, 3]))
+    assert fingerprint(df) != fingerprint(df.astype({"a": float}))
+    assert fingerprint(df) != fingerprint(df.rename(columns={"b": "c"}))
+
+
+def test_run_stages_reuses_cached_outputs(tmp_path) -> None:
+    cache = StageCache(tmp_path)
+    CALLS.clear()
+
+    first = run_stages(_stages(4), cache=cache)
+    recorder = MetricsRecorder()
+    second = run_stages(_stages(4), cache=cache, recorder=recorder)
+    run_stages(_stages(5), cache=cache)
+
+    assert CALLS == [4, 5]
+    pd.testing.assert_frame_equal(first["doubled"], second["doubled"])
+    assert second["rows"] == 4
+    assert [m.status for m in recorder.stages] == ["ok", "cached"]
+
+
+def test_evict_drops_old_then_least_recently_used(tmp_path) -> None:
+    cache = StageCache(tmp_path)
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        cache.store(key, [pd.DataFrame({"a": range(100)})])
+        meta = tmp_path / key[:2] / key / "meta.json"
+        os.utime(meta, (time.time() - (3 - i) * 86400,) * 2)
+
+    assert cache.evict(max_age_days=2.5) == 1
+    assert cache.load("aa1") is None and cache.load("bb2") is not None
+
+    assert cache.evict(max_bytes=1) == 2
+    assert not list(tmp_path.glob("*/*/meta.json"))
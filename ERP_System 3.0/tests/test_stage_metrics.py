@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+
+import pandas as pd
+import pytest
+
+from erp_system.pipeline import MetricsRecorder, Stage, run_stages
+
+
+def _head(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    return df.head(n)
+
+
+def _boom(df: pd.DataFrame) -> pd.DataFrame:
+    raise RuntimeError("bad input")
+
+
+def _stages() -> list[Stage]:
+    return [
+        Stage("load", pd.DataFrame, outputs=("frame",), kwargs={"data": {"a": range(10)}}),
+        Stage("head", _head, inputs=("frame",), outputs=("top",), kind="cpu", kwargs={"n": 3}),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_recorder_captures_timing_and_row_counts(jobs: int, tmp_path) -> None:
+    recorder = MetricsRecorder()
+    run_stages(_stages(), jobs=jobs, recorder=recorder)
+
+    by_stage = {m.stage: m for m in recorder.stages}
+    assert by_stage["load"].output_rows == {"frame": 10}
+    assert by_stage["head"].input_rows == {"frame": 10}
+    assert by_stage["head"].output_rows == {"top": 3}
+    assert all(m.status == "ok" and m.seconds is not None and m.seconds >= 0 for m in recorder.stages)
+
+    path = recorder.write_report(tmp_path / "run.json", "run_x", jobs=jobs)
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["run_id"] == "run_x" and report["jobs"] == jobs and report["status"] == "ok"
+    assert [s["stage"] for s in report["stages"]] == ["load", "head"]
+
+    frame = recorder.to_frame("run_x")
+    assert frame["run_id"].tolist() == ["run_x", "run_x"]
+    assert json.loads(frame.loc[frame["stage"].eq("head"), "output_rows"].iloc[0]) == {"top": 3}
+
+
+def test_recorder_marks_failed_stage() -> None:
+    recorder = MetricsRecorder()
+    stages = [*_stages(), Stage("boom", _boom, inputs=("top",))]
+
+    with pytest.raises(RuntimeError, match="bad input"):
+        run_stages(stages, recorder=recorder)
+
+    failed = recorder.stages[-1]
+    assert (failed.stage, failed.status, failed.input_rows) == ("boom", "failed", {"top": 3})
+    assert failed.error == "RuntimeError: bad input"
+    assert recorder.report("run_x")["status"] == "failed"
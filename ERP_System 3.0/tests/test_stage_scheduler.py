@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import operator
+import threading
+
+import pytest
+
+from erp_system.pipeline import Stage, run_stages, stage_dependencies
+
+
+def _stages(log: list[str]) -> list[Stage]:
+    def record(name: str, value: int) -> int:
+        log.append(name)
+        return value
+
+    return [
+        Stage("a", record, outputs=("a",), kwargs={"name": "a", "value": 2}),
+        Stage("b", record, outputs=("b",), kwargs={"name": "b", "value": 3}),
+        Stage("sum", operator.add, inputs=("a", "b"), outputs=("total",), kind="cpu"),
+        Stage("pair", divmod, inputs=("total", "b"), outputs=("q", "r")),
+        Stage("done", record, after=("pair",), kwargs={"name": "done", "value": 0}),
+    ]
+
+
+def test_run_stages_sequential_keeps_declaration_order() -> None:
+    log: list[str] = []
+    values = run_stages(_stages(log), jobs=1)
+
+    assert log == ["a", "b", "done"]
+    assert (values["total"], values["q"], values["r"]) == (5, 1, 2)
+
+
+def test_run_stages_parallel_matches_sequential() -> None:
+    log: list[str] = []
+    values = run_stages(_stages(log), jobs=2)
+
+    assert sorted(log) == ["a", "b", "done"] and log[-1] == "done"
+    assert (values["total"], values["q"], values["r"]) == (5, 1, 2)
+
+
+def test_run_stages_runs_independent_io_stages_concurrently() -> None:
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(value: int) -> int:
+        barrier.wait()
+        return value
+
+    stages = [
+        Stage("left", meet, outputs=("left",), kwargs={"value": 1}),
+        Stage("right", meet, outputs=("right",), kwargs={"value": 2}),
+    ]
+    assert run_stages(stages, jobs=2)["right"] == 2
+
+
+def test_stage_dependencies_rejects_bad_graphs() -> None:
+    with pytest.raises(ValueError, match="no stage produces"):
+        stage_dependencies([Stage("x", abs, inputs=("missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        stage_dependencies([Stage("x", abs, after=("y",)), Stage("y", abs, after=("x",))])
+    with pytest.raises(ValueError, match="produced more than once"):
+        stage_dependencies([Stage("x", abs, outputs=("v",)), Stage("y", abs, outputs=("v",))])
+
+
+def test_etl_stage_graph_is_valid() -> None:
+    from erp_system.cli.etl import build_etl_stages
+
+    assert stage_dependencies(build_etl_stages(), provided=("previous_ledger",))
+    assert stage_dependencies(build_etl_stages(incremental=True))
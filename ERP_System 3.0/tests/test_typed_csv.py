@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import logging
+
+import pandas as pd
+
+from erp_system.ingest.typed_csv import POD_CSV_SCHEMA, read_typed_csv
+from erp_system.transform.pod import transform_pod
+
+
+POD_CSV = (
+    ",Type,Date,Num,Name,Memo,Deliv Date,Qty,Rcv'd,Backordered,Amount,Inventory Site,Source Name\n"
+    "PART-A,,,,,,,,,,,,\n"
+    ',Purchase Order,07/01/2026,0042,Vendor,PART-A bolts,07/15/2026,"1,200",0,"1,200","$2,400.00",WH01S-NTA,Vendor\n'
+    ",Purchase Order,07/02/2026,0043,Vendor,PART-A bolts,,5,0,5,10.00,WH01S-NTA,Vendor,\n"
+    ",Purchase Order,07/03/2026,0044,Vendor,PART-A bolts,,1,0,1,2.00,WH01S-NTA,Vendor,stray\n"
+    "Total PART-A,,,,,,,,,,,,\n"
+)
+
+
+def test_read_typed_csv_returns_final_dtypes_and_trims_ragged_rows(tmp_path, caplog) -> None:
+    path = tmp_path / "pod.csv"
+    path.write_text(POD_CSV, encoding="ISO-8859-1")
+
+    with caplog.at_level(logging.WARNING):
+        df = read_typed_csv(path, POD_CSV_SCHEMA)
+
+    # The row with an empty trailing cell is kept; the one with stray data is dropped and logged.
+    assert df["Num"].tolist()[1:3] == ["0042", "0043"]
+    assert len(df) == 4
+    assert "Dropping malformed row" in caplog.text
+    assert df["Backordered"].dtype == "float64" and df["Backordered"].tolist()[1:3] == [1200.0, 5.0]
+    assert df["Amount"].iloc[1] == 2400.0
+    assert pd.api.types.is_datetime64_dtype(df["Date"]) and df["Deliv Date"].iloc[1] == pd.Timestamp("2026-07-15")
+    assert pd.isna(df["Unnamed: 0"].iloc[1])
+
+    pod = transform_pod(df)
+    assert pod["QB Num"].tolist() == ["0042", "0043"]
+    assert pod["Qty(+)"].tolist() == [1200.0, 5.0]
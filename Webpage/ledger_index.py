@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Iterator, Mapping
+
+import numpy as np
+import pandas as pd
+
+
+def _item_column(frame: pd.DataFrame) -> str | None:
+    if "Item" in frame.columns:
+        return "Item"
+    return "Item_raw" if "Item_raw" in frame.columns else None
+
+
+class LedgerItemIndex:
+    """
+    Per-item view of the ledger, built once per snapshot.
+
+    The ledger is copied once, stably sorted by its stripped, upper-cased
+    item key (so each item keeps its ledger row order), and an offset table
+    maps every key to its (start, stop) rows. A lookup is a dict hit plus a
+    positional slice of the sorted frame; no per-item frames are stored.
+    A case-folded dictionary resolves user input to the stored key.
+    `frame` is a complete ledger in item order, so callers can keep it as
+    their only copy, and `from_sorted` wraps one (e.g. memory-mapped) again.
+    """
+
+    def __init__(self, ledger: pd.DataFrame | None) -> None:
+        offsets: dict[str, tuple[int, int]] = {}
+        if ledger is None or ledger.empty or _item_column(ledger) is None:
+            self._set(pd.DataFrame() if ledger is None else ledger.iloc[0:0], offsets)
+            return
+
+        item_col = _item_column(ledger)
+        raw = ledger[item_col]
+        items = raw.astype(str).str.strip().where(raw.notna(), raw)
+        keys = items.astype(str).str.upper().to_numpy(dtype=object)
+        order = np.argsort(keys, kind="stable")
+        frame = ledger.take(order)
+        frame[item_col] = items.to_numpy(dtype=object)[order]
+
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        stops = np.r_[starts[1:], len(sorted_keys)]
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            offsets[sorted_keys[start]] = (start, stop)
+        self._set(frame, offsets)
+
+    @classmethod
+    def from_sorted(cls, frame: pd.DataFrame, offsets: Mapping[str, tuple[int, int]]) -> "LedgerItemIndex":
+        """Wrap the `frame` and `offsets` of an index built earlier, without copying the frame."""
+        index = cls.__new__(cls)
+        index._set(frame, dict(offsets))
+        return index
+
+    def _set(self, frame: pd.DataFrame, offsets: dict[str, tuple[int, int]]) -> None:
+        self.frame = frame
+        self.offsets = offsets
+        self._folded: dict[str, str] = {}
+        for key in offsets:
+            self._folded.setdefault(key.casefold(), key)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.offsets)
+
+    def keys(self):
+        return self.offsets.keys()
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        start, stop = self.offsets[key]
+        return self.frame.iloc[start:stop]
+
+    def get(self, key: str, default: pd.DataFrame | None = None) -> pd.DataFrame | None:
+        bounds = self.offsets.get(key)
+        if bounds is None:
+            return default
+        return self.frame.iloc[bounds[0] : bounds[1]]
+
+    def resolve(self, item: object) -> str:
+        """Stored key for `item` (stripped, case-insensitive); the upper-cased input when unknown."""
+        raw = str(item or "").strip().upper()
+        if not raw or raw in self.offsets:
+            return raw
+        return self._folded.get(raw.casefold(), raw)
+
+
+__all__ = ["LedgerItemIndex"]
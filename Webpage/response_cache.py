@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+from werkzeug.datastructures import ETags
+from werkzeug.wrappers import Response
+
+# Bodies smaller than this are sent as-is; gzip barely pays for itself below it.
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+COMPRESSIBLE_MIMETYPES = frozenset({"text/html", "application/json"})
+
+
+def gzip_body(body: bytes) -> bytes:
+    # mtime=0 keeps the output identical for identical bodies.
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A rendered 200 response: its body, the gzipped body (None when not worth it) and a content ETag."""
+
+    body: bytes
+    gzipped: bytes | None
+    mimetype: str
+    etag: str
+    expires_at: float | None
+
+    @classmethod
+    def build(cls, body: bytes, mimetype: str, *, ttl: float | None = None) -> "CachedResponse":
+        gzipped = None
+        if mimetype in COMPRESSIBLE_MIMETYPES and len(body) >= GZIP_MIN_BYTES:
+            gzipped = gzip_body(body)
+        return cls(
+            body=body,
+            gzipped=gzipped,
+            mimetype=mimetype,
+            etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+            expires_at=None if ttl is None else time.monotonic() + ttl,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + len(self.gzipped or b"")
+
+    def respond(self, if_none_match: ETags, *, accept_gzip: bool) -> Response:
+        """A 304 when `if_none_match` holds this ETag (weak comparison), else the body, gzipped if accepted."""
+        if if_none_match.contains_weak(self.etag):
+            resp = Response(status=304)
+        else:
+            use_gzip = self.gzipped is not None and accept_gzip
+            resp = Response(self.gzipped if use_gzip else self.body, mimetype=self.mimetype)
+            if use_gzip:
+                resp.headers["Content-Encoding"] = "gzip"
+        resp.set_etag(self.etag, weak=True)
+        # Browsers keep the page but revalidate every time, which the cache answers with a 304.
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.vary.add("Accept-Encoding")
+        return resp
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU of rendered responses, bounded by entry count and by
+    total body bytes. Callers put everything the page depends on in the key
+    (route, arguments, snapshot version, ...); an entry may also carry a TTL
+    for pages that read state outside the snapshot.
+    """
+
+    def __init__(self, maxsize: int = 512, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, entry: CachedResponse) -> None:
+        if self.maxsize <= 0 or entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key).nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+class LruCache:
+    """Thread-safe LRU mapping bounded by entry count, for derived view data that is not a rendered response."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        if self.maxsize <= 0:
+            return value
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+
+__all__ = [
+    "COMPRESSIBLE_MIMETYPES",
+    "CachedResponse",
+    "GZIP_LEVEL",
+    "GZIP_MIN_BYTES",
+    "LruCache",
+    "ResponseCache",
+    "gzip_body",
+]
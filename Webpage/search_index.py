@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Sequence
+
+import numpy as np
+
+# n-grams indexed per entry: queries up to this long read their posting list directly.
+GRAM_SIZE = 3
+
+
+def _grams(text: str, size: int) -> set[str]:
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+class SearchIndex:
+    """
+    Typeahead index over `labels`, built once per snapshot.
+
+    Prefix matches come from the lowercased labels kept sorted, found by
+    bisection, and are returned in entry order like a linear scan. Substring matches come from an inverted index of every 1- to
+    3-gram of each entry's search text. A query of up to three characters
+    reads its own posting list. A longer one walks the shortest posting list
+    of its trigrams and confirms each candidate. Both stop at the limit, so
+    a lookup does not grow with the number of entries.
+    """
+
+    def __init__(self, labels: Sequence[str], texts: Sequence[str] | None = None) -> None:
+        self.labels = [str(label) for label in labels]
+        texts = [str(t).lower() for t in (texts if texts is not None else self.labels)]
+        self.texts = texts
+        order = sorted(range(len(self.labels)), key=lambda i: (self.labels[i].lower(), i))
+        self._sorted_keys = [self.labels[i].lower() for i in order]
+        self._sorted_ids = np.asarray(order, dtype=np.int32)
+
+        postings: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            seen: set[str] = set()
+            for size in range(1, GRAM_SIZE + 1):
+                seen |= _grams(text, size)
+            for gram in seen:
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def exact(self, query: str) -> list[int]:
+        """Ids whose label equals `query` (case-insensitive), in entry order."""
+        q = query.lower()
+        lo = bisect_left(self._sorted_keys, q)
+        hi = bisect_right(self._sorted_keys, q, lo)
+        # Equal keys are sorted by id already.
+        return self._sorted_ids[lo:hi].tolist()
+
+    def prefix(self, query: str, limit: int = 20) -> list[int]:
+        """The first `limit` ids, in entry order, whose label starts with `query` (case-insensitive)."""
+        q = query.lower()
+        if not q or limit <= 0:
+            return []
+        lo = bisect_left(self._sorted_keys, q)
+        hi = bisect_right(self._sorted_keys, q + "\U0010ffff", lo)
+        ids = self._sorted_ids[lo:hi]
+        if len(ids) > limit:
+            ids = np.partition(ids, limit - 1)[:limit]
+        return np.sort(ids).tolist()
+
+    def substring(self, query: str, limit: int = 20, *, exclude: set[int] | frozenset[int] = frozenset()) -> list[int]:
+        """Ids whose search text contains `query`, in entry order, skipping `exclude`."""
+        q = query.lower()
+        if not q:
+            return []
+        if len(q) <= GRAM_SIZE:
+            candidates = self._postings.get(q)
+            verify = False
+        else:
+            lists = [self._postings.get(gram) for gram in _grams(q, GRAM_SIZE)]
+            candidates = None if any(ids is None for ids in lists) else min(lists, key=len)
+            verify = True
+        if candidates is None:
+            return []
+        out: list[int] = []
+        # Chunked so a one-letter query over a long posting list converts only what it reads.
+        for start in range(0, len(candidates), 256):
+            for i in candidates[start : start + 256].tolist():
+                if i in exclude or (verify and q not in self.texts[i]):
+                    continue
+                out.append(i)
+                if len(out) >= limit:
+                    return out
+        return out
+
+    def search(self, query: str, limit: int = 20) -> list[int]:
+        """Prefix matches, then substring matches, `limit` ids at most."""
+        ids = self.prefix(query, limit)
+        if len(ids) < limit:
+            ids += self.substring(query, limit - len(ids), exclude=set(ids))
+        return ids
+
+
+__all__ = ["GRAM_SIZE", "SearchIndex"]
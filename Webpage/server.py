@@ -4,6 +4,10 @@ import sys
 import json
 import re
 import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import wraps
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import quote
@@ -24,6 +28,10 @@ from ui import (
 )
 from quote_ui import QUOTE_TPL
 from peripheral_status_ui import PERIPHERAL_STATUS_TPL
+from search_index import SearchIndex
+from snapshot_slot import SnapshotSlot
+from ledger_index import LedgerItemIndex
+from response_cache import COMPRESSIBLE_MIMETYPES, GZIP_MIN_BYTES, CachedResponse, LruCache, ResponseCache, gzip_body
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 ERP_MODULE_DIR = REPO_ROOT / "ERP_System 3.0"
@@ -35,11 +43,16 @@ os.environ.setdefault("LLM_PROVIDER", "ollama")
 os.environ.setdefault("OLLAMA_BASE_URL", "http://localhost:11434")
 os.environ.setdefault("OLLAMA_MODEL", "llama3.1")
 
-from erp_system.normalize.erp_normalize import normalize_item
-from erp_system.ledger.atp import build_atp_view, earliest_atp_strict, earliest_atp_for_items_strict
+from erp_system.normalize.erp_normalize import normalize_item, normalize_series
+from erp_system.ledger.atp import AtpIndex, build_atp_view, earliest_atp_strict
+from erp_system.ledger.scenario import ScenarioBase, evaluate_scenarios, scenario_from_dict
+from erp_system.ingest.io_ops import read_published_run
+from erp_system.ingest.excel_reader import cached_file_read, file_signature
 from erp_system.runtime.db_config import get_engine, DATABASE_DSN
 from erp_system.runtime.constants import UNASSIGNED_LT_DATE
 from erp_system.runtime.paths import PERIPHERAL_STATUS_FILE
+from erp_system.pipeline.shared_frames import SharedFrames, SharedFrameStore
+from erp_system.runtime.policies import EXCEL_CACHE_DIR, SHARED_SNAPSHOT_DIR
 from erp_system.llm_backend import DataCache as LLMDataCache, answer_question as llm_answer_question
 
 app = Flask(__name__)
@@ -52,33 +65,66 @@ engine = get_engine()
 # =========================
 # Data cache
 # =========================
-SO_INV: pd.DataFrame | None = None
-INVENTORY_STATUS: pd.DataFrame | None = None
-NAV: pd.DataFrame | None = None
-OPEN_PO: pd.DataFrame | None = None
-FINAL_SO: pd.DataFrame | None = None
-LEDGER: pd.DataFrame | None = None
-ITEM_ATP: pd.DataFrame | None = None
+# Entries of view data (index, quotation, ...) each snapshot keeps, least recently used dropped first.
+VIEW_CACHE_SIZE = int(os.getenv("ERP_VIEW_CACHE_SIZE", "256"))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    One load of the published ETL tables and everything derived from them.
+    Built off the request path and swapped in whole; routes read only the
+    snapshot pinned by _ensure_loaded(), so a request never mixes versions.
+    Treat the frames as read-only. `views` holds view data derived from this
+    snapshot on first use, so a request still serving an older snapshot can
+    only fill that snapshot's entries.
+    """
+
+    version: int
+    built_at: datetime
+    build_seconds: float
+    # Latest etl_runs row when the snapshot was loaded; None for databases the ETL never published to.
+    db_run: dict | None
+    so: pd.DataFrame
+    inventory: pd.DataFrame
+    nav: pd.DataFrame
+    open_po: pd.DataFrame
+    final_so: pd.DataFrame
+    ledger: pd.DataFrame
+    item_atp: pd.DataFrame
+    item_atp_index: AtpIndex
+    so_lookup_base: pd.DataFrame
+    waiting_items_by_qb: dict[str, str]
+    ledger_item_index: LedgerItemIndex
+    item_suggest: list[str]
+    global_search_index: list[dict[str, str]]
+    quote_item_suggest_rows: list[dict[str, object]]
+    item_search: SearchIndex
+    global_search: SearchIndex
+    views: LruCache = field(default_factory=lambda: LruCache(VIEW_CACHE_SIZE), compare=False, repr=False)
+
+
+SNAPSHOT: SnapshotSlot[Snapshot] = SnapshotSlot()
+
+
+def _remember_view(snap: Snapshot, key: tuple, value):
+    """Store view data derived from `snap` in its own cache and return it."""
+    return snap.views.put(key, value)
+
+
 RECEIVING_LOG: pd.DataFrame | None = None
 ITEM_INFO: pd.DataFrame | None = None
+# Set only while there is no snapshot to serve (the first load failed).
 _LAST_LOAD_ERR: str | None = None
-_LAST_LOADED_AT: datetime | None = None
 LLM_CACHE: LLMDataCache | None = None
-ITEM_SUGGEST_CACHE: list[str] = []
-GLOBAL_SEARCH_INDEX: list[dict[str, str]] = []
 ITEM_INFO_SUGGEST_CACHE: list[str] = []
 ITEM_INFO_PHOTO_BY_SUGGESTION: dict[str, bool] = {}
-QUOTE_ITEM_SUGGEST_ROWS: list[dict[str, object]] = []
-SO_LOOKUP_BASE: pd.DataFrame | None = None
-WAITING_ITEMS_BY_QB: dict[str, str] = {}
-LEDGER_ITEM_INDEX: dict[str, pd.DataFrame] = {}
+# What-if base built from the snapshot ledger on first use, keyed by snapshot version.
+SCENARIO_BASE: tuple[int, ScenarioBase] | None = None
 PDF_DB_SEARCH_CACHE: dict[tuple[str, int], list[dict]] = {}
-INDEX_VIEW_CACHE: dict[tuple[str, str], dict] = {}
-QUOTATION_VIEW_CACHE: dict[tuple[str, int], dict] = {}
 PERIPHERAL_STATUS_CACHE: dict | None = None
 PERIPHERAL_STATUS_CACHE_KEY: tuple[str, int, int] | None = None
 CHAT_LOG_FILE = REPO_ROOT / "Webpage" / "chatbox.log"
-READY_ASSIGN_CACHE: list[dict] | None = None
 RECENT_HOME_SEARCHES: list[dict[str, str]] = []
 WEEKLY_LABOR_CAPACITY_HOURS = 90.0
 WO_PICKED_QTY_OVERRIDES_TABLE = "wo_picked_qty_overrides"
@@ -519,13 +565,13 @@ def _picked_qty_for_wo(
     return 0.0, False
 
 
-def _planned_qty_for_qb_num(qb_num: str) -> float | None:
-    if FINAL_SO is None or FINAL_SO.empty or "QB Num" not in FINAL_SO.columns:
+def _planned_qty_for_qb_num(snap: Snapshot, qb_num: str) -> float | None:
+    if snap.final_so is None or snap.final_so.empty or "QB Num" not in snap.final_so.columns:
         return None
     key = str(qb_num or "").strip()
     if not key:
         return None
-    rows = FINAL_SO.loc[FINAL_SO["QB Num"].astype(str).str.strip().eq(key)]
+    rows = snap.final_so.loc[snap.final_so["QB Num"].astype(str).str.strip().eq(key)]
     if rows.empty:
         return None
     if "Qty" in rows.columns:
@@ -557,7 +603,7 @@ def _build_weekly_labor_capacity(df: pd.DataFrame, structured_df: pd.DataFrame |
         return []
 
     first_wo_items = _build_first_wo_item_map(structured_df)
-    wo_status_map = _wo_status_by_qb_num()
+    wo_status_map = _wo_status_by_qb_num(structured_df)
     picked_qty_overrides = _load_wo_picked_qty_overrides()
 
     weeks: list[dict] = []
@@ -686,7 +732,7 @@ def _build_unassigned_lt_orders(df: pd.DataFrame, structured_df: pd.DataFrame |
     if work.empty:
         return []
 
-    wo_status_map = _wo_status_by_qb_num()
+    wo_status_map = _wo_status_by_qb_num(structured_df)
     picked_qty_overrides = _load_wo_picked_qty_overrides()
     labor_item_map = _build_first_wo_item_map(structured_df)
 
@@ -1067,7 +1113,7 @@ def _build_final_sales_order_from_db() -> pd.DataFrame:
     pdf_ref = pdf_orders_df.rename(columns={"WO": "QB Num", "Product Number": "Item"})
     final_sales_order = _reorder_df_out_by_output(pdf_ref, df_out)
 
-    final_sales_order["Item"] = final_sales_order["Item"].map(normalize_item)
+    final_sales_order["Item"] = normalize_series(final_sales_order["Item"])
     final_sales_order = final_sales_order.loc[:, ~final_sales_order.columns.duplicated()]
 
     return final_sales_order
@@ -1171,17 +1217,7 @@ def _build_runtime_indexes(
                 .to_dict()
             )
 
-    ledger_index: dict[str, pd.DataFrame] = {}
-    if ledger_src is not None and not ledger_src.empty:
-        item_col = "Item" if "Item" in ledger_src.columns else ("Item_raw" if "Item_raw" in ledger_src.columns else None)
-        if item_col is not None:
-            work = ledger_src.copy()
-            work[item_col] = work[item_col].astype(str).str.strip()
-            work["__item_lookup__"] = work[item_col].str.upper()
-            for item_key, grp in work.groupby("__item_lookup__", sort=False):
-                ledger_index[str(item_key)] = grp.drop(columns=["__item_lookup__"]).copy()
-
-    return so, waiting_map, ledger_index
+    return so, waiting_map, LedgerItemIndex(ledger_src)
 
 
 def _build_quote_item_summaries(
@@ -1337,97 +1373,283 @@ def _build_global_search_index(so: pd.DataFrame, inventory: pd.DataFrame) -> lis
 
     return entries
 
-def _load_from_db(force: bool = False):
-    global SO_INV, INVENTORY_STATUS, NAV, OPEN_PO, FINAL_SO, LEDGER, ITEM_ATP, _LAST_LOAD_ERR, _LAST_LOADED_AT
-    global ITEM_SUGGEST_CACHE, GLOBAL_SEARCH_INDEX
-    global SO_LOOKUP_BASE, WAITING_ITEMS_BY_QB, LEDGER_ITEM_INDEX
-    global PDF_DB_SEARCH_CACHE, INDEX_VIEW_CACHE, QUOTATION_VIEW_CACHE, QUOTE_ITEM_SUGGEST_ROWS, READY_ASSIGN_CACHE
-    try:
-        if (
-            force
-            or SO_INV is None
-            or NAV is None
-            or OPEN_PO is None
-            or FINAL_SO is None
-            or LEDGER is None
-            or ITEM_ATP is None
-        ):
-            so = _read_table("public", "wo_structured")
-            inventory = _read_table("public", "inventory_status")
-            nav = _read_table("public", "NT Shipping Schedule")
-            open_po = _read_table("public", "Open_Purchase_Orders")
-            ledger = _read_table("public", "ledger_analytics")
-            # item_atp is optional; if missing, fall back to empty frame
-            try:
-                item_atp = _read_table("public", "item_atp")
-            except Exception:
-                item_atp = pd.DataFrame(columns=["Item", "Date", "Projected_NAV", "FutureMin_NAV"])
-
-            for c in ("Ship Date", "Order Date"):
-                _safe_date_col(so, c)
-                _safe_date_col(nav, c)
-            for col in open_po.columns:
-                if "date" in col.lower():
-                    _safe_date_col(open_po, col)
-            if "Date" in ledger.columns:
-                _safe_date_col(ledger, "Date")
-
-            SO_INV, INVENTORY_STATUS, NAV, OPEN_PO = so, inventory, nav, open_po
-            FINAL_SO = _build_final_sales_order_from_db()
-            LEDGER = ledger
-            ITEM_ATP = item_atp
-            SO_LOOKUP_BASE, WAITING_ITEMS_BY_QB, LEDGER_ITEM_INDEX = _build_runtime_indexes(so, ledger)
-            suggest_items: list[str] = []
-            if "Item" in so.columns:
-                suggest_items.extend(
-                    so["Item"].dropna().astype(str).str.strip().loc[lambda s: s.ne("")].tolist()
-                )
-            if "Part_Number" in inventory.columns:
-                suggest_items.extend(
-                    inventory["Part_Number"].dropna().astype(str).str.strip().loc[lambda s: s.ne("")].tolist()
-                )
-            ITEM_SUGGEST_CACHE = sorted(set(suggest_items))
-            GLOBAL_SEARCH_INDEX = _build_global_search_index(so, inventory)
-            QUOTE_ITEM_SUGGEST_ROWS = _build_quote_item_summaries(inventory, ledger)
-            PDF_DB_SEARCH_CACHE = {}
-            INDEX_VIEW_CACHE = {}
-            QUOTATION_VIEW_CACHE = {}
-            READY_ASSIGN_CACHE = None
-            _LAST_LOAD_ERR = None
-            _LAST_LOADED_AT = datetime.now()
-    except Exception as e:
-        SO_INV = None
-        INVENTORY_STATUS = None
-        NAV = None
-        OPEN_PO = None
-        FINAL_SO = None
-        LEDGER = None
-        ITEM_ATP = None
-        SO_LOOKUP_BASE = None
-        WAITING_ITEMS_BY_QB = {}
-        LEDGER_ITEM_INDEX = {}
-        ITEM_SUGGEST_CACHE = []
-        GLOBAL_SEARCH_INDEX = []
-        QUOTE_ITEM_SUGGEST_ROWS = []
-        PDF_DB_SEARCH_CACHE = {}
-        INDEX_VIEW_CACHE = {}
-        QUOTATION_VIEW_CACHE = {}
-        READY_ASSIGN_CACHE = None
-        _LAST_LOAD_ERR = f"DB load error: {e}"
-
-def _ensure_loaded():
-    if (
-        SO_INV is None
-        or INVENTORY_STATUS is None
-        or NAV is None
-        or OPEN_PO is None
-        or FINAL_SO is None
-        or LEDGER is None
-        or ITEM_ATP is None
-    ):
-        _load_from_db(force=True)
+def _read_published_tables(max_attempts: int = 3):
+    """
+    Read the ETL tables the web app caches. The ETL swaps all tables in one
+    transaction and bumps etl_runs, so a read that straddles a publish (version
+    changed between the first and last read) is retried.
+    """
+    for _ in range(max_attempts):
+        run = read_published_run("public", "etl_runs", con=engine)
+        so = _read_table("public", "wo_structured")
+        inventory = _read_table("public", "inventory_status")
+        nav = _read_table("public", "NT Shipping Schedule")
+        open_po = _read_table("public", "Open_Purchase_Orders")
+        ledger = _read_table("public", "ledger_analytics")
+        # item_atp is optional; if missing, fall back to empty frame
+        try:
+            item_atp = _read_table("public", "item_atp")
+        except Exception:
+            item_atp = pd.DataFrame(columns=["Item", "Date", "Projected_NAV", "FutureMin_NAV"])
+        if read_published_run("public", "etl_runs", con=engine) == run:
+            break
+    return run, so, inventory, nav, open_po, ledger, item_atp
+
+
+# Seconds between checks of etl_runs for a newer publish; 0 disables the watcher.
+SNAPSHOT_POLL_SECONDS = float(os.getenv("ERP_SNAPSHOT_POLL_SECONDS", "30"))
+_LAST_BUILD_ERR: str | None = None
+_BUILD_LOCK = threading.Lock()
+_RELOAD_LOCK = threading.Lock()
+_RELOAD_THREAD: threading.Thread | None = None
+# None when no reload is queued, else whether the queued one must rebuild from the DB.
+_RELOAD_PENDING: bool | None = None
+# Rendered pages keyed by (route, normalized args, snapshot version, day); see _cached_view.
+RESPONSE_CACHE = ResponseCache(
+    maxsize=int(os.getenv("ERP_RESPONSE_CACHE_SIZE", "512")),
+    max_bytes=int(os.getenv("ERP_RESPONSE_CACHE_MAX_MB", "64")) * 1024 * 1024,
+)
+# Lifetime of cached pages that also read override tables, which other workers may write.
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("ERP_RESPONSE_CACHE_TTL_SECONDS", "30"))
+SHARED_STORE = SharedFrameStore(Path(SHARED_SNAPSHOT_DIR)) if SHARED_SNAPSHOT_DIR else None
+# Frames a shared snapshot maps; the small derived structures travel as pickled extras.
+_SHARED_FRAMES = ("so", "inventory", "nav", "open_po", "final_so", "ledger", "item_atp", "so_lookup_base")
+_SHARED_EXTRAS = (
+    "db_run",
+    "waiting_items_by_qb",
+    "item_suggest",
+    "global_search_index",
+    "quote_item_suggest_rows",
+    "item_search",
+    "global_search",
+)
+SHARED_BUILD_WAIT_SECONDS = 600
+
+
+def _build_snapshot(version: int) -> Snapshot:
+    """Read the published tables and derive every index; touches no module state."""
+    started = time.perf_counter()
+    run, so, inventory, nav, open_po, ledger, item_atp = _read_published_tables()
+
+    for c in ("Ship Date", "Order Date"):
+        _safe_date_col(so, c)
+        _safe_date_col(nav, c)
+    for col in open_po.columns:
+        if "date" in col.lower():
+            _safe_date_col(open_po, col)
+    if "Date" in ledger.columns:
+        _safe_date_col(ledger, "Date")
+
+    so_lookup_base, waiting_items_by_qb, ledger_item_index = _build_runtime_indexes(so, ledger)
+    suggest_items: list[str] = []
+    if "Item" in so.columns:
+        suggest_items.extend(
+            so["Item"].dropna().astype(str).str.strip().loc[lambda s: s.ne("")].tolist()
+        )
+    if "Part_Number" in inventory.columns:
+        suggest_items.extend(
+            inventory["Part_Number"].dropna().astype(str).str.strip().loc[lambda s: s.ne("")].tolist()
+        )
+    item_suggest = sorted(set(suggest_items))
+    global_search_index = _build_global_search_index(so, inventory)
+    return Snapshot(
+        version=version,
+        built_at=datetime.now(),
+        build_seconds=round(time.perf_counter() - started, 3),
+        db_run=run,
+        so=so,
+        inventory=inventory,
+        nav=nav,
+        open_po=open_po,
+        final_so=_build_final_sales_order_from_db(),
+        # The index's item-sorted copy is the only ledger kept (and the one shared workers map).
+        ledger=ledger_item_index.frame,
+        item_atp=item_atp,
+        item_atp_index=AtpIndex.from_atp_view(
+            item_atp, item_col="Item_raw" if "Item_raw" in item_atp.columns else "Item"
+        ),
+        so_lookup_base=so_lookup_base,
+        waiting_items_by_qb=waiting_items_by_qb,
+        ledger_item_index=ledger_item_index,
+        item_suggest=item_suggest,
+        global_search_index=global_search_index,
+        quote_item_suggest_rows=_build_quote_item_summaries(inventory, ledger),
+        item_search=SearchIndex(item_suggest),
+        global_search=SearchIndex(
+            [row.get("label", "") for row in global_search_index],
+            [row.get("search", row.get("label", "")) for row in global_search_index],
+        ),
+    )
+
+
+def _install_snapshot(snap: Snapshot) -> None:
+    """Make `snap` current; requests already running keep the snapshot they pinned."""
+    global PDF_DB_SEARCH_CACHE, _LAST_LOAD_ERR
+    SNAPSHOT.install(snap)
+    PDF_DB_SEARCH_CACHE = {}
+    # Entries are keyed by version and would never hit again; a request still
+    # rendering an older snapshot can only add entries under that old version.
+    RESPONSE_CACHE.clear()
+    _LAST_LOAD_ERR = None
+
+
+def _publish_shared_snapshot(snap: Snapshot) -> int:
+    return SHARED_STORE.publish(
+        {name: getattr(snap, name) for name in _SHARED_FRAMES},
+        extras={
+            **{name: getattr(snap, name) for name in _SHARED_EXTRAS},
+            "ledger_item_offsets": snap.ledger_item_index.offsets,
+        },
+        meta={
+            "built_at": snap.built_at.isoformat(),
+            "build_seconds": snap.build_seconds,
+            "db_version": snap.db_run["version"] if snap.db_run else None,
+        },
+    )
+
+
+def _snapshot_from_shared(shared: SharedFrames) -> Snapshot:
+    """A Snapshot over memory-mapped frames; the ledger index wraps the mapped ledger and only the ATP index is rebuilt."""
+    frames, extras = shared.frames, dict(shared.extras)
+    ledger_item_offsets = extras.pop("ledger_item_offsets")
+    item_atp = frames["item_atp"]
+    return Snapshot(
+        version=shared.version,
+        built_at=datetime.fromisoformat(shared.meta["built_at"]),
+        build_seconds=shared.meta["build_seconds"],
+        **frames,
+        **extras,
+        item_atp_index=AtpIndex.from_atp_view(
+            item_atp, item_col="Item_raw" if "Item_raw" in item_atp.columns else "Item"
+        ),
+        ledger_item_index=LedgerItemIndex.from_sorted(frames["ledger"], ledger_item_offsets),
+    )
+
+
+def _load_shared_snapshot(current: Snapshot | None, *, rebuild: bool) -> Snapshot:
+    """
+    Snapshot from SHARED_STORE. Without `rebuild` the published version is
+    mapped when it matches the latest etl_runs version. Otherwise one worker
+    wins the build lock, reads the DB and publishes; the others wait for the
+    new version and map it.
+    """
+    store = SHARED_STORE
+    info = store.current()
+    if not rebuild and info is not None:
+        run = read_published_run("public", "etl_runs", con=engine)
+        if run is not None and info["meta"].get("db_version") == run["version"]:
+            if current is not None and current.version == info["version"]:
+                return current
+            return _snapshot_from_shared(store.load())
+
+    seen = None if info is None else info["version"]
+    if store.try_lock(stale_seconds=SHARED_BUILD_WAIT_SECONDS):
+        try:
+            _publish_shared_snapshot(_build_snapshot(0))
+        finally:
+            store.unlock()
+        # Map what was published, so the builder shares pages with the other workers too.
+        return _snapshot_from_shared(store.load())
+
+    deadline = time.monotonic() + SHARED_BUILD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.5)
+        if store.current_version() != seen:
+            return _snapshot_from_shared(store.load())
+        if not store.is_locked():
+            if store.current_version() != seen:
+                return _snapshot_from_shared(store.load())
+            raise RuntimeError("the shared snapshot build in another worker failed")
+    raise RuntimeError(f"timed out waiting for the shared snapshot under {store.root}")
+
+
+def _load_from_db(force: bool = False, *, rebuild: bool = True) -> bool:
+    """
+    Build a snapshot in this thread and swap it in. A failed build keeps
+    serving the last good snapshot; _LAST_LOAD_ERR is only set while there is
+    none, and the build error is kept in _LAST_BUILD_ERR either way. With
+    SHARED_STORE set the snapshot comes from there (see _load_shared_snapshot).
+    """
+    global _LAST_LOAD_ERR, _LAST_BUILD_ERR
+    if not force and SNAPSHOT.current is not None:
+        return True
+    with _BUILD_LOCK:
+        current = SNAPSHOT.current
+        try:
+            if SHARED_STORE is not None:
+                snap = _load_shared_snapshot(current, rebuild=rebuild)
+            else:
+                snap = _build_snapshot((current.version if current else 0) + 1)
+        except Exception as e:
+            _LAST_BUILD_ERR = f"DB load error: {e}"
+            if SNAPSHOT.current is None:
+                _LAST_LOAD_ERR = _LAST_BUILD_ERR
+            return False
+        if snap is not current:
+            _install_snapshot(snap)
+        _LAST_BUILD_ERR = None
+        return True
+
+
+def _reload_worker(rebuild: bool) -> None:
+    global _RELOAD_THREAD, _RELOAD_PENDING
+    while True:
+        _load_from_db(force=True, rebuild=rebuild)
+        with _RELOAD_LOCK:
+            if _RELOAD_PENDING is None:
+                _RELOAD_THREAD = None
+                return
+            rebuild, _RELOAD_PENDING = _RELOAD_PENDING, None
+
+
+def _request_reload(*, rebuild: bool = True) -> threading.Thread:
+    """
+    Reload the snapshot on a background thread and return it. Requests keep
+    the current snapshot meanwhile; a request during a build queues one more.
+    `rebuild=False` lets a shared snapshot that is already current be mapped.
+    """
+    global _RELOAD_THREAD, _RELOAD_PENDING
+    with _RELOAD_LOCK:
+        if _RELOAD_THREAD is not None:
+            _RELOAD_PENDING = bool(_RELOAD_PENDING) or rebuild
+            return _RELOAD_THREAD
+        _RELOAD_THREAD = threading.Thread(
+            target=_reload_worker, args=(rebuild,), name="snapshot-reload", daemon=True
+        )
+        _RELOAD_THREAD.start()
+        return _RELOAD_THREAD
+
+
+def _watch_published_runs(interval: float) -> None:
+    """
+    Reload whenever the ETL publishes a newer etl_runs version than the
+    snapshot's, and remap when another worker publishes a shared snapshot.
+    """
+    while True:
+        time.sleep(interval)
+        snap = SNAPSHOT.current
+        if SHARED_STORE is not None and snap is not None:
+            shared = SHARED_STORE.current_version()
+            if shared is not None and shared != snap.version:
+                _request_reload(rebuild=False)
+                continue
+        run = read_published_run("public", "etl_runs", con=engine)
+        loaded = snap.db_run if snap is not None else None
+        if run is not None and (loaded is None or run.get("version") != loaded.get("version")):
+            _request_reload(rebuild=False)
+
+
+def _ensure_loaded() -> Snapshot | None:
+    """
+    The snapshot this request reads, pinned at its first call (None only when
+    nothing could be loaded yet). Routes read every table and index from it.
+    """
+    # Only blocks when there is no snapshot to serve yet; reloads happen in the background.
+    if SNAPSHOT.current is None:
+        _load_from_db(force=True, rebuild=False)
     # Load PDF map on demand as well
     _load_pdf_map()
+    return SNAPSHOT.pinned()
 
 
 def _ensure_llm_cache() -> LLMDataCache:
@@ -1456,19 +1678,18 @@ def _append_chat_log(role: str, content: str, *, ok: bool | None = None, trace:
         pass
 
 
-def _ready_to_assign_rows() -> list[dict]:
-    global READY_ASSIGN_CACHE
-    if READY_ASSIGN_CACHE is not None:
-        return READY_ASSIGN_CACHE
+def _ready_to_assign_rows(snap: Snapshot) -> list[dict]:
+    cached = snap.views.get(("ready_assign",))
+    if cached is not None:
+        return cached
 
-    if SO_INV is None or SO_INV.empty or ITEM_ATP is None or ITEM_ATP.empty:
-        READY_ASSIGN_CACHE = []
-        return READY_ASSIGN_CACHE
+    if snap.so is None or snap.so.empty or snap.item_atp is None or snap.item_atp.empty:
+        return _remember_view(snap, ("ready_assign",), [])
 
     cutoff = UNASSIGNED_LT_DATE
     today = pd.Timestamp.today().normalize()
 
-    so = SO_INV.copy()
+    so = snap.so.copy()
     for c in ["QB Num", "Item", "Qty(-)", "Ship Date", "Name", "P. O. #", "Order Date", "Component_Status"]:
         if c not in so.columns:
             so[c] = pd.NA
@@ -1479,8 +1700,7 @@ def _ready_to_assign_rows() -> list[dict]:
     so["Qty(-)"] = pd.to_numeric(so["Qty(-)"], errors="coerce").fillna(0.0)
     pending = so.loc[so["Ship Date"].eq(cutoff) & so["QB Num"].ne("") & so["Item"].ne("")].copy()
     if pending.empty:
-        READY_ASSIGN_CACHE = []
-        return READY_ASSIGN_CACHE
+        return _remember_view(snap, ("ready_assign",), [])
 
     rows: list[dict] = []
     for qb_num, grp in pending.groupby("QB Num", sort=True):
@@ -1492,7 +1712,7 @@ def _ready_to_assign_rows() -> list[dict]:
         if demands.empty:
             continue
         demand_map = {str(r["Item"]): float(r["Qty(-)"]) for _, r in demands.iterrows()}
-        ready_dt = earliest_atp_for_items_strict(ITEM_ATP, demand_map, from_date=today, allow_zero=True)
+        ready_dt = snap.item_atp_index.earliest_for_items(demand_map, from_date=today, allow_zero=True)
         if ready_dt is None or ready_dt >= cutoff:
             continue
 
@@ -1521,8 +1741,7 @@ def _ready_to_assign_rows() -> list[dict]:
         )
 
     rows.sort(key=lambda r: (r["ready_date"], r["qb_num"]))
-    READY_ASSIGN_CACHE = rows
-    return READY_ASSIGN_CACHE
+    return _remember_view(snap, ("ready_assign",), rows)
 
 
 def _push_recent_home_search(*, so_input: str = "", customer_input: str = "") -> None:
@@ -1547,10 +1766,10 @@ def _push_recent_home_search(*, so_input: str = "", customer_input: str = "") ->
     RECENT_HOME_SEARCHES = RECENT_HOME_SEARCHES[:5]
 
 
-def _dashboard_lt_unassigned_count() -> int:
-    if SO_INV is None or SO_INV.empty or "Ship Date" not in SO_INV.columns or "QB Num" not in SO_INV.columns:
+def _dashboard_lt_unassigned_count(snap: Snapshot) -> int:
+    if snap.so is None or snap.so.empty or "Ship Date" not in snap.so.columns or "QB Num" not in snap.so.columns:
         return 0
-    so = SO_INV.copy()
+    so = snap.so.copy()
     so["Ship Date"] = pd.to_datetime(so["Ship Date"], errors="coerce")
     so["QB Num"] = so["QB Num"].astype(str).str.strip()
     unassigned_mask = (
@@ -1560,11 +1779,11 @@ def _dashboard_lt_unassigned_count() -> int:
     return int(so.loc[unassigned_mask & so["QB Num"].ne(""), "QB Num"].nunique())
 
 
-def _dashboard_top_shortage_items(limit: int = 5) -> list[dict[str, object]]:
-    if SO_INV is None or SO_INV.empty or "Item" not in SO_INV.columns or "QB Num" not in SO_INV.columns:
+def _dashboard_top_shortage_items(snap: Snapshot, limit: int = 5) -> list[dict[str, object]]:
+    if snap.so is None or snap.so.empty or "Item" not in snap.so.columns or "QB Num" not in snap.so.columns:
         return []
 
-    so = SO_INV.copy()
+    so = snap.so.copy()
     for col in ("Component_Status", "Qty(-)", "On Hand"):
         if col not in so.columns:
             so[col] = 0 if col != "Component_Status" else ""
@@ -1606,12 +1825,12 @@ def _dashboard_top_shortage_items(limit: int = 5) -> list[dict[str, object]]:
     return out
 
 
-def _dashboard_alerts() -> list[dict[str, str]]:
+def _dashboard_alerts(snap: Snapshot) -> list[dict[str, str]]:
     alerts: list[dict[str, str]] = []
 
 
-    if OPEN_PO is not None and not OPEN_PO.empty:
-        pod = OPEN_PO.copy()
+    if snap.open_po is not None and not snap.open_po.empty:
+        pod = snap.open_po.copy()
         pod_no_col = "POD#" if "POD#" in pod.columns else ("QB Num" if "QB Num" in pod.columns else None)
         ship_col = "Ship Date" if "Ship Date" in pod.columns else None
         if pod_no_col and ship_col:
@@ -1621,8 +1840,8 @@ def _dashboard_alerts() -> list[dict[str, str]]:
             if missing_ship_count:
                 alerts.append({"label": f"{int(missing_ship_count)} PODs are missing ship dates.", "href": ""})
 
-    if LEDGER is not None and not LEDGER.empty and {"Date", "Projected_NAV", "Item"}.issubset(LEDGER.columns):
-        led = LEDGER.copy()
+    if snap.ledger is not None and not snap.ledger.empty and {"Date", "Projected_NAV", "Item"}.issubset(snap.ledger.columns):
+        led = snap.ledger.copy()
         led["Date"] = pd.to_datetime(led["Date"], errors="coerce")
         led["Projected_NAV"] = pd.to_numeric(led["Projected_NAV"], errors="coerce")
         cutoff = UNASSIGNED_LT_DATE
@@ -1633,8 +1852,8 @@ def _dashboard_alerts() -> list[dict[str, str]]:
         if neg_item_count:
             alerts.append({"label": f"{int(neg_item_count)} items will go negative in the future", "href": "/dashboard/negative_inventory"})
 
-    if _LAST_LOADED_AT is not None:
-        age_minutes = max(0, int((datetime.now() - _LAST_LOADED_AT).total_seconds() // 60))
+    if snap.built_at is not None:
+        age_minutes = max(0, int((datetime.now() - snap.built_at).total_seconds() // 60))
         if age_minutes >= 60:
             alerts.append({"label": f"Homepage data is {age_minutes} minutes old.", "href": "/?reload=1"})
 
@@ -1642,12 +1861,12 @@ def _dashboard_alerts() -> list[dict[str, str]]:
         alerts.append({"label": "No active system alerts.", "href": ""})
     return alerts[:4]
 
-def _negative_inventory_detail_rows(limit: int | None = None) -> tuple[list[str], list[dict[str, object]]]:
+def _negative_inventory_detail_rows(snap: Snapshot, limit: int | None = None) -> tuple[list[str], list[dict[str, object]]]:
     columns = ["Item", "Date", "Projected Qty"]
-    if LEDGER is None or LEDGER.empty or not {"Date", "Projected_NAV", "Item"}.issubset(LEDGER.columns):
+    if snap.ledger is None or snap.ledger.empty or not {"Date", "Projected_NAV", "Item"}.issubset(snap.ledger.columns):
         return columns, []
 
-    led = LEDGER.copy()
+    led = snap.ledger.copy()
     led["Date"] = pd.to_datetime(led["Date"], errors="coerce")
     led["Projected_NAV"] = pd.to_numeric(led["Projected_NAV"], errors="coerce")
     cutoff = UNASSIGNED_LT_DATE
@@ -1675,15 +1894,15 @@ def _negative_inventory_detail_rows(limit: int | None = None) -> tuple[list[str]
     ]
     return columns, rows
 
-def lookup_on_po_by_item(item: str) -> int | None:
-    df = SO_INV[SO_INV["Item"] == item]
+def lookup_on_po_by_item(snap: Snapshot, item: str) -> int | None:
+    df = snap.so[snap.so["Item"] == item]
     if "On PO" not in df.columns:
         return None
     s = pd.to_numeric(df["On PO"], errors="coerce").dropna()
     return int(s.iloc[0]) if not s.empty else None
 
-def lookup_on_sales_by_item(item: str) -> int | float | None:
-    df = SO_INV[SO_INV["Item"] == item]
+def lookup_on_sales_by_item(snap: Snapshot, item: str) -> int | float | None:
+    df = snap.so[snap.so["Item"] == item]
     col_name = None
     for candidate in ("On Sales Order", "On Sales", "On SO"):
         if candidate in df.columns:
@@ -1723,19 +1942,11 @@ def _aggregate_metric(series: pd.Series) -> int | float | None:
     return _coerce_total(total)
 
 
-def _resolve_ledger_item_key(item: str) -> str:
-    raw = str(item or "").strip().upper()
-    if not raw:
-        return ""
-    if raw in LEDGER_ITEM_INDEX:
-        return raw
-    for key in LEDGER_ITEM_INDEX.keys():
-        if str(key).upper() == raw:
-            return str(key)
-    return raw
+def _resolve_ledger_item_key(snap: Snapshot, item: str) -> str:
+    return snap.ledger_item_index.resolve(item)
 
 
-def _lookup_earliest_atp_date(item: str, qty: float = 1.0) -> datetime | None:
+def _lookup_earliest_atp_date(snap: Snapshot, item: str, qty: float = 1.0) -> datetime | None:
     """
     Best-effort ATP lookup.
 
@@ -1746,21 +1957,17 @@ def _lookup_earliest_atp_date(item: str, qty: float = 1.0) -> datetime | None:
     today = datetime.today().date()
     from_date = pd.Timestamp(today)
 
-    # -------- primary: use precomputed item_atp (faster, computed in ETL) --------
-    if ITEM_ATP is not None and not ITEM_ATP.empty:
-        atp_df = ITEM_ATP
-        if "Item_raw" in atp_df.columns:
-            atp_df = atp_df.copy()
-            atp_df["Item"] = atp_df["Item_raw"]
-        atp_dt = earliest_atp_strict(atp_df, item, qty, from_date=from_date, allow_zero=True)
+    # -------- primary: use precomputed item_atp (indexed once at load) --------
+    if len(snap.item_atp_index):
+        atp_dt = snap.item_atp_index.earliest(item, qty, from_date=from_date, allow_zero=True)
         if atp_dt is not None:
             return atp_dt.to_pydatetime()
 
     # -------- fallback: compute from ledger (exclude placeholder dates) --------
-    if LEDGER is None or LEDGER.empty:
+    if snap.ledger is None or snap.ledger.empty:
         return None
 
-    df_ledger = LEDGER.copy()
+    df_ledger = snap.ledger.copy()
     atp_view = build_atp_view(df_ledger)
 
     # Ensure a "today" row exists for this item so ATP can be today
@@ -1843,11 +2050,11 @@ def _find_pdf_url_for_so(so_num: str, po_num: str | None = None) -> str | None:
     return None
 
 
-def _wo_status_by_qb_num() -> dict[str, str]:
-    if SO_INV is None or SO_INV.empty or "QB Num" not in SO_INV.columns or "Picked" not in SO_INV.columns:
+def _wo_status_by_qb_num(structured_df: pd.DataFrame | None) -> dict[str, str]:
+    if structured_df is None or structured_df.empty or "QB Num" not in structured_df.columns or "Picked" not in structured_df.columns:
         return {}
 
-    so = SO_INV[["QB Num", "Picked"]].copy()
+    so = structured_df[["QB Num", "Picked"]].copy()
     so["QB Num"] = so["QB Num"].fillna("").astype(str).str.strip()
     so["Picked"] = so["Picked"].fillna("").astype(str).str.strip()
     so = so.loc[so["QB Num"].ne("")].copy()
@@ -1860,15 +2067,15 @@ def _wo_status_by_qb_num() -> dict[str, str]:
 
     return so.groupby("QB Num")["Picked"].agg(_status_for_group).to_dict()
 
-def _so_table_for_item(item: str) -> tuple[list[str], list[dict], dict[str, int | float | None]]:
+def _so_table_for_item(snap: Snapshot, item: str) -> tuple[list[str], list[dict], dict[str, int | float | None]]:
     need_cols = ["Name", "QB Num", "Item", "Qty(-)", "On Hand - WIP", "Ship Date", "Picked"]
-    g = SO_INV[SO_INV["Item"] == item].copy()
+    g = snap.so[snap.so["Item"] == item].copy()
     for c in need_cols:
         if c not in g.columns:
             g[c] = ""
     # Fallback for WIP column if missing in data
-    if "On Hand - WIP" not in SO_INV.columns and "In Stock(Inventory)" in SO_INV.columns:
-        g["On Hand - WIP"] = SO_INV.loc[g.index, "In Stock(Inventory)"]
+    if "On Hand - WIP" not in snap.so.columns and "In Stock(Inventory)" in snap.so.columns:
+        g["On Hand - WIP"] = snap.so.loc[g.index, "In Stock(Inventory)"]
     if "Ship Date" in g.columns:
         ship_dates = pd.to_datetime(g["Ship Date"], errors="coerce")
         g = (
@@ -1886,9 +2093,9 @@ def _so_table_for_item(item: str) -> tuple[list[str], list[dict], dict[str, int
             totals["on_po"] = _aggregate_metric(g["On PO"])
     return need_cols, rows, totals
 
-def _so_table_for_so(so_num: str, item: str | None = None) -> tuple[list[str], list[dict]]:
+def _so_table_for_so(snap: Snapshot, so_num: str, item: str | None = None) -> tuple[list[str], list[dict]]:
     need_cols = ["Name", "QB Num", "Item", "Qty(-)", "On Hand - WIP", "Ship Date", "Picked"]
-    g = SO_INV.copy()
+    g = snap.so.copy()
     mask = g["QB Num"].astype(str).str.upper() == so_num.upper()
     if item:
         mask &= g["Item"].astype(str) == item
@@ -1994,34 +2201,34 @@ def _recent_receiving_summary_for_item(item: str, days: int = 7) -> tuple[list[s
     rows = grouped.sort_values(["Date", "Inv#", "POD#", "Reference"], ascending=[False, True, True, True], kind="mergesort").fillna("").astype(str).to_dict(orient="records")
     return columns, rows
 
-def _po_table_for_item(item: str) -> tuple[list[str], list[dict]]:
-    if "Item" not in NAV.columns:
+def _po_table_for_item(snap: Snapshot, item: str) -> tuple[list[str], list[dict]]:
+    if "Item" not in snap.nav.columns:
         raise ValueError("NAV table missing 'Item' column.")
     item_lower = item.lower()
     item_upper = item.upper()
-    nav_item_series = NAV["Item"].astype(str)
+    nav_item_series = snap.nav["Item"].astype(str)
     mask = nav_item_series.str.lower() == item_lower
     allow_desc_lookup = not item_upper.startswith(("N", "SEMIL", "POC"))
-    if allow_desc_lookup and "Description" in NAV.columns:
-        desc_mask = NAV["Description"].astype(str).str.lower().str.contains(item_lower, na=False)
+    if allow_desc_lookup and "Description" in snap.nav.columns:
+        desc_mask = snap.nav["Description"].astype(str).str.lower().str.contains(item_lower, na=False)
         mask |= desc_mask
-    g = NAV[mask].copy()
+    g = snap.nav[mask].copy()
     for dc in ("Ship Date", "Order Date", "ETA"):
         if dc in g.columns:
             g[dc] = _to_date_str(g[dc])
-    cols = list(g.columns) if not g.empty else list(NAV.columns)
+    cols = list(g.columns) if not g.empty else list(snap.nav.columns)
     g = g.fillna("").astype(str)
     rows = g[cols].to_dict(orient="records") if not g.empty else []
     return cols, rows
 
-def _open_po_table_for_item(item: str) -> tuple[list[str], list[dict]]:
-    if OPEN_PO is None or OPEN_PO.empty:
+def _open_po_table_for_item(snap: Snapshot, item: str) -> tuple[list[str], list[dict]]:
+    if snap.open_po is None or snap.open_po.empty:
         return [], []
 
     item_lower = item.lower()
     item_upper = item.upper()
 
-    df = OPEN_PO
+    df = snap.open_po
     item_col = next((c for c in df.columns if c.lower() == "item"), None)
     desc_col = next((c for c in df.columns if c.lower() == "description"), None)
 
@@ -2056,30 +2263,107 @@ def _open_po_table_for_item(item: str) -> tuple[list[str], list[dict]]:
 
 
 # initial load
-_load_from_db(force=True)
+_load_from_db(force=True, rebuild=False)
+if SNAPSHOT_POLL_SECONDS > 0:
+    threading.Thread(
+        target=_watch_published_runs, args=(SNAPSHOT_POLL_SECONDS,), name="etl-run-watcher", daemon=True
+    ).start()
+
+def _accepts_gzip() -> bool:
+    return "gzip" in request.headers.get("Accept-Encoding", "").lower()
+
+
+def _cached_view(*, ttl: float | None = None, vary=None):
+    """
+    Serve GET requests of the wrapped view from RESPONSE_CACHE.
+
+    The key is the endpoint, the sorted and stripped query arguments, the
+    pinned snapshot version and today's date (pages count days from today);
+    `vary` adds process state the page shows, and `ttl` bounds pages that read
+    override tables outside the snapshot. Only 200 responses are stored, with
+    a content ETag: a client sending it back in If-None-Match gets a 304.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "GET" or request.args.get("reload") == "1":
+                return view(*args, **kwargs)
+            snap = _ensure_loaded()
+            if snap is None:
+                return view(*args, **kwargs)
+            params = tuple(sorted((k, v.strip()) for k, v in request.args.items(multi=True) if v.strip()))
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                params,
+                snap.version,
+                datetime.today().date(),
+                vary() if vary is not None else None,
+            )
+            entry = RESPONSE_CACHE.get(key)
+            if entry is None:
+                resp = app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200 or resp.direct_passthrough or resp.is_streamed:
+                    return resp
+                entry = CachedResponse.build(resp.get_data(), resp.mimetype, ttl=ttl)
+                RESPONSE_CACHE.put(key, entry)
+
+            return entry.respond(request.if_none_match, accept_gzip=_accepts_gzip())
+
+        return wrapper
+
+    return decorator
+
+
+@app.after_request
+def _compress_response(resp: Response) -> Response:
+    """Gzip HTML and JSON bodies the response cache did not already handle."""
+    if (
+        resp.status_code != 200
+        or resp.direct_passthrough
+        or resp.is_streamed
+        or "Content-Encoding" in resp.headers
+        or resp.mimetype not in COMPRESSIBLE_MIMETYPES
+        or not _accepts_gzip()
+    ):
+        return resp
+    body = resp.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return resp
+    resp.set_data(gzip_body(body))
+    resp.headers["Content-Encoding"] = "gzip"
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def _recent_searches_key() -> tuple[str, ...]:
+    return tuple(entry["href"] for entry in RECENT_HOME_SEARCHES)
+
 
 # =========================
 # Routes
 # =========================
 @app.route("/", methods=["GET", "POST"])
+@_cached_view(ttl=RESPONSE_CACHE_TTL_SECONDS, vary=_recent_searches_key)
 def index():
     if request.args.get("reload") == "1":
-        _load_from_db(force=True)
+        _request_reload()
         _load_pdf_map(force=True)
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
 
-    lt_unassigned_count = _dashboard_lt_unassigned_count()
-    alerts = _dashboard_alerts()
+    lt_unassigned_count = _dashboard_lt_unassigned_count(snap)
+    alerts = _dashboard_alerts(snap)
     recent_searches = list(RECENT_HOME_SEARCHES)
 
     # ---- read inputs (work with GET or POST) ----
     so_input = (request.values.get("so") or "").strip()
     customer_input = (request.values.get("customer") or "").strip()
     cache_key = (so_input, customer_input)
-    if cache_key in INDEX_VIEW_CACHE:
-        cached = INDEX_VIEW_CACHE[cache_key]
+    cached = snap.views.get(("index", *cache_key))
+    if cached is not None:
         return render_template_string(
             INDEX_TPL,
             so_num=so_input,
@@ -2088,7 +2372,7 @@ def index():
             customer_options=cached["customer_options"],
             rows=cached["rows"],
             count=cached["count"],
-            loaded_at=_LAST_LOADED_AT.strftime("%Y-%m-%d %H:%M:%S") if _LAST_LOADED_AT else "â€”",
+            loaded_at=snap.built_at.strftime("%Y-%m-%d %H:%M:%S") if snap.built_at else "â€”",
             order_summary=cached["order_summary"],
             lt_unassigned_count=lt_unassigned_count,
             recent_searches=recent_searches,
@@ -2118,24 +2402,24 @@ def index():
     table_headers = None
     customer_options = None
     customer_query = None
-    so_base = SO_LOOKUP_BASE if SO_LOOKUP_BASE is not None else SO_INV
+    so_base = snap.so_lookup_base if snap.so_lookup_base is not None else snap.so
     if so_input:
         rows_df = pd.DataFrame()
 
         if so_num:
             mask = so_base["__qb_upper"] == so_num if "__qb_upper" in so_base.columns else so_base["QB Num"].astype(str).str.upper() == so_num
-            rows_df = SO_INV.loc[mask].copy()
+            rows_df = snap.so.loc[mask].copy()
 
             # Fallback: tolerant key match for formatting differences.
-            if rows_df.empty and "QB Num" in SO_INV.columns:
+            if rows_df.empty and "QB Num" in snap.so.columns:
                 target_key = _normalize_so_key(so_num)
-                qb_norm = SO_INV["QB Num"].astype(str).map(_normalize_so_key)
-                rows_df = SO_INV.loc[qb_norm.eq(target_key)].copy()
+                qb_norm = snap.so["QB Num"].astype(str).map(_normalize_so_key)
+                rows_df = snap.so.loc[qb_norm.eq(target_key)].copy()
 
-        if (rows_df is None or rows_df.empty) and "Name" in SO_INV.columns:
+        if (rows_df is None or rows_df.empty) and "Name" in snap.so.columns:
             name_col = so_base["__name_text"] if "__name_text" in so_base.columns else so_base["Name"].astype(str)
             name_mask = name_col.str.contains(so_input, case=False, na=False)
-            rows_df = SO_INV.loc[name_mask].copy()
+            rows_df = snap.so.loc[name_mask].copy()
 
         count = len(rows_df)
 
@@ -2219,10 +2503,10 @@ def index():
     elif customer_input:
         customer_query = customer_input
         customer_options = []
-        if "Name" in SO_INV.columns:
+        if "Name" in snap.so.columns:
             name_col = so_base["__name_text"] if "__name_text" in so_base.columns else so_base["Name"].astype(str)
             name_mask = name_col.str.contains(customer_input, case=False, na=False)
-            cust_df = SO_INV.loc[name_mask].copy()
+            cust_df = snap.so.loc[name_mask].copy()
             if not cust_df.empty:
                 if "QB Num" not in cust_df.columns:
                     cust_df["QB Num"] = ""
@@ -2254,9 +2538,7 @@ def index():
         "customer_options": customer_options,
         "customer_query": customer_query,
     }
-    if len(INDEX_VIEW_CACHE) >= 256:
-        INDEX_VIEW_CACHE.clear()
-    INDEX_VIEW_CACHE[cache_key] = cache_payload
+    _remember_view(snap, ("index", *cache_key), cache_payload)
 
     return render_template_string(
         INDEX_TPL,
@@ -2266,7 +2548,7 @@ def index():
         customer_options=customer_options,
         rows=rows,
         count=count,
-        loaded_at=_LAST_LOADED_AT.strftime("%Y-%m-%d %H:%M:%S") if _LAST_LOADED_AT else "â€”",
+        loaded_at=snap.built_at.strftime("%Y-%m-%d %H:%M:%S") if snap.built_at else "â€”",
         order_summary=order_summary,
         lt_unassigned_count=lt_unassigned_count,
         recent_searches=recent_searches,
@@ -2281,12 +2563,13 @@ def index():
     )
 
 @app.route("/dashboard/negative_inventory")
+@_cached_view()
 def dashboard_negative_inventory():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
 
-    columns, rows = _negative_inventory_detail_rows()
+    columns, rows = _negative_inventory_detail_rows(snap)
     return render_template_string(
         """
 <!doctype html>
@@ -2346,29 +2629,48 @@ def dashboard_negative_inventory():
     )
 @app.route("/api/reload", methods=["POST"])
 def api_reload():
-    _load_from_db(force=True)
+    """
+    Start a background snapshot rebuild and return 202 at once; with
+    ?wait=1 (e.g. from a script run after the ETL) block until it is swapped in.
+    """
+    reload_thread = _request_reload()
     _load_pdf_map(force=True)
-    if _LAST_LOAD_ERR:
-        return jsonify({"ok": False, "error": _LAST_LOAD_ERR}), 500
-    return jsonify({"ok": True, "loaded_at": _LAST_LOADED_AT.isoformat()})
+    if request.args.get("wait") != "1":
+        snap = SNAPSHOT.current
+        return jsonify({"ok": True, "reloading": True, "snapshot_version": snap.version if snap else None}), 202
+    reload_thread.join()
+    snap = SNAPSHOT.current
+    if snap is None or _LAST_BUILD_ERR:
+        return jsonify({"ok": False, "error": _LAST_BUILD_ERR or _LAST_LOAD_ERR}), 500
+    return jsonify({"ok": True, "loaded_at": snap.built_at.isoformat(), "snapshot_version": snap.version})
 
 
 @app.route("/api/debug/db_state")
 def api_debug_db_state():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     so = (request.args.get("so") or "").strip()
     so_count = None
-    if so and SO_INV is not None and not SO_INV.empty and "QB Num" in SO_INV.columns:
-        so_count = int(SO_INV["QB Num"].astype(str).str.upper().eq(so.upper()).sum())
+    if so and snap is not None and not snap.so.empty and "QB Num" in snap.so.columns:
+        so_count = int(snap.so["QB Num"].astype(str).str.upper().eq(so.upper()).sum())
+    run = snap.db_run if snap is not None else None
     return jsonify(
         {
-            "ok": _LAST_LOAD_ERR is None,
-            "loaded_at": _LAST_LOADED_AT.isoformat() if _LAST_LOADED_AT else None,
+            "ok": snap is not None,
+            "loaded_at": snap.built_at.isoformat() if snap else None,
             "database_dsn": str(engine.url),
             "pdf_folder": PDF_FOLDER,
-            "so_inv_rows": int(len(SO_INV)) if SO_INV is not None else None,
+            "so_inv_rows": int(len(snap.so)) if snap else None,
             "wo_structured_match_count": so_count,
             "last_load_error": _LAST_LOAD_ERR,
+            "last_build_error": _LAST_BUILD_ERR,
+            "snapshot_version": snap.version if snap else None,
+            "snapshot_build_seconds": snap.build_seconds if snap else None,
+            "reload_in_progress": _RELOAD_THREAD is not None,
+            "shared_snapshot_dir": str(SHARED_STORE.root) if SHARED_STORE is not None else None,
+            "response_cache": RESPONSE_CACHE.stats(),
+            "db_version": run["version"] if run else None,
+            "etl_run_id": run["run_id"] if run else None,
+            "etl_published_at": str(run["published_at"]) if run else None,
         }
     )
 
@@ -2436,7 +2738,7 @@ def api_pdf_search():
 
 @app.route("/api/item_overview")
 def api_item_overview():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return jsonify({"ok": False, "error": _LAST_LOAD_ERR}), 503
 
@@ -2444,14 +2746,14 @@ def api_item_overview():
     if not item:
         abort(400, "Missing item")
 
-    columns_so, rows_so, so_totals = _so_table_for_item(item)
+    columns_so, rows_so, so_totals = _so_table_for_item(snap, item)
     try:
-        columns_po, rows_po = _po_table_for_item(item)
-        open_po_cols, open_po_rows = _open_po_table_for_item(item)
+        columns_po, rows_po = _po_table_for_item(snap, item)
+        open_po_cols, open_po_rows = _open_po_table_for_item(snap, item)
     except ValueError as exc:
         return jsonify({"ok": False, "error": str(exc)}), 500
 
-    on_po_val = lookup_on_po_by_item(item)
+    on_po_val = lookup_on_po_by_item(snap, item)
 
     return jsonify(
         {
@@ -2476,6 +2778,100 @@ def api_item_overview():
     )
 
 
+@app.route("/api/atp_batch", methods=["POST"])
+def api_atp_batch():
+    """
+    Earliest ATP dates for many lines at once.
+    Body: {"requests": [{"request_id", "item", "qty", "from_date"?}, ...], "allow_zero"?: bool}
+    """
+    snap = _ensure_loaded()
+    if _LAST_LOAD_ERR:
+        return jsonify({"ok": False, "error": _LAST_LOAD_ERR}), 503
+
+    payload = request.get_json(silent=True) or {}
+    lines = payload.get("requests")
+    if not isinstance(lines, list) or not lines:
+        return jsonify({"ok": False, "error": "Missing requests."}), 400
+
+    lines = [line if isinstance(line, dict) else {} for line in lines]
+    reqs = pd.DataFrame(
+        {
+            "request_id": [line.get("request_id", i) for i, line in enumerate(lines)],
+            "item_input": [str(line.get("item") or "").strip() for line in lines],
+            "qty": [_parse_float(line.get("qty"), 1.0) for line in lines],
+            "from_date": [line.get("from_date") for line in lines],
+        }
+    )
+    resolved = {
+        raw: raw if raw in snap.item_atp_index else _resolve_ledger_item_key(snap, raw)
+        for raw in reqs["item_input"].unique()
+        if raw
+    }
+    reqs["item"] = reqs["item_input"].map(resolved).fillna("")
+    try:
+        out = snap.item_atp_index.earliest_batch(reqs, allow_zero=bool(payload.get("allow_zero", True)))
+    except ValueError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 400
+
+    rows = []
+    for rec in out.itertuples(index=False):
+        earliest = rec.earliest_date
+        rows.append(
+            {
+                "request_id": rec.request_id,
+                "item": rec.item_input,
+                "item_key": rec.item,
+                "qty": rec.qty,
+                "earliest_atp": earliest.strftime("%Y-%m-%d") if pd.notna(earliest) else None,
+            }
+        )
+    all_dates = out["earliest_date"]
+    ready = all_dates.max() if not all_dates.empty and all_dates.notna().all() else None
+    return jsonify(
+        {
+            "ok": True,
+            "count": len(rows),
+            "rows": rows,
+            "all_ready_date": ready.strftime("%Y-%m-%d") if ready is not None else None,
+        }
+    )
+
+
+def _scenario_base(snap: Snapshot) -> ScenarioBase:
+    global SCENARIO_BASE
+    cached = SCENARIO_BASE
+    if cached is None or cached[0] != snap.version:
+        cached = SCENARIO_BASE = (snap.version, ScenarioBase.from_ledger(snap.ledger))
+    return cached[1]
+
+
+@app.route("/api/scenarios", methods=["POST"])
+def api_scenarios():
+    """
+    What-if evaluation of overrides against the loaded ledger.
+    Body: {"scenarios": [{"name", "overrides": [{"op": "move"|"qty"|"remove"|"add", ...}]}],
+           "qty"?: float}
+    Each result lists the affected items, new/resolved/changed violations and ATP shifts.
+    Scenarios are evaluated in-process, one after another: a spawned worker pool
+    would re-run this module's start-up (DB load, watcher thread) in every worker.
+    """
+    snap = _ensure_loaded()
+    if _LAST_LOAD_ERR:
+        return jsonify({"ok": False, "error": _LAST_LOAD_ERR}), 503
+
+    payload = request.get_json(silent=True) or {}
+    specs = payload.get("scenarios")
+    if not isinstance(specs, list) or not specs:
+        return jsonify({"ok": False, "error": "Missing scenarios."}), 400
+    try:
+        scenarios = [scenario_from_dict(spec if isinstance(spec, dict) else {}) for spec in specs]
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"ok": False, "error": f"Bad scenario: {e}"}), 400
+
+    results = evaluate_scenarios(_scenario_base(snap), scenarios, qty=_parse_float(payload.get("qty"), 1.0))
+    return jsonify({"ok": True, "count": len(results), "results": [r.to_dict() for r in results]})
+
+
 @app.route("/api/llm_chat", methods=["POST"])
 def api_llm_chat():
     payload = request.get_json(silent=True) or {}
@@ -2512,7 +2908,7 @@ def api_llm_chat():
 
 @app.route("/so_lines")
 def so_lines():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
 
@@ -2520,9 +2916,9 @@ def so_lines():
     if not item:
         abort(400, "Missing item")
 
-    columns, rows, _ = _so_table_for_item(item)
+    columns, rows, _ = _so_table_for_item(snap, item)
 
-    on_po_val = lookup_on_po_by_item(item)
+    on_po_val = lookup_on_po_by_item(snap, item)
 
     return render_template_string(
         SUBPAGE_TPL,
@@ -2538,7 +2934,7 @@ def so_lines():
 
 @app.route("/po_lines")
 def po_lines():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
 
@@ -2547,12 +2943,12 @@ def po_lines():
         abort(400, "Missing item")
 
     try:
-        cols, rows = _po_table_for_item(item)
-        open_cols, open_rows = _open_po_table_for_item(item)
+        cols, rows = _po_table_for_item(snap, item)
+        open_cols, open_rows = _open_po_table_for_item(snap, item)
     except ValueError as exc:
         return render_template_string(ERR_TPL, error=str(exc)), 500
 
-    on_po_val = lookup_on_po_by_item(item)
+    on_po_val = lookup_on_po_by_item(snap, item)
 
     return render_template_string(
         SUBPAGE_TPL,
@@ -2567,8 +2963,9 @@ def po_lines():
     )
 
 @app.route("/item_details")
+@_cached_view()
 def item_details():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
 
@@ -2576,14 +2973,14 @@ def item_details():
     if not item:
         abort(400, "Missing item")
 
-    columns_so, rows_so, so_totals = _so_table_for_item(item)
+    columns_so, rows_so, so_totals = _so_table_for_item(snap, item)
     try:
-        columns_po, rows_po = _po_table_for_item(item)
-        open_po_cols, open_po_rows = _open_po_table_for_item(item)
+        columns_po, rows_po = _po_table_for_item(snap, item)
+        open_po_cols, open_po_rows = _open_po_table_for_item(snap, item)
     except ValueError as exc:
         return render_template_string(ERR_TPL, error=str(exc)), 500
 
-    on_po_val = lookup_on_po_by_item(item)
+    on_po_val = lookup_on_po_by_item(snap, item)
 
     return render_template_string(
         ITEM_TPL,
@@ -2671,12 +3068,12 @@ def item_photo():
 
 @app.route("/inventory_count")
 def inventory_count():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
 
     if request.args.get("reload") == "1":
-        _load_from_db(force=True)
+        _request_reload()
 
     so_input = (request.values.get("so") or "").strip()
     item_input = (request.values.get("item") or "").strip()
@@ -2694,7 +3091,7 @@ def inventory_count():
     inv_status_columns: list[str] = []
     inv_status_rows: list[dict] = []
 
-    inv_filtered = INVENTORY_STATUS.copy() if INVENTORY_STATUS is not None else pd.DataFrame()
+    inv_filtered = snap.inventory.copy() if snap.inventory is not None else pd.DataFrame()
     if item_input and not inv_filtered.empty and "Part_Number" in inv_filtered.columns:
         part = inv_filtered["Part_Number"].astype(str).str.strip()
         item_norm = normalize_item(item_input)
@@ -2712,7 +3109,7 @@ def inventory_count():
         if on_hand_wip is None:
             on_hand_wip = on_hand
 
-    filtered_df = SO_INV.copy()
+    filtered_df = snap.so.copy()
     if item_input:
         item_norm = normalize_item(item_input)
         item_upper = item_input.strip().upper()
@@ -2728,15 +3125,15 @@ def inventory_count():
     # Build the "On Sales Order" table depending on provided filters
     if item_input:
         receiving_columns, receiving_rows = _recent_receiving_summary_for_item(item_input)
-        so_columns, so_rows, _ = _so_table_for_item(item_input)
+        so_columns, so_rows, _ = _so_table_for_item(snap, item_input)
         # If SO also provided, further filter rows to that SO
         if so_num and so_rows:
             so_rows = [r for r in so_rows if str(r.get("QB Num", "")).upper() == so_num]
     elif so_num:
-        so_columns, so_rows = _so_table_for_so(so_num)
+        so_columns, so_rows = _so_table_for_so(snap, so_num)
     else:
         so_columns, so_rows = [], []
-        inv_status = INVENTORY_STATUS.copy() if INVENTORY_STATUS is not None else pd.DataFrame()
+        inv_status = snap.inventory.copy() if snap.inventory is not None else pd.DataFrame()
         if not inv_status.empty:
             if "Part_Number" not in inv_status.columns and "Item" in inv_status.columns:
                 inv_status["Part_Number"] = inv_status["Item"]
@@ -2757,7 +3154,7 @@ def inventory_count():
 
     return render_template_string(
         INVENTORY_TPL,
-        loaded_at=_LAST_LOADED_AT.strftime("%Y-%m-%d %H:%M:%S") if _LAST_LOADED_AT else "ï¿½?",
+        loaded_at=snap.built_at.strftime("%Y-%m-%d %H:%M:%S") if snap.built_at else "ï¿½?",
         so_val=so_input,
         item_val=item_input,
         on_hand=on_hand,
@@ -2772,18 +3169,19 @@ def inventory_count():
 
 
 @app.route("/production_planning")
+@_cached_view(ttl=RESPONSE_CACHE_TTL_SECONDS)
 def production_planning():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
 
     if request.args.get("reload") == "1":
-        _load_from_db(force=True)
+        _request_reload()
 
-    if FINAL_SO is None or FINAL_SO.empty:
+    if snap.final_so is None or snap.final_so.empty:
         return render_template_string(ERR_TPL, error="No final_sales_order data available."), 503
 
-    df = FINAL_SO.copy()
+    df = snap.final_so.copy()
     if "Lead Time" not in df.columns:
         return render_template_string(ERR_TPL, error="final_sales_order missing 'Lead Time' column."), 500
 
@@ -2796,7 +3194,7 @@ def production_planning():
     df["lead_date_str"] = df["Lead Time"].dt.strftime("%Y-%m-%d")
     production_schedule_overrides = _load_production_schedule_overrides()
     finished_goods_overrides = _load_finished_goods_overrides()
-    unassigned_lt_orders = _build_unassigned_lt_orders(df, SO_INV)
+    unassigned_lt_orders = _build_unassigned_lt_orders(df, snap.so)
     unassigned_lt_orders = [
         row for row in unassigned_lt_orders
         if str(row.get("qb_num") or "").strip() not in production_schedule_overrides
@@ -2804,9 +3202,9 @@ def production_planning():
     ]
     unassigned_lt_summary = _summarize_labor_rows(unassigned_lt_orders)
 
-    wo_status_map = _wo_status_by_qb_num()
+    wo_status_map = _wo_status_by_qb_num(snap.so)
     picked_qty_overrides = _load_wo_picked_qty_overrides()
-    labor_item_map = _build_first_wo_item_map(SO_INV)
+    labor_item_map = _build_first_wo_item_map(snap.so)
     df["__qb_key"] = df["QB Num"].astype(str).str.strip()
     df["production_date_str"] = df["__qb_key"].map(production_schedule_overrides).fillna("")
     df["__is_finished_goods"] = df["__qb_key"].isin(finished_goods_overrides)
@@ -2818,7 +3216,7 @@ def production_planning():
     capacity_df = df.loc[df["production_date_str"].ne("") & ~df["__is_finished_goods"]].copy()
     capacity_df["Lead Time"] = pd.to_datetime(capacity_df["production_date_str"], errors="coerce")
     capacity_df = capacity_df.loc[capacity_df["Lead Time"].ge(today) & capacity_df["Lead Time"].dt.weekday.lt(5)].copy()
-    capacity_weeks = _build_weekly_labor_capacity(capacity_df, SO_INV)
+    capacity_weeks = _build_weekly_labor_capacity(capacity_df, snap.so)
     date_groups: list[dict] = []
     scheduled_df = df.loc[df["production_date_str"].ne("")].copy()
     scheduled_df["__production_date"] = pd.to_datetime(scheduled_df["production_date_str"], errors="coerce")
@@ -2905,7 +3303,7 @@ def production_planning():
 
     return render_template_string(
         PRODUCTION_TPL,
-        loaded_at=_LAST_LOADED_AT.strftime("%Y-%m-%d %H:%M:%S") if _LAST_LOADED_AT else "",
+        loaded_at=snap.built_at.strftime("%Y-%m-%d %H:%M:%S") if snap.built_at else "",
         capacity_weeks=capacity_weeks,
         passed_lt_orders=passed_lt_orders,
         passed_lt_summary=passed_lt_summary,
@@ -2978,6 +3376,8 @@ def api_production_schedule():
                 _delete_finished_goods_override(assignment["wo_number"])
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
+    finally:
+        RESPONSE_CACHE.clear()
 
     return jsonify(
         {
@@ -2990,7 +3390,7 @@ def api_production_schedule():
 
 @app.route("/api/wo_picked_qty", methods=["POST"])
 def api_wo_picked_qty():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return jsonify({"ok": False, "error": _LAST_LOAD_ERR}), 503
 
@@ -3004,7 +3404,7 @@ def api_wo_picked_qty():
     if picked_qty < 0:
         return jsonify({"ok": False, "error": "Picked Qty cannot be negative."}), 400
 
-    planned_qty = _planned_qty_for_qb_num(wo_number)
+    planned_qty = _planned_qty_for_qb_num(snap, wo_number)
     if planned_qty is not None and picked_qty > planned_qty:
         return (
             jsonify(
@@ -3024,6 +3424,8 @@ def api_wo_picked_qty():
         )
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
+    finally:
+        RESPONSE_CACHE.clear()
 
     remaining_qty = None if planned_qty is None else max(planned_qty - picked_qty, 0.0)
     return jsonify(
@@ -3041,17 +3443,16 @@ def api_wo_picked_qty():
 
 @app.route("/api/global_suggest")
 def api_global_suggest():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     q = (request.args.get("q") or request.args.get("query") or "").strip()
     if not q:
         return jsonify({"ok": True, "items": []})
+    if snap is None:
+        return jsonify({"ok": True, "items": []})
     try:
-        ql = q.lower()
-        rows = GLOBAL_SEARCH_INDEX
-        starts = [r for r in rows if str(r.get("label", "")).lower().startswith(ql)]
-        contains = [r for r in rows if ql in str(r.get("search", r.get("label", ""))).lower() and r not in starts]
+        rows = snap.global_search_index
         out = []
-        for row in (starts + contains)[:20]:
+        for row in (rows[i] for i in snap.global_search.search(q, limit=20)):
             out.append(
                 {
                     "type": row.get("type", ""),
@@ -3068,34 +3469,28 @@ def api_global_suggest():
 
 @app.route("/global_search")
 def global_search():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     q = (request.args.get("q") or "").strip()
     if not q:
         return redirect(url_for("index"))
-    ql = q.lower()
-    rows = GLOBAL_SEARCH_INDEX
-    exact = next((r for r in rows if str(r.get("label", "")).lower() == ql), None)
-    if exact and exact.get("href"):
-        return redirect(str(exact["href"]))
-    starts = next((r for r in rows if str(r.get("label", "")).lower().startswith(ql)), None)
-    if starts and starts.get("href"):
-        return redirect(str(starts["href"]))
+    # The first exact label wins, else the first label starting with `q`.
+    if snap is not None:
+        for ids in (snap.global_search.exact(q)[:1], snap.global_search.prefix(q, limit=1)):
+            best = snap.global_search_index[ids[0]] if ids else None
+            if best and best.get("href"):
+                return redirect(str(best["href"]))
     if q.upper().startswith("SO") or q.replace("-", "").isdigit():
         return redirect(url_for("index", so=q))
     return redirect(url_for("index", customer=q))
 
 @app.route("/api/item_suggest")
 def api_item_suggest():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     q = (request.args.get("q") or request.args.get("query") or "").strip()
     if not q:
         return jsonify({"ok": True, "items": []})
     try:
-        items = ITEM_SUGGEST_CACHE
-        ql = q.lower()
-        starts = [i for i in items if i.lower().startswith(ql)]
-        contains = [i for i in items if ql in i.lower() and i not in starts]
-        out = (starts + contains)[:20]
+        out = [] if snap is None else [snap.item_search.labels[i] for i in snap.item_search.search(q, limit=20)]
         return jsonify({"ok": True, "items": out})
     except Exception as e:
             return jsonify({"ok": False, "error": str(e)}), 500
@@ -3123,12 +3518,12 @@ def api_item_info_suggest():
 
 @app.route("/api/quotation_item_suggest")
 def api_quotation_item_suggest():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     q = (request.args.get("q") or request.args.get("query") or "").strip()
     if not q:
         return jsonify({"ok": True, "items": []})
     try:
-        rows = QUOTE_ITEM_SUGGEST_ROWS
+        rows = snap.quote_item_suggest_rows
         ql = q.lower()
         starts = [r for r in rows if str(r.get("item", "")).lower().startswith(ql)]
         contains = [r for r in rows if ql in str(r.get("item", "")).lower() and r not in starts]
@@ -3170,16 +3565,9 @@ def _excel_fill_class(cell) -> str:
     return ""
 
 
-def _load_peripheral_status(force: bool = False) -> dict:
-    global PERIPHERAL_STATUS_CACHE, PERIPHERAL_STATUS_CACHE_KEY
-    path = _peripheral_workbook_path()
-    if path is None:
-        raise FileNotFoundError("Place 'Peripheral Status Update_YYYYMMDD.xlsx' in the ERP_System base folder, or set PERIPHERAL_STATUS_WORKBOOK to its full path.")
-    stat = path.stat()
-    cache_key = (str(path.resolve()).lower(), stat.st_mtime_ns, stat.st_size)
-    if not force and PERIPHERAL_STATUS_CACHE is not None and PERIPHERAL_STATUS_CACHE_KEY == cache_key:
-        return PERIPHERAL_STATUS_CACHE
-    workbook = load_workbook(path, read_only=False, data_only=True)
+def _read_peripheral_status(path: Path) -> dict:
+    # Read-only mode streams rows but still exposes cell fills for the model colour classes.
+    workbook = load_workbook(path, read_only=True, data_only=True)
     try:
         names, sheets, missing = list(workbook.sheetnames), [], []
         for label, aliases in (("SSD", ("ssd",)), ("DDR / Memory", ("ddr", "memory"))):
@@ -3223,8 +3611,21 @@ def _load_peripheral_status(force: bool = False) -> dict:
             sheets.append({"label": label, "headers": headers, "rows": rows})
     finally:
         workbook.close()
-    result = {"sheets": sheets, "warnings": (["Missing sheet(s): " + ", ".join(missing) + "."] if missing else []),
-              "workbook_name": path.name, "loaded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    return {"sheets": sheets, "warnings": (["Missing sheet(s): " + ", ".join(missing) + "."] if missing else []),
+            "workbook_name": path.name, "loaded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def _load_peripheral_status(force: bool = False) -> dict:
+    global PERIPHERAL_STATUS_CACHE, PERIPHERAL_STATUS_CACHE_KEY
+    path = _peripheral_workbook_path()
+    if path is None:
+        raise FileNotFoundError("Place 'Peripheral Status Update_YYYYMMDD.xlsx' in the ERP_System base folder, or set PERIPHERAL_STATUS_WORKBOOK to its full path.")
+    cache_key = file_signature(path)
+    if not force and PERIPHERAL_STATUS_CACHE is not None and PERIPHERAL_STATUS_CACHE_KEY == cache_key:
+        return PERIPHERAL_STATUS_CACHE
+    # The parsed workbook is also kept on disk so a restarted server skips the openpyxl pass.
+    result = cached_file_read(path, "peripheral_status", _read_peripheral_status,
+                              cache_dir=None if force else EXCEL_CACHE_DIR)
     PERIPHERAL_STATUS_CACHE, PERIPHERAL_STATUS_CACHE_KEY = result, cache_key
     return result
 
@@ -3240,13 +3641,14 @@ def peripheral_status():
 
 
 @app.route("/quotation_lookup")
+@_cached_view()
 def quotation_lookup():
-    _ensure_loaded()
+    snap = _ensure_loaded()
     if _LAST_LOAD_ERR:
         return render_template_string(ERR_TPL, error=_LAST_LOAD_ERR), 503
 
     item_input = (request.values.get("item") or "").strip()
-    item_lookup = _resolve_ledger_item_key(item_input)
+    item_lookup = _resolve_ledger_item_key(snap, item_input)
     qty_val = 1
 
     ledger_columns: list[str] = []
@@ -3254,7 +3656,7 @@ def quotation_lookup():
     opening_qty = None
     earliest_atp = None
     cache_key = (item_lookup, 1)
-    cached = QUOTATION_VIEW_CACHE.get(cache_key)
+    cached = snap.views.get(("quotation", *cache_key))
     if cached is not None:
         ledger_columns = cached.get("ledger_columns", [])
         ledger_rows = cached.get("ledger_rows", [])
@@ -3267,16 +3669,12 @@ def quotation_lookup():
             earliest_atp=earliest_atp,
             ledger_columns=ledger_columns,
             ledger_rows=ledger_rows,
-            loaded_at=_LAST_LOADED_AT.strftime("%Y-%m-%d %H:%M:%S") if _LAST_LOADED_AT else "",
+            loaded_at=snap.built_at.strftime("%Y-%m-%d %H:%M:%S") if snap.built_at else "",
         )
 
-    if item_lookup and LEDGER is not None and not LEDGER.empty:
-        if item_lookup in LEDGER_ITEM_INDEX:
-            df_item = LEDGER_ITEM_INDEX[item_lookup].copy()
-        else:
-            df = LEDGER
-            item_col = "Item" if "Item" in df.columns else "Item_raw"
-            df_item = df.loc[df[item_col].astype(str).str.strip().str.upper() == item_lookup].copy()
+    if item_lookup and snap.ledger is not None and not snap.ledger.empty:
+        # Every ledger item is indexed, so a miss means no rows for it.
+        df_item = snap.ledger_item_index.get(item_lookup, snap.ledger.iloc[0:0]).copy()
         if not df_item.empty:
             # Opening snapshot:
             # 1) Prefer explicit OPEN rows; 2) if none, fall back to any Opening values.
@@ -3347,7 +3745,7 @@ def quotation_lookup():
                     keep_cols.append("Waiting_Item")
                     for rec in records:
                         qb = rec.get("QB Num", "")
-                        rec["Waiting_Item"] = WAITING_ITEMS_BY_QB.get(str(qb), "{}")
+                        rec["Waiting_Item"] = snap.waiting_items_by_qb.get(str(qb), "{}")
 
                 # Attach _is_min_nav flag for UI highlighting
                 if min_nav_value is not None and proj_series is not None:
@@ -3366,21 +3764,23 @@ def quotation_lookup():
                 ledger_rows = records
 
 
-        earliest_atp_dt = _lookup_earliest_atp_date(item_lookup, qty=qty_val)
+        earliest_atp_dt = _lookup_earliest_atp_date(snap, item_lookup, qty=qty_val)
         if earliest_atp_dt is not None:
             earliest_atp = earliest_atp_dt.strftime("%Y-%m-%d")
         else:
             earliest_atp = "Out of Stock"
 
     if item_lookup:
-        if len(QUOTATION_VIEW_CACHE) >= 256:
-            QUOTATION_VIEW_CACHE.clear()
-        QUOTATION_VIEW_CACHE[cache_key] = {
-            "ledger_columns": ledger_columns,
-            "ledger_rows": ledger_rows,
-            "opening_qty": opening_qty,
-            "earliest_atp": earliest_atp,
-        }
+        _remember_view(
+            snap,
+            ("quotation", *cache_key),
+            {
+                "ledger_columns": ledger_columns,
+                "ledger_rows": ledger_rows,
+                "opening_qty": opening_qty,
+                "earliest_atp": earliest_atp,
+            },
+        )
 
     return render_template_string(
         QUOTE_TPL,
@@ -3389,7 +3789,7 @@ def quotation_lookup():
         earliest_atp=earliest_atp,
         ledger_columns=ledger_columns,
         ledger_rows=ledger_rows,
-        loaded_at=_LAST_LOADED_AT.strftime("%Y-%m-%d %H:%M:%S") if _LAST_LOADED_AT else "",
+        loaded_at=snap.built_at.strftime("%Y-%m-%d %H:%M:%S") if snap.built_at else "",
     )
 
 
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Generic, TypeVar
+
+from flask import g, has_request_context
+
+T = TypeVar("T")
+
+
+class SnapshotSlot(Generic[T]):
+    """
+    Holds the current snapshot; installing a new one is a single reference
+    swap. Inside a Flask request `pinned()` returns the snapshot that was
+    current at the request's first call and keeps returning it, so a reload
+    finishing mid-request never mixes two versions in one response.
+    """
+
+    def __init__(self, initial: T | None = None) -> None:
+        self._current = initial
+        self._attr = f"_snapshot_slot_{id(self)}"
+
+    @property
+    def current(self) -> T | None:
+        return self._current
+
+    def install(self, snap: T) -> None:
+        self._current = snap
+
+    def pinned(self) -> T | None:
+        if not has_request_context():
+            return self._current
+        snap = g.get(self._attr)
+        if snap is None:
+            snap = self._current
+            # Nothing is pinned until a snapshot exists, so a request that triggers the first load sees it.
+            if snap is not None:
+                setattr(g, self._attr, snap)
+        return snap
+
+
+__all__ = ["SnapshotSlot"]